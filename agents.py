@@ -1,16 +1,21 @@
 from crewai import Agent, Task, Crew, Process, LLM
 from tools import search_gmail, read_email, send_email, create_draft
 import os
+import time
+import hashlib
+import inspect
 from dotenv import load_dotenv
 import logging
 from langfuse import get_client
-from notion_logger import log_meeting_notes
+from pipeline_metrics import current_metrics
 
 # Load environment variables from .env file
 load_dotenv()
 
 # API Keys
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
+
+CREW_MODEL = "gemini/gemini-2.0-flash"
  
 # Get keys for your project from the project settings page: https://cloud.langfuse.com
 LANGFUSE_PUBLIC_KEY = os.getenv("LANGFUSE_PUBLIC_KEY") 
@@ -26,14 +31,75 @@ else:
     print("Authentication failed. Please check your credentials and host.")
 
 
-def run_crew_analysis(meeting_transcript_text: str) -> dict:
+def _timestamp(value) -> float:
+    return value.timestamp() if hasattr(value, "timestamp") else float(value)
+
+
+def _record_llm_call(kwargs, completion_response, start_time, end_time, ok=True):
+    """litellm callback: tokens, latency and cost of one LLM call, for the pipeline metrics"""
+    # litellm may call back from its own logging thread
+    metrics = current_metrics(any_thread=True)
+    if metrics is None:
+        return
+    usage = getattr(completion_response, "usage", None)
+    metrics.record_llm_call(
+        kwargs.get("model", "unknown"),
+        (_timestamp(end_time) - _timestamp(start_time)) * 1000,
+        prompt_tokens=getattr(usage, "prompt_tokens", None),
+        completion_tokens=getattr(usage, "completion_tokens", None),
+        cost=kwargs.get("response_cost"),
+        ok=ok,
+        ended_at=_timestamp(end_time),
+    )
+
+
+def _record_failed_llm_call(kwargs, completion_response, start_time, end_time):
+    _record_llm_call(kwargs, completion_response, start_time, end_time, ok=False)
+
+
+try:
+    # CrewAI talks to the LLM through litellm, which reports every call's usage to these callbacks
+    import litellm
+
+    litellm.success_callback.append(_record_llm_call)
+    litellm.failure_callback.append(_record_failed_llm_call)
+except ImportError:
+    pass
+
+
+def _annotate_task_metrics(started_at: float, task_ends: list, crew_result):
+    """Split the crew's time and LLM tokens into its tasks, which run one after another"""
+    metrics = current_metrics()
+    if metrics is None:
+        return
+    tasks = []
+    previous = started_at
+    for name, ended_at in task_ends:
+        calls = [call for call in metrics.llm_calls if previous <= call["ended_at"] <= ended_at]
+        for call in calls:
+            call["task"] = name
+        tasks.append({
+            "task": name,
+            "duration_s": round(ended_at - previous, 3),
+            "llm_calls": len(calls),
+            "prompt_tokens": sum(call["prompt_tokens"] or 0 for call in calls),
+            "completion_tokens": sum(call["completion_tokens"] or 0 for call in calls),
+        })
+        previous = ended_at
+    usage = getattr(crew_result, "token_usage", None)
+    metrics.annotate(tasks=tasks, crew_token_usage=usage.model_dump() if hasattr(usage, "model_dump") else None)
+
+
+def run_crew_analysis(meeting_transcript_text: str, notes_dir: str = ".") -> dict:
     """
     Initializes and runs the CrewAI process.
+    The note files are written into ``notes_dir`` (the meeting folder when
+    called from the pipeline), so several meetings can be analyzed at once.
     Returns the direct output from key tasks.
     """
     # --- LLM Configuration ---
     llm = LLM(
-        model="gemini/gemini-2.0-flash",
+        model=CREW_MODEL,
         provider="google",
         api_key=GOOGLE_API_KEY
     )
@@ -232,7 +298,7 @@ def run_crew_analysis(meeting_transcript_text: str) -> dict:
         
         Ensure the final document is professional, consistent, complete, accurate, and easy to read.""",
         expected_output="A single, complete, and professionally formatted Markdown document following the standardized structure.",
-        output_file="Meeting_Notes.md",
+        output_file=os.path.join(notes_dir, "Meeting_Notes.md"),
         agent=qa_editor,
         context=[analyze_meeting_task, extract_action_items_task, create_outline_task]
     )
@@ -284,7 +350,7 @@ def run_crew_analysis(meeting_transcript_text: str) -> dict:
         expected_output="A final, well-structured document of the meeting notes in Markdown format, following the standardized structure.",
         context=[strategy_creation_task],
         markdown=True,
-        output_file="Meeting_Notes2.md"
+        output_file=os.path.join(notes_dir, "Meeting_Notes2.md")
     )
 
     # Task 7: Draft the MoM Email
@@ -310,15 +376,16 @@ def run_crew_analysis(meeting_transcript_text: str) -> dict:
             agents=[meeting_analyst, action_item_specialist, content_organizer, qa_editor, strategist_agent, synthesizer_agent, email_assistant],
             tasks=[analyze_meeting_task, extract_action_items_task, create_outline_task, compile_notes_task, strategy_creation_task, note_generation_task, task_draft_email],
             process=Process.sequential,
-            verbose=True
+            verbose=True,
+            task_callback=lambda output: task_ends.append((output.agent, time.time()))
         )
     langfuse.flush()
 
     # Run the crew
+    task_ends = []
+    started_at = time.time()
     crew_result = meeting_crew.kickoff(inputs={'meeting_transcript': meeting_transcript_text})
-
-    # Notion logging after CrewAI execution
-    log_meeting_notes()
+    _annotate_task_metrics(started_at, task_ends, crew_result)
 
     logging.info(f"crew_result: {crew_result}")
     logging.info(f"compile_notes_task.output: {compile_notes_task.output}")
@@ -333,4 +400,13 @@ def run_crew_analysis(meeting_transcript_text: str) -> dict:
         "final_crew_result": crew_result
     }
     
-    return results
\ No newline at end of file
+    return results
+
+
+def crew_prompt_digest() -> str:
+    """Hash of the agent and task definitions in run_crew_analysis.
+
+    Part of the analysis checkpoint key, so editing a role, goal, backstory
+    or task prompt makes resumed and reprocessed runs redo the analysis.
+    """
+    return hashlib.sha256(inspect.getsource(run_crew_analysis).encode("utf-8")).hexdigest()
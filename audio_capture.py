@@ -0,0 +1,298 @@
+import os
+import sys
+import time
+import wave
+import argparse
+import subprocess
+from typing import List, Optional
+
+# Every backend delivers the same format: 16 kHz mono signed 16-bit little-endian PCM
+SAMPLE_RATE = 16000
+CHANNELS = 1
+SAMPLE_WIDTH = 2
+
+AUDIO_BACKEND = os.getenv("AUDIO_BACKEND", "dshow" if sys.platform == "win32" else "pulse")
+AUDIO_DEVICE = os.getenv("AUDIO_DEVICE")
+AUDIO_REPLAY_FILE = os.getenv("AUDIO_REPLAY_FILE")
+
+
+class CaptureBackend:
+    """Where the bot's meeting audio comes from.
+
+    A backend streams its source as raw PCM frames (``open``/``read``/``close``).
+    ``read`` blocks until the requested frames are available and returns
+    fewer bytes, or ``b""``, only at the end of the stream. ``read_into``
+    does the same into a caller-owned buffer, which lets the capture thread
+    reuse one block for the whole meeting.
+    """
+
+    name = "base"
+
+    def __init__(self, device: Optional[str] = None):
+        self.device = device
+
+    def open(self):
+        raise NotImplementedError
+
+    def read(self, frames: int) -> bytes:
+        raise NotImplementedError
+
+    def read_into(self, buffer: memoryview) -> int:
+        """Fill ``buffer`` with whole frames; returns the number of bytes written."""
+        data = self.read(len(buffer) // (SAMPLE_WIDTH * CHANNELS))
+        buffer[:len(data)] = data
+        return len(data)
+
+    def close(self):
+        pass
+
+    def describe(self) -> str:
+        return f"{self.name}:{self.device}" if self.device else self.name
+
+
+class FfmpegCaptureBackend(CaptureBackend):
+    """Streams any ffmpeg-readable input as PCM through an ffmpeg subprocess.
+
+    Subclasses only say how ffmpeg should open their source (``ffmpeg_input_args``).
+    """
+
+    def __init__(self, device: Optional[str] = None):
+        super().__init__(device)
+        self.process: Optional[subprocess.Popen] = None
+
+    def ffmpeg_input_args(self) -> List[str]:
+        raise NotImplementedError
+
+    def open(self):
+        cmd = [
+            "ffmpeg", "-hide_banner", "-loglevel", "error",
+            *self.ffmpeg_input_args(),
+            "-f", "s16le", "-ac", str(CHANNELS), "-ar", str(SAMPLE_RATE), "pipe:1",
+        ]
+        self.process = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE)
+
+    def read(self, frames: int) -> bytes:
+        if not self.process:
+            return b""
+        wanted = frames * SAMPLE_WIDTH * CHANNELS
+        chunks = []
+        while wanted > 0:
+            chunk = self.process.stdout.read(wanted)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            wanted -= len(chunk)
+        return b"".join(chunks)
+
+    def read_into(self, buffer: memoryview) -> int:
+        if not self.process:
+            return 0
+        filled = 0
+        while filled < len(buffer):
+            n = self.process.stdout.readinto(buffer[filled:])
+            if not n:
+                break
+            filled += n
+        return filled
+
+    def close(self):
+        if self.process:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+            self.process = None
+
+
+class PulseBackend(FfmpegCaptureBackend):
+    """PulseAudio / PipeWire (pipewire-pulse) source, typically a sink's ``.monitor``."""
+
+    name = "pulse"
+
+    def __init__(self, device: Optional[str] = None):
+        super().__init__(device or "default")
+
+    def ffmpeg_input_args(self) -> List[str]:
+        return ["-f", "pulse", "-i", self.device]
+
+
+class AlsaLoopbackBackend(FfmpegCaptureBackend):
+    """Capture side of the snd-aloop ALSA loopback device."""
+
+    name = "alsa"
+
+    def __init__(self, device: Optional[str] = None):
+        super().__init__(device or "hw:Loopback,1,0")
+
+    def ffmpeg_input_args(self) -> List[str]:
+        return ["-f", "alsa", "-i", self.device]
+
+
+class SoundDeviceBackend(CaptureBackend):
+    """Any PortAudio input device, opened through sounddevice."""
+
+    name = "sounddevice"
+
+    def __init__(self, device: Optional[str] = None):
+        super().__init__(device)
+        self.stream = None
+
+    def open(self):
+        import sounddevice as sd
+
+        self.stream = sd.RawInputStream(
+            samplerate=SAMPLE_RATE,
+            channels=CHANNELS,
+            dtype='int16',
+            device=self.device,
+        )
+        self.stream.start()
+
+    def read(self, frames: int) -> bytes:
+        if not self.stream:
+            return b""
+        data, overflowed = self.stream.read(frames)
+        if overflowed:
+            print(f"⚠️ {self.describe()} input overflow")
+        return bytes(data)
+
+    def read_into(self, buffer: memoryview) -> int:
+        if not self.stream:
+            return 0
+        import sounddevice as sd
+
+        frames = len(buffer) // (SAMPLE_WIDTH * CHANNELS)
+        # RawInputStream.read allocates a fresh block per call; Pa_ReadStream fills the caller's
+        # buffer directly, the same call sounddevice makes internally
+        err = sd._lib.Pa_ReadStream(self.stream._ptr, sd._ffi.from_buffer(buffer, require_writable=True), frames)
+        if err == sd._lib.paInputOverflowed:
+            print(f"⚠️ {self.describe()} input overflow")
+        else:
+            sd._check(err)
+        return frames * SAMPLE_WIDTH * CHANNELS
+
+    def close(self):
+        if self.stream:
+            self.stream.stop()
+            self.stream.close()
+            self.stream = None
+
+
+class DShowBackend(FfmpegCaptureBackend):
+    """Windows VB-Audio Virtual Cable, captured by an ffmpeg subprocess through DirectShow."""
+
+    name = "dshow"
+
+    def __init__(self, device: Optional[str] = None):
+        super().__init__(device or "CABLE Output (VB-Audio Virtual Cable)")
+
+    def ffmpeg_input_args(self) -> List[str]:
+        return ["-f", "dshow", "-i", f"audio={self.device}"]
+
+
+class FileReplayBackend(CaptureBackend):
+    """Deterministic replay of a 16 kHz mono 16-bit WAV fixture.
+
+    With ``realtime`` the file is paced at its natural rate like a live
+    device; without it frames are returned as fast as they are read, which is
+    what benchmarks want.
+    """
+
+    name = "file"
+
+    def __init__(self, device: Optional[str] = None, realtime: bool = True, loop: bool = False):
+        super().__init__(device or AUDIO_REPLAY_FILE)
+        if not self.device:
+            raise ValueError("File replay needs a WAV path (AUDIO_DEVICE or AUDIO_REPLAY_FILE)")
+        self.realtime = realtime
+        self.loop = loop
+        self.wav: Optional[wave.Wave_read] = None
+        self.frames_read = 0
+        self.started_at = 0.0
+
+    def open(self):
+        self.wav = wave.open(self.device, "rb")
+        if (self.wav.getframerate(), self.wav.getnchannels(), self.wav.getsampwidth()) != (SAMPLE_RATE, CHANNELS, SAMPLE_WIDTH):
+            params = (self.wav.getframerate(), self.wav.getnchannels(), self.wav.getsampwidth())
+            self.wav.close()
+            self.wav = None
+            raise ValueError(f"{self.device} must be {SAMPLE_RATE} Hz mono 16-bit PCM, got {params}")
+        self.frames_read = 0
+        self.started_at = time.perf_counter()
+
+    def read(self, frames: int) -> bytes:
+        if not self.wav:
+            return b""
+        data = self.wav.readframes(frames)
+        if len(data) < frames * SAMPLE_WIDTH and self.loop:
+            self.wav.rewind()
+            data += self.wav.readframes(frames - len(data) // SAMPLE_WIDTH)
+
+        self.frames_read += len(data) // SAMPLE_WIDTH
+        if self.realtime:
+            due = self.started_at + self.frames_read / SAMPLE_RATE
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        return data
+
+    def close(self):
+        if self.wav:
+            self.wav.close()
+            self.wav = None
+
+
+BACKENDS = {
+    backend.name: backend
+    for backend in (DShowBackend, SoundDeviceBackend, PulseBackend, AlsaLoopbackBackend, FileReplayBackend)
+}
+
+
+def create_backend(name: Optional[str] = None, device: Optional[str] = None, **kwargs) -> CaptureBackend:
+    """Build the configured capture backend (``AUDIO_BACKEND`` / ``AUDIO_DEVICE`` by default)."""
+    name = (name or AUDIO_BACKEND).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown audio backend '{name}'. Choose one of: {', '.join(BACKENDS)}")
+    return BACKENDS[name](device or AUDIO_DEVICE, **kwargs)
+
+
+def benchmark(backend: CaptureBackend, block_frames: int = 1600) -> dict:
+    """Pull a backend dry and report how fast the capture path delivers audio."""
+    backend.open()
+    started = time.perf_counter()
+    total_frames = 0
+    blocks = 0
+    try:
+        while True:
+            data = backend.read(block_frames)
+            if not data:
+                break
+            total_frames += len(data) // SAMPLE_WIDTH
+            blocks += 1
+            if len(data) < block_frames * SAMPLE_WIDTH:
+                break
+    finally:
+        backend.close()
+
+    elapsed = time.perf_counter() - started
+    audio_seconds = total_frames / SAMPLE_RATE
+    return {
+        "backend": backend.describe(),
+        "blocks": blocks,
+        "audio_seconds": round(audio_seconds, 3),
+        "wall_seconds": round(elapsed, 3),
+        "realtime_factor": round(audio_seconds / elapsed, 1) if elapsed else None,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark an audio capture backend")
+    parser.add_argument("--backend", default="file", choices=sorted(BACKENDS))
+    parser.add_argument("--device", help="Device name, PulseAudio source, ALSA PCM or WAV path")
+    parser.add_argument("--block", type=int, default=1600, help="Frames per read")
+    parser.add_argument("--realtime", action="store_true", help="Pace file replay at its natural rate")
+    args = parser.parse_args()
+
+    kwargs = {"realtime": args.realtime} if args.backend == "file" else {}
+    print(f"📊 {benchmark(create_backend(args.backend, args.device, **kwargs), args.block)}")
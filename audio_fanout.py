@@ -0,0 +1,261 @@
+import os
+import time
+import threading
+import subprocess
+from typing import Callable, Dict, List, Optional
+from audio_capture import CaptureBackend, SAMPLE_RATE, SAMPLE_WIDTH, CHANNELS
+
+# 100 ms capture blocks; 30 s of history for slow consumers to catch up on
+CAPTURE_BLOCK_FRAMES = int(os.getenv("CAPTURE_BLOCK_FRAMES", 1600))
+RING_SECONDS = int(os.getenv("CAPTURE_RING_SECONDS", 30))
+
+
+class AudioRingBuffer:
+    """Single-writer, many-reader PCM ring buffer.
+
+    The writer never waits for readers. Before copying it reserves the bytes
+    it is about to overwrite by advancing ``reserved_pos``, and once the copy
+    is done it publishes them by advancing ``write_pos``. Both only ever grow.
+    Readers keep their own position, copy up to ``write_pos``, then check the
+    copy against ``reserved_pos`` (seqlock style). A copy that overlaps a
+    reserved region may be torn, so it is thrown away. A reader that fell more
+    than ``capacity`` bytes behind detects the overrun, skips ahead and counts
+    it, instead of holding the writer back.
+    """
+
+    def __init__(self, capacity: int):
+        frame = SAMPLE_WIDTH * CHANNELS
+        self.capacity = capacity - capacity % frame
+        self.buffer = bytearray(self.capacity)
+        self.write_pos = 0
+        # End of the region the writer may be copying into; always >= write_pos
+        self.reserved_pos = 0
+        self.closed = False
+        # Only used to wake readers waiting for new data, never held by the writer while copying
+        self._data_ready = threading.Condition()
+
+    def write(self, data: bytes):
+        view = memoryview(data)
+        end = self.write_pos + len(view)
+        if len(view) > self.capacity:
+            view = view[-self.capacity:]
+        # Readers treat anything before reserved_pos - capacity as possibly overwritten from here on
+        self.reserved_pos = end
+        start = (end - len(view)) % self.capacity
+        first = min(len(view), self.capacity - start)
+        self.buffer[start:start + first] = view[:first]
+        if first < len(view):
+            self.buffer[0:len(view) - first] = view[first:]
+        self.write_pos = end
+
+        with self._data_ready:
+            self._data_ready.notify_all()
+
+    def close(self):
+        self.closed = True
+        with self._data_ready:
+            self._data_ready.notify_all()
+
+    def wait_for_data(self, position: int, timeout: Optional[float]) -> bool:
+        with self._data_ready:
+            return self._data_ready.wait_for(lambda: self.write_pos > position or self.closed, timeout)
+
+    def copy(self, position: int, length: int) -> bytes:
+        start = position % self.capacity
+        first = min(length, self.capacity - start)
+        if first == length:
+            return bytes(self.buffer[start:start + length])
+        return bytes(self.buffer[start:]) + bytes(self.buffer[:length - first])
+
+
+class RingReader:
+    """One consumer's cursor into an AudioRingBuffer."""
+
+    def __init__(self, ring: AudioRingBuffer, name: str):
+        self.ring = ring
+        self.name = name
+        self.position = ring.write_pos
+        self.bytes_read = 0
+        self.overruns = 0
+        self.dropped_bytes = 0
+
+    def read(self, max_bytes: int, timeout: Optional[float] = 1.0) -> bytes:
+        """Return up to ``max_bytes`` of new audio, or b"" on timeout or when the ring is closed."""
+        ring = self.ring
+        if ring.write_pos <= self.position and not ring.wait_for_data(self.position, timeout):
+            return b""
+
+        while True:
+            written = ring.write_pos
+            self._skip_overrun(written, ring.reserved_pos)
+            length = min(max_bytes, written - self.position)
+            length -= length % (SAMPLE_WIDTH * CHANNELS)
+            if length <= 0:
+                return b""
+            data = ring.copy(self.position, length)
+
+            # The writer may have started overwriting what we copied; if so the copy is torn
+            if ring.reserved_pos - self.position <= ring.capacity:
+                self.position += length
+                self.bytes_read += length
+                return data
+
+    def _skip_overrun(self, written: int, reserved: int):
+        if reserved - self.position > self.ring.capacity:
+            # Land half a ring behind the writer so we don't overrun again straight away
+            new_position = written - self.ring.capacity // 2
+            new_position -= new_position % (SAMPLE_WIDTH * CHANNELS)
+            self.overruns += 1
+            self.dropped_bytes += new_position - self.position
+            self.position = new_position
+
+    @property
+    def finished(self) -> bool:
+        return self.ring.closed and self.position >= self.ring.write_pos
+
+    def stats(self) -> Dict:
+        return {
+            "consumer": self.name,
+            "seconds_read": round(self.bytes_read / (SAMPLE_RATE * SAMPLE_WIDTH * CHANNELS), 2),
+            "lag_bytes": self.ring.write_pos - self.position,
+            "overruns": self.overruns,
+            "dropped_seconds": round(self.dropped_bytes / (SAMPLE_RATE * SAMPLE_WIDTH * CHANNELS), 2),
+        }
+
+
+class CaptureFanout:
+    """Captures one backend on one thread and fans the samples out to every consumer.
+
+    The recorder, the realtime transcription sender and any analyzer each get
+    a RingReader, so they all see exactly the same samples from one capture.
+    """
+
+    def __init__(self, backend: CaptureBackend, block_frames: int = CAPTURE_BLOCK_FRAMES,
+                 ring_seconds: int = RING_SECONDS, log: Callable[[str], None] = print):
+        self.backend = backend
+        self.block_frames = block_frames
+        self.ring = AudioRingBuffer(ring_seconds * SAMPLE_RATE * SAMPLE_WIDTH * CHANNELS)
+        self.log = log
+        self.readers: List[RingReader] = []
+        self.thread: Optional[threading.Thread] = None
+        self.running = threading.Event()
+        self.blocks_captured = 0
+        self.started_at: Optional[float] = None
+
+    def reader(self, name: str) -> RingReader:
+        reader = RingReader(self.ring, name)
+        self.readers.append(reader)
+        return reader
+
+    def release(self, reader: RingReader):
+        """Detach a consumer that stopped reading so it doesn't show up as overrunning"""
+        if reader in self.readers:
+            self.readers.remove(reader)
+
+    def add_consumer(self, name: str, callback: Callable[[bytes], None], block_bytes: int = 3200) -> threading.Thread:
+        """Run ``callback`` on every new block of audio in its own thread."""
+        reader = self.reader(name)
+
+        def consume():
+            while not reader.finished:
+                data = reader.read(block_bytes)
+                if data:
+                    try:
+                        callback(data)
+                    except Exception as e:
+                        self.log(f"⚠️ Audio consumer '{name}' failed: {e}")
+
+        thread = threading.Thread(target=consume, daemon=True, name=f"audio-{name}")
+        thread.start()
+        return thread
+
+    def start(self):
+        self.backend.open()
+        self.running.set()
+        self.started_at = time.perf_counter()
+        self.thread = threading.Thread(target=self._capture_loop, daemon=True, name="audio-capture")
+        self.thread.start()
+        self.log(f"🎚️ Capturing {self.backend.describe()} once for all consumers")
+
+    def _capture_loop(self):
+        # One block, allocated once: the backend fills it and the ring copies out of it
+        block = memoryview(bytearray(self.block_frames * SAMPLE_WIDTH * CHANNELS))
+        try:
+            while self.running.is_set():
+                n = self.backend.read_into(block)
+                if not n:
+                    self.log("🔇 Capture source ended")
+                    break
+                self.ring.write(block[:n])
+                self.blocks_captured += 1
+        except Exception as e:
+            self.log(f"❌ Audio capture error: {e}")
+        finally:
+            self.ring.close()
+
+    def stop(self):
+        self.running.clear()
+        if self.thread:
+            self.thread.join(timeout=5)
+            self.thread = None
+        self.backend.close()
+        self.ring.close()
+
+    def stats(self) -> Dict:
+        return {
+            "backend": self.backend.describe(),
+            "seconds_captured": round(self.ring.write_pos / (SAMPLE_RATE * SAMPLE_WIDTH * CHANNELS), 2),
+            "blocks_captured": self.blocks_captured,
+            "consumers": [reader.stats() for reader in self.readers],
+        }
+
+
+class PcmFileEncoder:
+    """Consumer that pipes ring audio into ffmpeg to write the meeting recording."""
+
+    def __init__(self, reader: RingReader, output_file: str, log: Callable[[str], None] = print):
+        self.reader = reader
+        self.output_file = output_file
+        self.log = log
+        self.process: Optional[subprocess.Popen] = None
+        self.thread: Optional[threading.Thread] = None
+        self.stopping = threading.Event()
+
+    def start(self):
+        cmd = [
+            "ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+            "-f", "s16le", "-ar", str(SAMPLE_RATE), "-ac", str(CHANNELS), "-i", "pipe:0",
+            self.output_file,
+        ]
+        self.process = subprocess.Popen(cmd, stdin=subprocess.PIPE)
+        self.thread = threading.Thread(target=self._pump, daemon=True, name="audio-encoder")
+        self.thread.start()
+
+    def _pump(self):
+        try:
+            while not self.reader.finished and not self.stopping.is_set():
+                data = self.reader.read(32000)
+                if data:
+                    self.process.stdin.write(data)
+        except (BrokenPipeError, OSError) as e:
+            self.log(f"❌ Recorder pipe closed: {e}")
+
+    def stop(self, timeout: float = 10):
+        """Flush what is left in the ring and let ffmpeg finalize the file"""
+        if not self.process:
+            return
+        self.stopping.set()
+        if self.thread:
+            self.thread.join(timeout=timeout)
+        try:
+            remaining = self.reader.read(self.reader.ring.capacity, timeout=0)
+            if remaining:
+                self.process.stdin.write(remaining)
+            self.process.stdin.close()
+            self.process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self.log("⚠️ Force killing recording process...")
+            self.process.kill()
+        except (BrokenPipeError, OSError):
+            pass
+        self.process = None
@@ -0,0 +1,222 @@
+import os
+import re
+import json
+import time
+import logging
+import argparse
+import traceback
+import multiprocessing
+from contextlib import redirect_stdout, redirect_stderr
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import Dict, List, Optional
+from dotenv import load_dotenv
+from pipeline_checkpoint import PIPELINE_STATE_NAME, PIPELINE_STAGES, STAGE_TRANSCRIBE, STAGE_ANALYZE, STAGE_NOTION
+
+load_dotenv()
+
+ARCHIVE_DIR = "archives"
+RECORDING_NAME = "recording.mp3"
+# Meetings processed at the same time, each in its own process
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", 4))
+# How many of those may use each external service at once
+BATCH_MAX_TRANSCRIBE = int(os.getenv("BATCH_MAX_TRANSCRIBE", 2))   # AssemblyAI / Gemini transcription
+BATCH_MAX_ANALYZE = int(os.getenv("BATCH_MAX_ANALYZE", 2))         # CrewAI / Gemini LLM and Gmail
+BATCH_MAX_NOTION = int(os.getenv("BATCH_MAX_NOTION", 1))           # Notion API
+
+MEETING_DIR_PATTERN = re.compile(r"^meeting_(\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2})(?:_(.+))?$")
+
+STATUS_CHOICES = ("all", "complete", "incomplete", "unprocessed")
+
+# Stage semaphores, set in each pool process by _init_worker
+_limits: Optional[Dict] = None
+
+
+def meeting_status(meeting_dir: str) -> Dict:
+    """Which pipeline stages have a checkpoint in ``meeting_dir``"""
+    state_path = os.path.join(meeting_dir, PIPELINE_STATE_NAME)
+    stages = {}
+    if os.path.exists(state_path):
+        try:
+            with open(state_path, "r", encoding="utf-8") as f:
+                stages = json.load(f).get("stages", {})
+        except (OSError, json.JSONDecodeError):
+            stages = {}
+    done = [stage for stage in PIPELINE_STAGES if stage in stages]
+    if not done:
+        status = "unprocessed"
+    elif len(done) == len(PIPELINE_STAGES):
+        status = "complete"
+    else:
+        status = "incomplete"
+    return {"status": status, "stages": {stage: stages[stage]["completed_at"] for stage in done}}
+
+
+def discover_meetings(archive_dir: str = ARCHIVE_DIR, since: Optional[datetime] = None,
+                      until: Optional[datetime] = None, status: str = "all") -> List[Dict]:
+    """Archived meetings with a recording, oldest first, filtered by start time and pipeline status"""
+    meetings = []
+    if not os.path.isdir(archive_dir):
+        return meetings
+    for name in sorted(os.listdir(archive_dir)):
+        match = MEETING_DIR_PATTERN.match(name)
+        meeting_dir = os.path.join(archive_dir, name)
+        recording = os.path.join(meeting_dir, RECORDING_NAME)
+        if not match or not os.path.isfile(recording) or os.path.getsize(recording) == 0:
+            continue
+        started_at = datetime.strptime(match.group(1), "%Y-%m-%d_%H-%M-%S")
+        if (since and started_at < since) or (until and started_at > until):
+            continue
+        meeting_status_info = meeting_status(meeting_dir)
+        if status != "all" and meeting_status_info["status"] != status:
+            continue
+        meetings.append({
+            "name": name,
+            "meeting_dir": meeting_dir,
+            "recording": recording,
+            "started_at": started_at.isoformat(),
+            "meeting_id": match.group(2),
+            "recording_bytes": os.path.getsize(recording),
+            **meeting_status_info,
+        })
+    return meetings
+
+
+def _init_worker(limits: Dict):
+    global _limits
+    _limits = limits
+    # Log records would otherwise go to the parent's console through inherited handlers, or to
+    # whatever stderr was when a library first configured logging. reprocess_meeting attaches each
+    # meeting's log instead; the NullHandler keeps basicConfig in the pipeline from adding a console one.
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(logging.NullHandler())
+    root.setLevel(logging.INFO)
+
+
+def reprocess_meeting(meeting: Dict, from_stage: Optional[str]) -> Dict:
+    """Run the pipeline on one archived meeting; its output goes to reprocess.log in the meeting folder."""
+    before = meeting_status(meeting["meeting_dir"])["stages"]
+    started = time.perf_counter()
+    error = None
+    log_path = os.path.join(meeting["meeting_dir"], "reprocess.log")
+    with open(log_path, "a", encoding="utf-8") as log, redirect_stdout(log), redirect_stderr(log):
+        handler = logging.StreamHandler(log)
+        handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+        logging.getLogger().addHandler(handler)
+        print(f"\n===== Reprocessing started {datetime.now().isoformat()} (from stage: {from_stage or 'resume'}) =====")
+        try:
+            from meeting_pipeline import process_file
+
+            process_file(meeting["recording"], notes_dir=meeting["meeting_dir"], resume=True,
+                         from_stage=from_stage, limits=_limits)
+        except Exception as e:
+            traceback.print_exc()
+            error = str(e)
+        finally:
+            logging.getLogger().removeHandler(handler)
+    after = meeting_status(meeting["meeting_dir"])
+    return {
+        "name": meeting["name"],
+        "seconds": round(time.perf_counter() - started, 2),
+        "recording_bytes": meeting["recording_bytes"],
+        "status": "failed" if error else after["status"],
+        "error": error,
+        "stages_run": [stage for stage, completed_at in after["stages"].items() if before.get(stage) != completed_at],
+        "stages_missing": [stage for stage in PIPELINE_STAGES if stage not in after["stages"]],
+        "log": log_path,
+    }
+
+
+def run_batch(meetings: List[Dict], workers: int = BATCH_WORKERS, from_stage: Optional[str] = None,
+              max_transcribe: int = BATCH_MAX_TRANSCRIBE, max_analyze: int = BATCH_MAX_ANALYZE,
+              max_notion: int = BATCH_MAX_NOTION) -> Dict:
+    """Reprocess ``meetings`` across a process pool and return the batch summary."""
+    limits = {
+        STAGE_TRANSCRIBE: multiprocessing.BoundedSemaphore(max(1, max_transcribe)),
+        STAGE_ANALYZE: multiprocessing.BoundedSemaphore(max(1, max_analyze)),
+        STAGE_NOTION: multiprocessing.BoundedSemaphore(max(1, max_notion)),
+    }
+    started_at = datetime.now()
+    started = time.perf_counter()
+    results = []
+    with ProcessPoolExecutor(max_workers=max(1, workers), initializer=_init_worker, initargs=(limits,)) as pool:
+        futures = {pool.submit(reprocess_meeting, meeting, from_stage): meeting for meeting in meetings}
+        for future in as_completed(futures):
+            meeting = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                # The worker process itself died
+                result = {"name": meeting["name"], "status": "failed", "error": f"worker crashed: {e}",
+                          "seconds": None, "recording_bytes": meeting["recording_bytes"], "stages_run": [],
+                          "stages_missing": list(PIPELINE_STAGES), "log": None}
+            results.append(result)
+            icon = {"complete": "✅", "failed": "❌"}.get(result["status"], "⚠️")
+            print(f"{icon} [{len(results)}/{len(meetings)}] {result['name']}: {result['status']} "
+                  f"(ran {', '.join(result['stages_run']) or 'nothing'}"
+                  + (f" in {result['seconds']:.1f}s" if result["seconds"] is not None else "") + ")"
+                  + (f" - {result['error']}" if result["error"] else ""))
+
+    wall_seconds = time.perf_counter() - started
+    results.sort(key=lambda r: r["name"])
+    counts: Dict[str, int] = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+    durations = sorted(r["seconds"] for r in results if r["seconds"] is not None)
+    return {
+        "started_at": started_at.isoformat(),
+        "finished_at": datetime.now().isoformat(),
+        "from_stage": from_stage,
+        "workers": workers,
+        "limits": {"transcribe": max_transcribe, "analyze": max_analyze, "notion": max_notion},
+        "meetings": len(meetings),
+        "counts": counts,
+        "wall_seconds": round(wall_seconds, 1),
+        "meetings_per_hour": round(len(meetings) / wall_seconds * 3600, 1) if wall_seconds else None,
+        "recording_mb_per_hour": round(sum(r["recording_bytes"] for r in results) / 2 ** 20 / wall_seconds * 3600, 1)
+        if wall_seconds else None,
+        "p50_meeting_seconds": durations[len(durations) // 2] if durations else None,
+        "max_meeting_seconds": durations[-1] if durations else None,
+        "stages_run": {stage: sum(stage in r["stages_run"] for r in results) for stage in PIPELINE_STAGES},
+        "failures": [{"name": r["name"], "error": r["error"], "stages_missing": r["stages_missing"], "log": r["log"]}
+                     for r in results if r["status"] != "complete"],
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-run the meeting pipeline across archived meetings")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="Only meetings that started at or after this")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="Only meetings that started at or before this")
+    parser.add_argument("--status", choices=STATUS_CHOICES, default="all",
+                        help="Only meetings whose pipeline checkpoints are complete, incomplete or missing")
+    parser.add_argument("--from-stage", choices=PIPELINE_STAGES,
+                        help="Rerun this stage and the ones after it (default: resume, skipping valid stages)")
+    parser.add_argument("--limit", type=int, help="Process at most this many meetings (oldest first)")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS)
+    parser.add_argument("--max-transcribe", type=int, default=BATCH_MAX_TRANSCRIBE)
+    parser.add_argument("--max-analyze", type=int, default=BATCH_MAX_ANALYZE)
+    parser.add_argument("--max-notion", type=int, default=BATCH_MAX_NOTION)
+    parser.add_argument("--dry-run", action="store_true", help="List the selected meetings and exit")
+    parser.add_argument("--archive-dir", default=ARCHIVE_DIR)
+    parser.add_argument("--summary", help="Where to write the batch summary (default: archives/batch_<time>.json)")
+    args = parser.parse_args()
+
+    meetings = discover_meetings(args.archive_dir, args.since, args.until, args.status)
+    if args.limit:
+        meetings = meetings[:args.limit]
+    print(f"🗂️ {len(meetings)} archived meeting(s) selected")
+    if args.dry_run or not meetings:
+        for meeting in meetings:
+            print(f"   {meeting['name']} [{meeting['status']}] {meeting['recording_bytes'] / 2 ** 20:.1f} MB")
+    else:
+        summary = run_batch(meetings, args.workers, args.from_stage,
+                            args.max_transcribe, args.max_analyze, args.max_notion)
+        summary_path = args.summary or os.path.join(
+            args.archive_dir, f"batch_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.json")
+        with open(summary_path, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+        print(f"📊 {summary['counts']} in {summary['wall_seconds']}s "
+              f"({summary['meetings_per_hour']} meetings/h), summary written to {summary_path}")
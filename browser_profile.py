@@ -0,0 +1,192 @@
+import os
+import time
+import threading
+import subprocess
+from typing import Callable, Dict, List, Optional
+from selenium.webdriver.chrome.options import Options
+
+# "full" is the visible desktop Chrome the bot has always used; "lean" is headless and stripped for dense hosting
+BROWSER_PROFILE = os.getenv("BROWSER_PROFILE", "full").lower()
+# PulseAudio sink the lean browser plays into. "auto" creates a null sink per session and captures its monitor.
+BROWSER_AUDIO_SINK = os.getenv("BROWSER_AUDIO_SINK", "auto")
+RENDERER_PROCESS_LIMIT = int(os.getenv("RENDERER_PROCESS_LIMIT", 2))
+# Zoom sizes the video it sends to the rendered tiles, so a small viewport means less video to decode
+LEAN_WINDOW_SIZE = os.getenv("LEAN_WINDOW_SIZE", "640,360")
+RESOURCE_SAMPLE_INTERVAL = float(os.getenv("RESOURCE_SAMPLE_INTERVAL", 5))
+
+BROWSER_PROFILES = ("full", "lean")
+
+# Chrome features a meeting bot never uses
+LEAN_DISABLED_FEATURES = [
+    "Translate", "MediaRouter", "OptimizationHints", "AutofillServerCommunication",
+    "InterestFeedContentSuggestions", "CalculateNativeWinOcclusion",
+    # One renderer per cross-site frame would defeat the renderer cap
+    "IsolateOrigins", "site-per-process",
+]
+
+
+def build_chrome_options(profile: str = BROWSER_PROFILE) -> Options:
+    if profile not in BROWSER_PROFILES:
+        raise ValueError(f"Unknown browser profile '{profile}'. Choose one of: {', '.join(BROWSER_PROFILES)}")
+
+    chrome_options = Options()
+    chrome_options.add_argument("--disable-notifications")
+    chrome_options.add_argument("--disable-infobars")
+    chrome_options.add_argument("--use-fake-ui-for-media-stream")
+    if profile == "full":
+        chrome_options.add_experimental_option("detach", True)
+        return chrome_options
+
+    for argument in [
+        "--headless=new",
+        f"--window-size={LEAN_WINDOW_SIZE}",
+        "--disable-gpu",
+        "--disable-gpu-compositing",
+        "--disable-extensions",
+        "--disable-sync",
+        "--disable-default-apps",
+        "--disable-background-networking",
+        "--disable-component-update",
+        "--no-first-run",
+        "--no-default-browser-check",
+        f"--renderer-process-limit={RENDERER_PROCESS_LIMIT}",
+        f"--disable-features={','.join(LEAN_DISABLED_FEATURES)}",
+        # A headless tab counts as hidden; it must not throttle the meeting's audio timers
+        "--disable-background-timer-throttling",
+        "--disable-renderer-backgrounding",
+        "--disable-backgrounding-occluded-windows",
+        "--autoplay-policy=no-user-gesture-required",
+    ]:
+        chrome_options.add_argument(argument)
+    # Images are never looked at; meeting video is handled by the window size and the stop-video step
+    chrome_options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    return chrome_options
+
+
+class VirtualAudioSink:
+    """A PulseAudio null sink owned by one session.
+
+    The session's Chrome plays into it (``PULSE_SINK`` in the driver's
+    environment) and the capture reads its ``.monitor``, so bots sharing a
+    host never hear each other's meetings.
+    """
+
+    def __init__(self, name: str, log: Callable[[str], None] = print):
+        self.name = name
+        self.log = log
+        self.module_id: Optional[str] = None
+
+    @property
+    def monitor(self) -> str:
+        return f"{self.name}.monitor"
+
+    def create(self):
+        result = subprocess.run(
+            ["pactl", "load-module", "module-null-sink", f"sink_name={self.name}",
+             f"sink_properties=device.description={self.name}"],
+            capture_output=True, text=True, check=True,
+        )
+        self.module_id = result.stdout.strip()
+        self.log(f"🔈 Created virtual audio sink {self.name}")
+
+    def remove(self):
+        if self.module_id is None:
+            return
+        try:
+            subprocess.run(["pactl", "unload-module", self.module_id], capture_output=True, check=True)
+        except Exception as e:
+            self.log(f"⚠️ Could not remove audio sink {self.name}: {e}")
+        self.module_id = None
+
+    def environment(self) -> Dict[str, str]:
+        return {**os.environ, "PULSE_SINK": self.name}
+
+
+class ResourceSampler:
+    """Samples CPU and RSS of one browser's whole process tree in the background.
+
+    The tree is rooted at the session's chromedriver, so it covers the
+    browser, GPU/utility processes and every renderer of that session and
+    nothing of the others. ``stats`` also turns the averages into a rough
+    count of such sessions one host could carry.
+    """
+
+    def __init__(self, root_pid: int, interval: float = RESOURCE_SAMPLE_INTERVAL,
+                 log: Callable[[str], None] = print):
+        self.root_pid = root_pid
+        self.interval = interval
+        self.log = log
+        self.samples: List[Dict] = []
+        self._processes: Dict[int, object] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True, name=f"resources-{self.root_pid}")
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval + 1)
+
+    def _run(self):
+        import psutil
+
+        try:
+            root = psutil.Process(self.root_pid)
+        except psutil.Error as e:
+            self.log(f"⚠️ Resource sampling unavailable: {e}")
+            return
+        while not self._stop.wait(self.interval):
+            try:
+                tree = [root] + root.children(recursive=True)
+            except psutil.Error:
+                break
+            cpu = 0.0
+            rss = 0
+            renderers = 0
+            alive = {}
+            for process in tree:
+                # cpu_percent is measured since the previous call on the same Process object
+                process = self._processes.get(process.pid, process)
+                try:
+                    cpu += process.cpu_percent(None)
+                    rss += process.memory_info().rss
+                    if "--type=renderer" in process.cmdline():
+                        renderers += 1
+                except psutil.Error:
+                    continue
+                alive[process.pid] = process
+            self._processes = alive
+            self.samples.append({"at": time.time(), "cpu_percent": round(cpu, 1),
+                                 "rss_mb": round(rss / 2 ** 20, 1), "processes": len(alive),
+                                 "renderers": renderers})
+
+    def stats(self) -> Dict:
+        import psutil
+
+        # The first sample only primes cpu_percent
+        samples = self.samples[1:] or self.samples
+        if not samples:
+            return {"samples": 0}
+        avg_cpu = sum(s["cpu_percent"] for s in samples) / len(samples)
+        peak_rss = max(s["rss_mb"] for s in samples)
+        # Browsers only; leaves 20% headroom for capture, ffmpeg and the bot itself
+        limits = []
+        if avg_cpu:
+            limits.append(psutil.cpu_count() * 100 * 0.8 / avg_cpu)
+        if peak_rss:
+            limits.append(psutil.virtual_memory().total / 2 ** 20 * 0.8 / peak_rss)
+        return {
+            "samples": len(samples),
+            "interval_s": self.interval,
+            "avg_cpu_percent": round(avg_cpu, 1),
+            "max_cpu_percent": max(s["cpu_percent"] for s in samples),
+            "avg_rss_mb": round(sum(s["rss_mb"] for s in samples) / len(samples), 1),
+            "max_rss_mb": peak_rss,
+            "max_processes": max(s["processes"] for s in samples),
+            "max_renderers": max(s["renderers"] for s in samples),
+            "est_sessions_per_host": int(min(limits)) if limits else None,
+            "timeline": self.samples,
+        }
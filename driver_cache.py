@@ -0,0 +1,178 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import threading
+import subprocess
+from datetime import datetime
+from typing import Callable, Dict, Optional
+from pipeline_checkpoint import file_sha256
+
+DRIVER_CACHE_DIR = os.getenv("DRIVER_CACHE_DIR", os.path.join("cache", "chromedriver"))
+# Use this chromedriver binary as-is and skip resolution entirely
+CHROMEDRIVER_PATH = os.getenv("CHROMEDRIVER_PATH")
+# Pin the driver version to download on a cold start instead of matching the installed Chrome
+CHROMEDRIVER_VERSION = os.getenv("CHROMEDRIVER_VERSION")
+
+MANIFEST_NAME = "manifest.json"
+DRIVER_BINARY = "chromedriver.exe" if sys.platform == "win32" else "chromedriver"
+
+CHROME_BINARIES = [
+    "google-chrome", "google-chrome-stable", "chromium", "chromium-browser",
+    "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+]
+
+
+def installed_chrome_version() -> Optional[str]:
+    """Version of the local Chrome, read without touching the network"""
+    if sys.platform == "win32":
+        import winreg
+
+        for hive in (winreg.HKEY_CURRENT_USER, winreg.HKEY_LOCAL_MACHINE):
+            try:
+                with winreg.OpenKey(hive, r"Software\Google\Chrome\BLBeacon") as key:
+                    return winreg.QueryValueEx(key, "version")[0]
+            except OSError:
+                continue
+        return None
+
+    for binary in CHROME_BINARIES:
+        try:
+            output = subprocess.run([binary, "--version"], capture_output=True, text=True, timeout=5).stdout
+        except (OSError, subprocess.TimeoutExpired):
+            continue
+        for token in output.split():
+            if token[:1].isdigit():
+                return token
+    return None
+
+
+class DriverCache:
+    """ChromeDriver binaries kept per Chrome major version, each with its checksum.
+
+    A warm start reads the manifest, checks the binary against its recorded
+    SHA-256 and returns it without any network call. Only a cold start (no
+    entry for this Chrome major, or a binary that fails its checksum) goes
+    through webdriver-manager, and the result is copied into the cache.
+    Resolution happens once per process; every session on the host reuses it.
+    """
+
+    def __init__(self, cache_dir: str = DRIVER_CACHE_DIR, log: Callable[[str], None] = print):
+        self.cache_dir = cache_dir
+        self.log = log
+        self.manifest_path = os.path.join(cache_dir, MANIFEST_NAME)
+        self._lock = threading.Lock()
+        self.resolved: Optional[Dict] = None
+
+    def _load_manifest(self) -> Dict:
+        if not os.path.exists(self.manifest_path):
+            return {}
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            self.log(f"⚠️ Ignoring unreadable driver manifest: {e}")
+            return {}
+
+    def _write_manifest(self, manifest: Dict):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def resolve(self, force: bool = False) -> Dict:
+        """Return ``{path, mode, ...}`` for a chromedriver matching the installed Chrome."""
+        with self._lock:
+            if self.resolved and not force:
+                return self.resolved
+            started = time.perf_counter()
+            if CHROMEDRIVER_PATH:
+                result = {"path": CHROMEDRIVER_PATH, "mode": "pinned_path", "chrome_version": None,
+                          "driver_version": None}
+            else:
+                result = self._resolve_cached(force)
+            result["resolve_seconds"] = round(time.perf_counter() - started, 3)
+            self.resolved = result
+            self.log(f"🧭 ChromeDriver {result['driver_version'] or ''} ({result['mode']}) "
+                     f"resolved in {result['resolve_seconds']:.3f}s")
+            return result
+
+    def _resolve_cached(self, force: bool) -> Dict:
+        chrome_version = installed_chrome_version()
+        manifest = self._load_manifest()
+        if chrome_version:
+            major = chrome_version.split(".")[0]
+        elif manifest:
+            # Can't tell which Chrome is installed; the most recently resolved driver is the best guess
+            major = max(manifest, key=lambda m: manifest[m]["resolved_at"])
+            self.log(f"⚠️ Chrome version not found, using the cached driver for Chrome {major}")
+        else:
+            major = None
+
+        entry = manifest.get(major) if major else None
+        if entry and not force:
+            if os.path.exists(entry["path"]) and file_sha256(entry["path"]) == entry["sha256"]:
+                return {"path": entry["path"], "mode": "warm", "chrome_version": chrome_version,
+                        "driver_version": entry["driver_version"]}
+            self.log(f"⚠️ Cached ChromeDriver for Chrome {major} is missing or fails its checksum, re-resolving")
+
+        return self._download(manifest, major, chrome_version)
+
+    def _download(self, manifest: Dict, major: Optional[str], chrome_version: Optional[str]) -> Dict:
+        from webdriver_manager.chrome import ChromeDriverManager
+
+        source = ChromeDriverManager(driver_version=CHROMEDRIVER_VERSION).install()
+        # webdriver-manager keeps each driver under a directory named after its version
+        driver_version = next(
+            (part for part in reversed(os.path.normpath(source).split(os.sep)) if part[:1].isdigit() and "." in part),
+            CHROMEDRIVER_VERSION or chrome_version or "unknown",
+        )
+        major = major or driver_version.split(".")[0]
+
+        target_dir = os.path.join(self.cache_dir, driver_version)
+        os.makedirs(target_dir, exist_ok=True)
+        target = os.path.join(target_dir, DRIVER_BINARY)
+        shutil.copy2(source, target)
+        manifest[major] = {
+            "path": target,
+            "driver_version": driver_version,
+            "chrome_version": chrome_version,
+            "sha256": file_sha256(target),
+            "resolved_at": datetime.now().isoformat(),
+        }
+        self._write_manifest(manifest)
+        return {"path": target, "mode": "cold", "chrome_version": chrome_version, "driver_version": driver_version}
+
+    def invalidate(self):
+        """Forget the resolved driver, e.g. after Chrome updated and refused it"""
+        with self._lock:
+            self.resolved = None
+
+
+_shared_cache: Optional[DriverCache] = None
+_shared_cache_lock = threading.Lock()
+
+
+def shared_driver_cache() -> DriverCache:
+    global _shared_cache
+    with _shared_cache_lock:
+        if _shared_cache is None:
+            _shared_cache = DriverCache()
+        return _shared_cache
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resolve ChromeDriver through the local cache and time it")
+    parser.add_argument("--cold", action="store_true", help="Ignore the cached entry and resolve from the network")
+    parser.add_argument("--cache-dir", default=DRIVER_CACHE_DIR)
+    args = parser.parse_args()
+
+    cache = DriverCache(args.cache_dir)
+    first = cache.resolve(force=args.cold)
+    cache.invalidate()
+    second = cache.resolve()
+    print(f"📊 first: {first['mode']} {first['resolve_seconds']:.3f}s, "
+          f"then: {second['mode']} {second['resolve_seconds']:.3f}s -> {second['path']}")
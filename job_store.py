@@ -0,0 +1,204 @@
+import os
+import json
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+JOBS_DB = os.getenv("JOBS_DB", "jobs.db")
+
+# A job whose worker stops renewing its lease for this long is handed to another worker
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", 300))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", 3))
+# Delay before the first retry of a failed job; doubles with every further attempt
+JOB_RETRY_DELAY_SECONDS = int(os.getenv("JOB_RETRY_DELAY_SECONDS", 60))
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+
+class JobStore:
+    """Durable queue of post-meeting pipeline jobs backed by SQLite.
+
+    Bots ``enqueue`` a recording and return right away; pipeline workers
+    ``claim`` jobs under a lease that they keep renewing while the job runs.
+    A worker that crashes simply stops renewing, and once the lease expires
+    the job is claimed again by someone else, up to ``max_attempts`` in all.
+    Several worker processes can share one database file.
+    """
+
+    def __init__(self, db_path: str = JOBS_DB):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        # Autocommit, so claims can take the write lock up front with BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=10, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                audio_path TEXT NOT NULL,
+                meeting_dir TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'queued',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                max_attempts INTEGER NOT NULL,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                not_before TEXT NOT NULL,
+                started_at TEXT,
+                finished_at TEXT,
+                lease_owner TEXT,
+                lease_expires_at TEXT,
+                last_error TEXT,
+                extra TEXT
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs (status, not_before)")
+
+    def enqueue(self, audio_path: str, meeting_dir: Optional[str] = None,
+                max_attempts: int = JOB_MAX_ATTEMPTS, extra: Optional[Dict] = None) -> int:
+        """Queue a recording for the pipeline and return the job id.
+
+        A recording that is already queued or running is not queued twice;
+        the existing job's id is returned instead.
+        """
+        audio_path = os.path.abspath(audio_path)
+        meeting_dir = os.path.abspath(meeting_dir or os.path.dirname(audio_path))
+        now = datetime.now().isoformat()
+        with self._lock:
+            existing = self._conn.execute(
+                "SELECT id FROM jobs WHERE audio_path = ? AND status IN (?, ?)",
+                (audio_path, STATUS_QUEUED, STATUS_RUNNING),
+            ).fetchone()
+            if existing:
+                return existing["id"]
+            cursor = self._conn.execute(
+                "INSERT INTO jobs (audio_path, meeting_dir, max_attempts, created_at, updated_at, not_before, extra) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (audio_path, meeting_dir, max(1, max_attempts), now, now, now, json.dumps(extra or {})),
+            )
+            return cursor.lastrowid
+
+    def claim(self, worker_id: str, lease_seconds: int = JOB_LEASE_SECONDS) -> Optional[Dict]:
+        """Take the oldest ready job (queued and due, or running with an expired lease), or None."""
+        with self._lock:
+            while True:
+                now = datetime.now()
+                self._conn.execute("BEGIN IMMEDIATE")
+                try:
+                    row = self._conn.execute(
+                        "SELECT * FROM jobs WHERE (status = ? AND not_before <= ?) "
+                        "OR (status = ? AND lease_expires_at < ?) ORDER BY created_at, id LIMIT 1",
+                        (STATUS_QUEUED, now.isoformat(), STATUS_RUNNING, now.isoformat()),
+                    ).fetchone()
+                    if row is None:
+                        self._conn.execute("COMMIT")
+                        return None
+
+                    if row["status"] == STATUS_RUNNING and row["attempts"] >= row["max_attempts"]:
+                        # Its worker died on the last allowed attempt
+                        self._conn.execute(
+                            "UPDATE jobs SET status = ?, finished_at = ?, updated_at = ?, lease_owner = NULL, "
+                            "lease_expires_at = NULL, last_error = ? WHERE id = ?",
+                            (STATUS_FAILED, now.isoformat(), now.isoformat(),
+                             f"worker {row['lease_owner']} stopped renewing its lease", row["id"]),
+                        )
+                        self._conn.execute("COMMIT")
+                        continue
+
+                    self._conn.execute(
+                        "UPDATE jobs SET status = ?, attempts = attempts + 1, lease_owner = ?, "
+                        "lease_expires_at = ?, started_at = ?, updated_at = ? WHERE id = ?",
+                        (STATUS_RUNNING, worker_id, (now + timedelta(seconds=lease_seconds)).isoformat(),
+                         now.isoformat(), now.isoformat(), row["id"]),
+                    )
+                    claimed = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+                    self._conn.execute("COMMIT")
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+                return self._row_to_dict(claimed)
+
+    def renew_lease(self, job_id: int, worker_id: str, lease_seconds: int = JOB_LEASE_SECONDS) -> bool:
+        """Extend the lease; False means the job is no longer ours (it expired and was reclaimed)."""
+        now = datetime.now()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET lease_expires_at = ?, updated_at = ? WHERE id = ? AND status = ? AND lease_owner = ?",
+                ((now + timedelta(seconds=lease_seconds)).isoformat(), now.isoformat(),
+                 job_id, STATUS_RUNNING, worker_id),
+            )
+            return cursor.rowcount > 0
+
+    def complete(self, job_id: int, worker_id: str) -> bool:
+        now = datetime.now().isoformat()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, updated_at = ?, lease_owner = NULL, "
+                "lease_expires_at = NULL, last_error = NULL WHERE id = ? AND status = ? AND lease_owner = ?",
+                (STATUS_DONE, now, now, job_id, STATUS_RUNNING, worker_id),
+            )
+            return cursor.rowcount > 0
+
+    def fail(self, job_id: int, worker_id: str, error: str,
+             retry_delay_seconds: int = JOB_RETRY_DELAY_SECONDS) -> Optional[str]:
+        """Record a failed attempt. Returns the job's new status, or None if the lease was lost."""
+        now = datetime.now()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT attempts, max_attempts FROM jobs WHERE id = ? AND status = ? AND lease_owner = ?",
+                (job_id, STATUS_RUNNING, worker_id),
+            ).fetchone()
+            if row is None:
+                return None
+            if row["attempts"] >= row["max_attempts"]:
+                status, not_before, finished_at = STATUS_FAILED, now, now.isoformat()
+            else:
+                delay = retry_delay_seconds * 2 ** (row["attempts"] - 1)
+                status, not_before, finished_at = STATUS_QUEUED, now + timedelta(seconds=delay), None
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, not_before = ?, finished_at = ?, updated_at = ?, lease_owner = NULL, "
+                "lease_expires_at = NULL, last_error = ? WHERE id = ?",
+                (status, not_before.isoformat(), finished_at, now.isoformat(), error, job_id),
+            )
+            return status
+
+    def retry(self, job_id: int) -> bool:
+        """Queue a failed (or finished) job again with a fresh set of attempts."""
+        now = datetime.now().isoformat()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = ?, attempts = 0, not_before = ?, updated_at = ?, finished_at = NULL "
+                "WHERE id = ? AND status IN (?, ?)",
+                (STATUS_QUEUED, now, now, job_id, STATUS_FAILED, STATUS_DONE),
+            )
+            return cursor.rowcount > 0
+
+    def list_jobs(self, status: Optional[str] = None) -> List[Dict]:
+        with self._lock:
+            if status:
+                rows = self._conn.execute(
+                    "SELECT * FROM jobs WHERE status = ? ORDER BY created_at, id", (status,)
+                ).fetchall()
+            else:
+                rows = self._conn.execute("SELECT * FROM jobs ORDER BY created_at, id").fetchall()
+        return [self._row_to_dict(row) for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {row[0]: row[1] for row in rows}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _row_to_dict(row: sqlite3.Row) -> Dict:
+        job = dict(row)
+        job["extra"] = json.loads(job["extra"] or "{}")
+        return job
@@ -0,0 +1,132 @@
+import os
+import json
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+
+WEBCLIENT_FRAME = (By.XPATH, '//*[@id="webclient"]')
+
+# How often readiness conditions are re-evaluated while waiting
+POLL_INTERVAL = float(os.getenv("JOIN_POLL_INTERVAL", 0.1))
+
+STEP_DONE = "done"
+STEP_SKIPPED = "skipped"
+STEP_FAILED = "failed"
+
+
+class JoinStep:
+    """One step of the Zoom join choreography.
+
+    ``ready`` is a Selenium expected condition (or any ``callable(driver)``)
+    that returns the element to act on once the step can run. ``action`` gets
+    the driver and that element. Optional steps whose condition never becomes
+    true within ``timeout`` are skipped instead of failed, and ``applies`` lets
+    a step opt out entirely based on earlier results.
+    """
+
+    def __init__(self, name: str, action: Callable,
+                 ready: Optional[Callable] = None,
+                 timeout: float = 10,
+                 retries: int = 2,
+                 optional: bool = False,
+                 in_webclient: bool = False,
+                 applies: Optional[Callable[[Dict[str, str]], bool]] = None):
+        self.name = name
+        self.action = action
+        self.ready = ready
+        self.timeout = timeout
+        self.retries = retries
+        self.optional = optional
+        self.in_webclient = in_webclient
+        self.applies = applies
+
+
+class JoinEngine:
+    """Runs JoinSteps against a driver and appends each step's timing to a trace file."""
+
+    def __init__(self, driver, trace_path: str, log: Callable[[str], None] = print):
+        self.driver = driver
+        self.trace_path = trace_path
+        self.log = log
+        self.results: Dict[str, str] = {}
+
+    def run(self, steps: List[JoinStep]) -> Dict[str, str]:
+        started = time.perf_counter()
+        for step in steps:
+            self.run_step(step)
+        self.log(f"⏱️ Join steps finished in {time.perf_counter() - started:.2f}s")
+        return self.results
+
+    def run_step(self, step: JoinStep) -> str:
+        started = time.perf_counter()
+        attempts = 0
+        error = None
+
+        if step.applies and not step.applies(self.results):
+            status = STEP_SKIPPED
+            error = "not applicable"
+        else:
+            status = STEP_FAILED
+            while attempts < step.retries:
+                attempts += 1
+                try:
+                    element = self._wait_until_ready(step)
+                    step.action(self.driver, element)
+                    status = STEP_DONE
+                    error = None
+                    break
+                except TimeoutException:
+                    error = f"not ready after {step.timeout}s"
+                    if step.optional:
+                        status = STEP_SKIPPED
+                        break
+                except Exception as e:
+                    error = str(e).splitlines()[0] if str(e) else type(e).__name__
+                finally:
+                    self._back_to_default_content()
+
+        duration = time.perf_counter() - started
+        self.results[step.name] = status
+        self._trace(step, status, duration, attempts, error)
+
+        if status == STEP_DONE:
+            self.log(f"✅ {step.name} ({duration:.2f}s)")
+        elif status == STEP_SKIPPED:
+            self.log(f"⏭️ {step.name} skipped: {error} ({duration:.2f}s)")
+        else:
+            self.log(f"❌ {step.name} failed after {attempts} attempt(s): {error} ({duration:.2f}s)")
+        return status
+
+    def _wait_until_ready(self, step: JoinStep):
+        wait = WebDriverWait(self.driver, step.timeout, poll_frequency=POLL_INTERVAL)
+        if step.in_webclient:
+            self.driver.switch_to.default_content()
+            wait.until(EC.frame_to_be_available_and_switch_to_it(WEBCLIENT_FRAME))
+        if step.ready is None:
+            return None
+        return wait.until(step.ready)
+
+    def _back_to_default_content(self):
+        try:
+            self.driver.switch_to.default_content()
+        except Exception:
+            pass
+
+    def _trace(self, step: JoinStep, status: str, duration: float, attempts: int, error: Optional[str]):
+        entry = {
+            "ts": datetime.now().isoformat(),
+            "step": step.name,
+            "status": status,
+            "duration_s": round(duration, 3),
+            "attempts": attempts,
+            "error": error,
+        }
+        try:
+            with open(self.trace_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+        except Exception as e:
+            self.log(f"⚠️ Could not write join trace: {e}")
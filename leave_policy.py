@@ -0,0 +1,162 @@
+import os
+import time
+import threading
+from typing import Callable, Dict, Optional
+import numpy as np
+from audio_capture import SAMPLE_RATE, SAMPLE_WIDTH, CHANNELS
+from audio_fanout import RingReader
+
+# Both early-leave rules are opt-in: by default the bot stays until the meeting ends or MAX_WAIT_TIME
+# Leave after this long without any audio above SILENCE_THRESHOLD_DB (0 disables)
+LEAVE_ON_SILENCE_SECONDS = float(os.getenv("LEAVE_ON_SILENCE_SECONDS", 0))
+SILENCE_THRESHOLD_DB = float(os.getenv("SILENCE_THRESHOLD_DB", -50))
+# Leave after being the only participant for this long (0 disables)
+LEAVE_WHEN_ALONE_SECONDS = float(os.getenv("LEAVE_WHEN_ALONE_SECONDS", 0))
+# Until someone else has shown up, nobody counts as having left for this long after joining
+LEAVE_GRACE_SECONDS = float(os.getenv("LEAVE_GRACE_SECONDS", 600))
+PARTICIPANT_CHECK_INTERVAL = float(os.getenv("PARTICIPANT_CHECK_INTERVAL", 10))
+
+LEAVE_SILENCE = "sustained_silence"
+LEAVE_ALONE = "empty_room"
+
+# Participant count from the footer badge, in the top document or the same-origin webclient frame.
+# count is null if the badge isn't rendered here; frame_blocked says the webclient frame
+# is cross-origin (Chrome returns a null contentDocument for it) and has to be read from inside.
+PARTICIPANT_COUNT_SCRIPT = """
+const selector = ".footer-button__number-counter, [class*='participants'] [class*='counter']";
+const docs = [document];
+const frame = document.getElementById("webclient");
+let frameBlocked = false;
+if (frame) {
+    try {
+        if (frame.contentDocument) docs.push(frame.contentDocument);
+        else frameBlocked = true;
+    } catch (e) {
+        frameBlocked = true;
+    }
+}
+for (const doc of docs) {
+    const badge = doc.querySelector(selector);
+    if (badge) {
+        const count = parseInt(badge.textContent.replace(/\\D/g, ""), 10);
+        if (!isNaN(count)) return {count: count, frame_blocked: frameBlocked};
+    }
+}
+return {count: null, frame_blocked: frameBlocked};
+"""
+
+
+class SilenceTracker:
+    """Ring consumer that follows the meeting's audio level in one-second blocks.
+
+    Only the time of the last block louder than ``threshold_db`` is kept, so
+    it costs one RMS per second of audio whatever the meeting length.
+    """
+
+    def __init__(self, reader: RingReader, threshold_db: float = SILENCE_THRESHOLD_DB,
+                 log: Callable[[str], None] = print):
+        self.reader = reader
+        self.threshold_rms = 32768 * 10 ** (threshold_db / 20)
+        self.log = log
+        self.block_bytes = SAMPLE_RATE * SAMPLE_WIDTH * CHANNELS
+        self.started_at: Optional[float] = None
+        self.last_sound_at: Optional[float] = None
+        self.longest_silence = 0.0
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self.started_at = time.monotonic()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="silence-tracker")
+        self._thread.start()
+
+    def _run(self):
+        while not self.reader.finished:
+            block = self.reader.read(self.block_bytes)
+            if not block:
+                continue
+            samples = np.frombuffer(block, dtype=np.int16).astype(np.float32)
+            if np.sqrt(np.mean(samples ** 2)) >= self.threshold_rms:
+                now = time.monotonic()
+                self.longest_silence = max(self.longest_silence, self.silent_seconds(now))
+                self.last_sound_at = now
+
+    def silent_seconds(self, now: Optional[float] = None) -> float:
+        """Seconds since the last audible block (or since tracking started)"""
+        now = now or time.monotonic()
+        return now - (self.last_sound_at or self.started_at or now)
+
+    def reset(self):
+        """Count silence from now, e.g. from the moment the bot actually joined"""
+        self.started_at = time.monotonic()
+        self.last_sound_at = None
+
+    def stats(self) -> Dict:
+        return {
+            "threshold_rms": round(self.threshold_rms, 1),
+            "longest_silence_s": round(max(self.longest_silence, self.silent_seconds()), 1),
+            "silent_at_end_s": round(self.silent_seconds(), 1),
+        }
+
+
+class LeavePolicy:
+    """Decides when the meeting is over in practice even though nobody ended it.
+
+    ``check`` is called from the monitor loop with the latest participant
+    count (None if unknown). It returns the reason to leave, or None. The
+    empty-room rule only starts counting once another participant has been
+    seen, or once ``grace_seconds`` have passed since joining, so a bot
+    that joins early isn't sent away before anyone arrives.
+    """
+
+    def __init__(self, silence: Optional[SilenceTracker],
+                 silence_seconds: float = LEAVE_ON_SILENCE_SECONDS,
+                 alone_seconds: float = LEAVE_WHEN_ALONE_SECONDS,
+                 grace_seconds: float = LEAVE_GRACE_SECONDS):
+        self.silence = silence
+        self.silence_seconds = silence_seconds
+        self.alone_seconds = alone_seconds
+        self.grace_seconds = grace_seconds
+        self.joined_at: Optional[float] = None
+        self.seen_others = False
+        self.alone_since: Optional[float] = None
+        self.max_participants = 0
+        self.last_participants: Optional[int] = None
+        self.reason: Optional[str] = None
+
+    def on_joined(self):
+        self.joined_at = time.monotonic()
+        if self.silence:
+            self.silence.reset()
+
+    def check(self, participants: Optional[int]) -> Optional[str]:
+        if self.joined_at is None:
+            return None
+        now = time.monotonic()
+
+        if self.silence and self.silence_seconds and self.silence.silent_seconds(now) >= self.silence_seconds:
+            self.reason = LEAVE_SILENCE
+            return self.reason
+
+        if participants is not None and self.alone_seconds:
+            self.last_participants = participants
+            self.max_participants = max(self.max_participants, participants)
+            if participants > 1:
+                self.seen_others = True
+                self.alone_since = None
+            elif self.alone_since is None:
+                self.alone_since = now
+            counting = self.seen_others or now - self.joined_at >= self.grace_seconds
+            if counting and self.alone_since is not None and now - self.alone_since >= self.alone_seconds:
+                self.reason = LEAVE_ALONE
+                return self.reason
+        return None
+
+    def stats(self) -> Dict:
+        return {
+            "reason": self.reason,
+            "silence_seconds": self.silence_seconds,
+            "alone_seconds": self.alone_seconds,
+            "max_participants": self.max_participants,
+            "last_participants": self.last_participants,
+            "silence": self.silence.stats() if self.silence else None,
+        }
@@ -0,0 +1,183 @@
+import os
+import time
+import threading
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional
+from selenium.webdriver.common.by import By
+from selenium.webdriver.common.keys import Keys
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+from join_engine import WEBCLIENT_FRAME, POLL_INTERVAL
+
+# Messages queued together are sent as one chat message (lines split with Shift+Enter) up to this size
+CHAT_BATCH_MAX_CHARS = int(os.getenv("CHAT_BATCH_MAX_CHARS", 1000))
+# How long a sent message may take to show up in the chat list before the send counts as failed
+CHAT_CONFIRM_TIMEOUT = float(os.getenv("CHAT_CONFIRM_TIMEOUT", 3))
+CHAT_MAX_ATTEMPTS = int(os.getenv("CHAT_MAX_ATTEMPTS", 3))
+
+# Web client chat elements. Zoom has shipped both a plain textarea and a rich-text editor for the input.
+CHAT_OPEN_BUTTON = (By.CSS_SELECTOR, 'button[aria-label*="open the chat panel" i]')
+CHAT_INPUT_SELECTORS = [
+    'div.chat-rtf-box__editor-outer [contenteditable="true"]',
+    'textarea.chat-box__chat-textarea',
+    '#chat-textarea',
+]
+CHAT_MESSAGE_SELECTOR = '.chat-message__text-content, .new-chat-message__text-content, .chat-item__chat-info-msg'
+
+# Text of every chat message currently rendered, oldest first
+CHAT_MESSAGES_SCRIPT = """
+return Array.from(document.querySelectorAll(arguments[0]), el => el.textContent.replace(/\\s+/g, " ").trim());
+"""
+
+
+class MeetingChat:
+    """The meeting's chat panel, driven through this session's own WebDriver.
+
+    ``post`` only queues a message, so trigger handlers on any thread return
+    immediately. The thread that owns the driver calls ``flush``, which sends
+    everything queued as one message inside the webclient frame and confirms
+    delivery by waiting for the text to appear in the chat list. Failed sends
+    go back to the front of the queue until ``CHAT_MAX_ATTEMPTS``; if the
+    chat list can't be read at all, a send counts as unconfirmed instead of
+    being retried into duplicates. Nothing touches the desktop, so it works
+    headless and side by side with other sessions.
+    """
+
+    def __init__(self, driver, wake: Optional[threading.Event] = None, log: Callable[[str], None] = print):
+        self.driver = driver
+        self.wake = wake
+        self.log = log
+        self.pending: Deque[Dict] = deque()
+        self._lock = threading.Lock()
+        self.panel_open = False
+        self.sent = 0
+        self.batches = 0
+        self.retries = 0
+        self.unconfirmed = 0
+        self.failed: List[str] = []
+        self.latencies_ms: List[float] = []
+
+    def post(self, message: str):
+        """Queue a message for the next flush; safe to call from any thread."""
+        with self._lock:
+            self.pending.append({"text": message, "queued_at": time.perf_counter(), "attempts": 0})
+        if self.wake:
+            self.wake.set()
+
+    @property
+    def has_pending(self) -> bool:
+        return bool(self.pending)
+
+    def _next_batch(self) -> List[Dict]:
+        with self._lock:
+            batch = [self.pending.popleft()] if self.pending else []
+            size = len(batch[0]["text"]) if batch else 0
+            while self.pending and size + 1 + len(self.pending[0]["text"]) <= CHAT_BATCH_MAX_CHARS:
+                size += 1 + len(self.pending[0]["text"])
+                batch.append(self.pending.popleft())
+            return batch
+
+    def flush(self) -> int:
+        """Send everything queued; call only from the thread that drives the browser. Returns messages sent."""
+        delivered = 0
+        while self.pending:
+            batch = self._next_batch()
+            try:
+                confirmed = self._send([item["text"] for item in batch])
+            except Exception as e:
+                self._requeue(batch, e)
+                # Leave the rest for the next flush rather than hammering a broken panel
+                break
+            now = time.perf_counter()
+            for item in batch:
+                self.latencies_ms.append(round((now - item["queued_at"]) * 1000, 1))
+            self.sent += len(batch)
+            self.unconfirmed += 0 if confirmed else len(batch)
+            self.batches += 1
+            delivered += len(batch)
+            self.log(f"✅ Sent {len(batch)} chat message(s)")
+        return delivered
+
+    def _requeue(self, batch: List[Dict], error: Exception):
+        self.panel_open = False
+        retry = []
+        for item in batch:
+            item["attempts"] += 1
+            if item["attempts"] >= CHAT_MAX_ATTEMPTS:
+                self.failed.append(item["text"])
+                self.log(f"❌ Failed to send chat message after {item['attempts']} attempt(s): {error}")
+            else:
+                retry.append(item)
+        if retry:
+            self.retries += 1
+            self.log(f"⚠️ Chat send failed, will retry: {error}")
+            with self._lock:
+                self.pending.extendleft(reversed(retry))
+
+    def _send(self, lines: List[str]) -> bool:
+        """Type ``lines`` as one message; returns False if the chat list can't be read to confirm it."""
+        driver = self.driver
+        wait = WebDriverWait(driver, 5, poll_frequency=POLL_INTERVAL)
+        driver.switch_to.default_content()
+        try:
+            wait.until(EC.frame_to_be_available_and_switch_to_it(WEBCLIENT_FRAME))
+            chat_input = self._chat_input(wait)
+            before = driver.execute_script(CHAT_MESSAGES_SCRIPT, CHAT_MESSAGE_SELECTOR)
+
+            keys = []
+            for i, line in enumerate(lines):
+                if i:
+                    keys += [Keys.SHIFT, Keys.ENTER, Keys.NULL]
+                keys.append(line)
+            chat_input.send_keys(*keys, Keys.ENTER)
+
+            expected = " ".join(lines[-1].split())
+            try:
+                WebDriverWait(driver, CHAT_CONFIRM_TIMEOUT, poll_frequency=POLL_INTERVAL).until(
+                    lambda d: self._delivered(before, d.execute_script(CHAT_MESSAGES_SCRIPT, CHAT_MESSAGE_SELECTOR),
+                                              expected)
+                )
+            except TimeoutException:
+                if not driver.execute_script(CHAT_MESSAGES_SCRIPT, CHAT_MESSAGE_SELECTOR):
+                    # No messages matched at all, so the list markup changed; retrying would only post duplicates
+                    return False
+                raise RuntimeError(f"message not shown in the chat within {CHAT_CONFIRM_TIMEOUT}s")
+            return True
+        finally:
+            driver.switch_to.default_content()
+
+    def _chat_input(self, wait: WebDriverWait):
+        if not self.panel_open:
+            # The panel may already be open, in which case there is no open button to click
+            buttons = self.driver.find_elements(*CHAT_OPEN_BUTTON)
+            if buttons:
+                buttons[0].click()
+            self.panel_open = True
+        return wait.until(lambda d: next(
+            (el for selector in CHAT_INPUT_SELECTORS for el in d.find_elements(By.CSS_SELECTOR, selector)
+             if el.is_displayed()),
+            False,
+        ))
+
+    @staticmethod
+    def _delivered(before: List[str], after: List[str], expected: str) -> bool:
+        # The list is virtualized in long meetings, so compare what is new rather than counts alone
+        if len(after) > len(before):
+            new = after[len(before):]
+        elif after[-1:] != before[-1:]:
+            new = after[-1:]
+        else:
+            new = []
+        return any(expected in text for text in new)
+
+    def stats(self) -> Dict:
+        return {
+            "sent": self.sent,
+            "batches": self.batches,
+            "retries": self.retries,
+            "unconfirmed": self.unconfirmed,
+            "pending": len(self.pending),
+            "failed": self.failed,
+            "queue_to_confirmed_ms": self.latencies_ms,
+        }
@@ -0,0 +1,157 @@
+import os
+import time
+from typing import Callable, Dict, List, Optional
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import JavascriptException
+
+# Text the Zoom web client shows for the states we care about. The observer
+# matches these case-insensitively against the page text.
+EVENT_PATTERNS = {
+    "meeting_ended": ["this meeting has been ended by host"],
+    "removed": ["you have been removed from this meeting", "the host has removed you from this meeting"],
+    "waiting_room": ["please wait, the meeting host will let you in soon", "host has joined. we've let them know you're here"],
+}
+
+# Events after which the bot should leave
+TERMINAL_EVENTS = {"meeting_ended", "removed"}
+
+# Mutation bursts are coalesced into at most one page scan per this many milliseconds
+SCAN_THROTTLE_MS = int(os.getenv("OBSERVER_SCAN_THROTTLE_MS", 250))
+
+# Installs (or re-installs after a reload) a MutationObserver on the top document
+# and the webclient iframe, then hands back and clears the queued events. The
+# whole round trip is a single execute_script call.
+DRAIN_SCRIPT = """
+const patterns = arguments[0];
+const throttleMs = arguments[1];
+if (!window.__proxyMeet) {
+    window.__proxyMeet = {queue: [], state: {}, observed: []};
+}
+const pm = window.__proxyMeet;
+
+// Each document keeps its own matches; an event is queued only when the OR over all
+// observed documents changes, so a phrase shown in one document and not the other can't flap.
+function scan(doc) {
+    const text = (doc.body && doc.body.textContent || "").toLowerCase();
+    const docState = doc.__proxyMeetState || (doc.__proxyMeetState = {});
+    for (const [type, phrases] of Object.entries(patterns)) {
+        docState[type] = phrases.some(p => text.includes(p));
+    }
+    pm.observed = pm.observed.filter(d => d.defaultView);
+    for (const type of Object.keys(patterns)) {
+        const present = pm.observed.some(d => d.__proxyMeetState && d.__proxyMeetState[type]);
+        if (present !== !!pm.state[type]) {
+            pm.state[type] = present;
+            pm.queue.push({type: type, present: present, ts: Date.now()});
+        }
+    }
+}
+
+function observe(doc) {
+    if (!doc || !doc.body || pm.observed.includes(doc)) {
+        return;
+    }
+    let pending = false;
+    const observer = new MutationObserver(() => {
+        if (pending) {
+            return;
+        }
+        pending = true;
+        setTimeout(() => { pending = false; scan(doc); }, throttleMs);
+    });
+    observer.observe(doc.body, {childList: true, subtree: true, characterData: true});
+    pm.observed = pm.observed.filter(d => d.defaultView);
+    pm.observed.push(doc);
+    scan(doc);
+}
+
+observe(document);
+let frameStatus = "missing";
+const frame = document.getElementById("webclient");
+if (frame) {
+    if (!frame.__proxyMeetLoad) {
+        frame.__proxyMeetLoad = true;
+        frame.addEventListener("load", () => { frame.__proxyMeetLoaded = true; });
+    }
+    try {
+        const doc = frame.contentDocument;
+        observe(doc);
+        if (doc) {
+            frameStatus = "observed";
+        } else if (frame.contentWindow && (frame.__proxyMeetLoaded || document.readyState === "complete")) {
+            // Chrome hands back null rather than throwing for a loaded cross-origin frame
+            frameStatus = "cross-origin";
+        } else {
+            frameStatus = "loading";
+        }
+    } catch (e) {
+        frameStatus = "cross-origin";
+    }
+}
+
+const events = pm.queue;
+pm.queue = [];
+return {events: events, frame: frameStatus};
+"""
+
+
+class MeetingEventObserver:
+    """Push-based meeting state detection for one browser session.
+
+    Instead of re-querying the DOM on every poll, a MutationObserver living in
+    the page records state changes (meeting ended, removed, waiting room) into
+    a page-side queue. ``drain()`` collects them in one WebDriver round trip.
+    If the webclient iframe turns out to be cross-origin, the observer is
+    installed inside the frame instead and each drain switches into it.
+    """
+
+    def __init__(self, driver, log: Callable[[str], None] = print):
+        self.driver = driver
+        self.log = log
+        self.frame_status: Optional[str] = None
+        self.in_waiting_room = False
+        self.in_frame = False
+        self.drains = 0
+        self.events_seen = 0
+
+    def drain(self) -> List[Dict]:
+        """Return new events since the last drain. WebDriver errors propagate to the caller."""
+        try:
+            if self.in_frame:
+                result = self._drain_inside_frame()
+            else:
+                result = self.driver.execute_script(DRAIN_SCRIPT, EVENT_PATTERNS, SCAN_THROTTLE_MS)
+        except JavascriptException as e:
+            self.log(f"⚠️ Meeting observer script failed: {e}")
+            return []
+
+        self.drains += 1
+        if result["frame"] != self.frame_status and not self.in_frame:
+            self.frame_status = result["frame"]
+            self.log(f"👁️ Meeting observer: webclient frame {self.frame_status}")
+            if self.frame_status == "cross-origin":
+                self.log("👁️ Meeting observer: switching to in-frame mode")
+                self.in_frame = True
+
+        now_ms = time.time() * 1000
+        events = []
+        for event in result["events"]:
+            event["latency_ms"] = max(0.0, now_ms - event["ts"])
+            if event["type"] == "waiting_room":
+                self.in_waiting_room = event["present"]
+            events.append(event)
+        self.events_seen += len(events)
+        return events
+
+    def _drain_inside_frame(self) -> Dict:
+        driver = self.driver
+        driver.switch_to.default_content()
+        try:
+            driver.switch_to.frame(driver.find_element(By.ID, "webclient"))
+            return driver.execute_script(DRAIN_SCRIPT, EVENT_PATTERNS, SCAN_THROTTLE_MS)
+        finally:
+            driver.switch_to.default_content()
+
+    @staticmethod
+    def is_terminal(event: Dict) -> bool:
+        return event["type"] in TERMINAL_EVENTS and event["present"]
@@ -1,12 +1,45 @@
 import os
+import json
 import logging
-from utils import process_transcription
-from agents import run_crew_analysis
-from notion_logger import log_meeting_notes
+import time
+import argparse
+from contextlib import contextmanager, nullcontext
+from utils import (
+    process_transcription,
+    load_transcript_from_file,
+    load_live_transcript,
+    build_transcript_from_live,
+    save_transcript_locally,
+    save_transcript_as_text,
+    LIVE_TRANSCRIPT_NAME,
+)
+from agents import run_crew_analysis, crew_prompt_digest, CREW_MODEL
+from notion_logger import log_meeting_notes, NOTION_DATABASE_ID
+from pipeline_metrics import PipelineMetrics, METRICS_NAME
+from transcript_cache import audio_duration_seconds
+from pipeline_checkpoint import (
+    PipelineCheckpoint,
+    file_sha256,
+    hash_inputs,
+    PIPELINE_STAGES,
+    STAGE_TRANSCRIBE,
+    STAGE_ANALYZE,
+    STAGE_NOTION,
+)
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+# Where the meeting transcript comes from when no transcript is passed in:
+# "batch" re-transcribes the recording, "live" reuses the realtime utterances saved during
+# the meeting, "hybrid" reuses them but re-transcribes the low-confidence spans
+TRANSCRIPT_SOURCE = os.getenv("TRANSCRIPT_SOURCE", "batch").lower()
+LIVE_MIN_CONFIDENCE = float(os.getenv("LIVE_MIN_CONFIDENCE", 0.6))
+
+# Transcript kept as the transcription stage's checkpoint
+CHECKPOINT_TRANSCRIPT_NAME = "pipeline_transcript.json"
+NOTE_FILES = ("Meeting_Notes.md", "Meeting_Notes2.md")
+
 def flatten_transcript(transcript_obj) -> str:
     """Convert structured transcript into flat string format for CrewAI input."""
     if not transcript_obj or not transcript_obj.speakers_text:
@@ -14,12 +47,80 @@ def flatten_transcript(transcript_obj) -> str:
     
     return "\n".join([f"{item.speaker}: {item.text}" for item in transcript_obj.speakers_text])
 
-def process_file(audio_path):
+def transcript_from_live(audio_path):
+    """Transcript built from the live_transcript.jsonl next to the recording, or None."""
+    live_path = os.path.join(os.path.dirname(audio_path), LIVE_TRANSCRIPT_NAME)
+    if not os.path.exists(live_path):
+        print(f"⚠️ No {LIVE_TRANSCRIPT_NAME} next to the recording, falling back to batch transcription")
+        return None
+
+    utterances = load_live_transcript(live_path)
+    hybrid = TRANSCRIPT_SOURCE == "hybrid"
+    transcript = build_transcript_from_live(audio_path, utterances, LIVE_MIN_CONFIDENCE,
+                                            retranscribe_low_confidence=hybrid)
+    if transcript is None:
+        print("⚠️ Live transcript is empty, falling back to batch transcription")
+        return None
+
+    method = "Live+Batch" if hybrid else "Live"
+    save_transcript_locally(transcript, audio_path, method_used=method)
+    save_transcript_as_text(transcript, audio_path, method_used=method)
+    return transcript
+
+def transcript_inputs(audio_path, transcript=None):
+    """Hash of everything the transcript stage depends on"""
+    if transcript is not None and transcript.speakers_text:
+        return hash_inputs("provided", flatten_transcript(transcript))
+    live_path = os.path.join(os.path.dirname(audio_path), LIVE_TRANSCRIPT_NAME)
+    live_hash = None
+    if TRANSCRIPT_SOURCE in ("live", "hybrid") and os.path.exists(live_path):
+        live_hash = file_sha256(live_path)
+    return hash_inputs("recording", file_sha256(audio_path), TRANSCRIPT_SOURCE, LIVE_MIN_CONFIDENCE, live_hash)
+
+def save_checkpoint_transcript(transcript, path):
+    """Write the transcript in the layout load_transcript_from_file reads"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"transcript": [item.model_dump() for item in transcript.speakers_text]}, f,
+                  indent=2, ensure_ascii=False)
+
+class PipelineCancelled(Exception):
+    """The run was told to stop between stages, e.g. because its worker lost the job's lease"""
+
+def check_cancelled(cancel, before):
+    if cancel is not None and cancel.is_set():
+        raise PipelineCancelled(f"Pipeline cancelled before {before}")
+
+def stage_limit(limits, stage):
+    """The lock or semaphore capping how many runs may do ``stage`` at once, if any"""
+    return (limits or {}).get(stage) or nullcontext()
+
+@contextmanager
+def stage_span(metrics, limits, stage, **attrs):
+    """Wait for the stage's limit, then time the stage; the wait is kept out of the duration as queued_s"""
+    started = time.perf_counter()
+    with stage_limit(limits, stage):
+        queued_s = round(time.perf_counter() - started, 3)
+        with metrics.span(stage, queued_s=queued_s, **attrs) as span:
+            yield span
+
+def process_file(audio_path, transcript=None, notes_dir=".", resume=False, from_stage=None, limits=None,
+                 cancel=None):
     """
     Main processing function that handles the entire meeting pipeline:
-    1. Transcription (with fallback)
-    2. AI analysis
+    1. Transcription (with fallback) - skipped when a transcript is passed in,
+       e.g. one assembled from segments transcribed during the meeting, or
+       when TRANSCRIPT_SOURCE reuses the live realtime transcript
+    2. AI analysis - Meeting_Notes*.md are written into notes_dir
     3. Notion logging
+
+    Every stage that succeeds is checkpointed in pipeline_state.json next to
+    the recording. With ``resume`` stages whose checkpoint is still valid are
+    skipped; ``from_stage`` reruns that stage and the ones after it.
+    ``limits`` maps stage names to semaphores shared by concurrent runs, so
+    each external service sees a bounded number of requests.
+    ``cancel`` is an optional threading.Event checked before each stage and
+    checkpoint; once set the run raises PipelineCancelled and records nothing more.
+    Timings, calls, tokens and costs of the run are written to metrics.json.
     """
     print("🎵 Starting meeting processing pipeline...")
     
@@ -32,13 +133,64 @@ def process_file(audio_path):
         raise Exception(f"❌ Audio file is empty: {audio_path}")
     
     print(f"🔍 Processing audio file: {audio_path} ({file_size} bytes)")
+    meeting_dir = os.path.dirname(os.path.abspath(audio_path))
+    metrics = PipelineMetrics(meeting_dir, audio_path)
+    metrics.activate()
+    try:
+        with metrics.span("pipeline", resume=resume, from_stage=from_stage):
+            results = run_stages(metrics, audio_path, meeting_dir, transcript, notes_dir, resume, from_stage, limits,
+                                 cancel)
+    except PipelineCancelled as e:
+        metrics.write("cancelled", str(e))
+        raise
+    except Exception as e:
+        metrics.write("error", str(e))
+        raise
+    finally:
+        metrics.deactivate()
+    metrics.write()
+    print(f"📊 Stage timings written to {os.path.join(meeting_dir, METRICS_NAME)}")
+    return results
+
+def run_stages(metrics, audio_path, meeting_dir, transcript, notes_dir, resume, from_stage, limits, cancel):
+    """The pipeline stages proper; see process_file"""
+    checkpoint = PipelineCheckpoint(meeting_dir, resume=resume, from_stage=from_stage)
     
     # Step 1: Transcription with built-in fallback and error handling
-    print("🔍 Transcribing audio (AssemblyAI → Gemini fallback)...")
-    transcript = process_transcription(audio_path)
+    transcript_hash = transcript_inputs(audio_path, transcript)
+    transcript_path = os.path.join(meeting_dir, CHECKPOINT_TRANSCRIPT_NAME)
+    transcript_reused = checkpoint.reusable(STAGE_TRANSCRIBE, transcript_hash) is not None
+    # Only a run that actually transcribes has to wait its turn for the transcription services
+    transcribing = not transcript_reused and not (transcript is not None and transcript.speakers_text)
+    with stage_span(metrics, limits if transcribing else None, STAGE_TRANSCRIBE,
+                    audio_bytes=os.path.getsize(audio_path)) as span:
+        span["audio_seconds"] = audio_duration_seconds(audio_path)
+        if transcript_reused:
+            span["source"] = "checkpoint"
+            transcript = load_transcript_from_file(transcript_path)
+        elif transcript is not None and transcript.speakers_text:
+            span["source"] = "segments"
+            print("♻️ Using transcript assembled from segments transcribed during the meeting")
+        else:
+            transcript = None
+            if TRANSCRIPT_SOURCE in ("live", "hybrid"):
+                transcript = transcript_from_live(audio_path)
+                if transcript is not None:
+                    span["source"] = TRANSCRIPT_SOURCE
+                    print(f"♻️ Using the live transcript from the meeting ({TRANSCRIPT_SOURCE})")
+            if transcript is None:
+                span["source"] = "batch"
+                print("🔍 Transcribing audio (AssemblyAI → Gemini fallback)...")
+                transcript = process_transcription(audio_path)
+
+        if transcript is None or not transcript.speakers_text:
+            raise Exception("❗ Transcription failed using both AssemblyAI and Gemini, or transcript is empty.")
 
-    if transcript is None or not transcript.speakers_text:
-        raise Exception("❗ Transcription failed using both AssemblyAI and Gemini, or transcript is empty.")
+        if not transcript_reused:
+            check_cancelled(cancel, "saving the transcript")
+            save_checkpoint_transcript(transcript, transcript_path)
+            checkpoint.record(STAGE_TRANSCRIBE, transcript_hash, files=[transcript_path])
+        span["utterances"] = len(transcript.speakers_text)
 
     print(f"✅ Transcription completed! Found {len(transcript.speakers_text)} utterances")
     
@@ -52,25 +204,53 @@ def process_file(audio_path):
     print(f"📄 Transcript prepared ({len(transcript_text)} characters)")
 
     # Step 3: AI Analysis
-    print("🤖 Running AI crew analysis...")
-    try:
-        ai_results = run_crew_analysis(transcript_text)
-        print("✅ AI analysis completed!")
-    except Exception as e:
-        print(f"⚠️ AI analysis failed: {e}")
-        # You might want to decide if this should be fatal or continue to logging
-        logging.error(f"AI analysis failed: {e}")
-        ai_results = None
+    check_cancelled(cancel, STAGE_ANALYZE)
+    analysis_hash = hash_inputs(transcript_text, CREW_MODEL, crew_prompt_digest())
+    note_files = [os.path.join(notes_dir, name) for name in NOTE_FILES]
+    ai_results = checkpoint.reusable(STAGE_ANALYZE, analysis_hash)
+    if ai_results is not None:
+        metrics.skipped(STAGE_ANALYZE, "checkpoint")
+    else:
+        print("🤖 Running AI crew analysis...")
+        try:
+            with stage_span(metrics, limits, STAGE_ANALYZE, model=CREW_MODEL, transcript_chars=len(transcript_text)):
+                ai_results = run_crew_analysis(transcript_text, notes_dir)
+            print("✅ AI analysis completed!")
+            check_cancelled(cancel, "recording the analysis checkpoint")
+            if all(os.path.exists(path) for path in note_files):
+                checkpoint.record(STAGE_ANALYZE, analysis_hash,
+                                  outputs={key: str(value) for key, value in ai_results.items()},
+                                  files=note_files)
+        except PipelineCancelled:
+            raise
+        except Exception as e:
+            print(f"⚠️ AI analysis failed: {e}")
+            # You might want to decide if this should be fatal or continue to logging
+            logging.error(f"AI analysis failed: {e}")
+            ai_results = None
 
     # Step 4: Notion logging
-    print("📝 Logging results to Notion...")
-    try:
-        log_meeting_notes()  # This reads Meeting_Notes.md + Meeting_Notes2.md
-        print("✅ Notion logging completed!")
-    except Exception as e:
-        print(f"⚠️ Notion logging failed: {e}")
-        logging.error(f"Notion logging failed: {e}")
-        # Continue execution even if Notion logging fails
+    check_cancelled(cancel, STAGE_NOTION)
+    notes_path = os.path.join(notes_dir, "Meeting_Notes2.md")
+    notion_hash = hash_inputs(file_sha256(notes_path) if os.path.exists(notes_path) else None, NOTION_DATABASE_ID)
+    if checkpoint.reusable(STAGE_NOTION, notion_hash) is not None:
+        metrics.skipped(STAGE_NOTION, "checkpoint")
+    else:
+        print("📝 Logging results to Notion...")
+        try:
+            with stage_span(metrics, limits, STAGE_NOTION) as span:
+                result = log_meeting_notes(notes_dir)  # This reads Meeting_Notes2.md from notes_dir
+                span["result"] = result
+                span["ok"] = result in ("Success", "Duplicate prevented")
+            if span["ok"]:
+                checkpoint.record(STAGE_NOTION, notion_hash, outputs={"result": result})
+                print("✅ Notion logging completed!")
+            else:
+                print(f"⚠️ Notion logging did not complete: {result}")
+        except Exception as e:
+            print(f"⚠️ Notion logging failed: {e}")
+            logging.error(f"Notion logging failed: {e}")
+            # Continue execution even if Notion logging fails
 
     print("🎉 Meeting processing pipeline completed successfully!")
     
@@ -82,15 +262,27 @@ def process_file(audio_path):
         'audio_file': audio_path
     }
 
-def process_file_safe(audio_path):
+def process_file_safe(audio_path, transcript=None, notes_dir=".", resume=False, from_stage=None, limits=None,
+                      cancel=None):
     """
     Safe wrapper for process_file that handles exceptions gracefully.
     Use this if you want the program to continue even if processing fails.
     """
     try:
-        return process_file(audio_path)
+        return process_file(audio_path, transcript, notes_dir, resume, from_stage, limits, cancel)
     except Exception as e:
         print(f"❌ Meeting processing failed: {e}")
         logging.error(f"Meeting processing failed for {audio_path}: {e}", exc_info=True)
         return None
 
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the meeting pipeline on a recording")
+    parser.add_argument("audio_path", help="Recording to process, e.g. archives/meeting_*/recording.mp3")
+    parser.add_argument("--resume", action="store_true", help="Skip stages whose checkpoint is still valid")
+    parser.add_argument("--from-stage", choices=PIPELINE_STAGES,
+                        help="Rerun this stage and the ones after it, reusing checkpoints before it")
+    parser.add_argument("--notes-dir", help="Where to write Meeting_Notes*.md (default: the recording's folder)")
+    args = parser.parse_args()
+
+    process_file(args.audio_path, notes_dir=args.notes_dir or os.path.dirname(os.path.abspath(args.audio_path)),
+                 resume=args.resume, from_stage=args.from_stage)
@@ -1,55 +1,69 @@
 import streamlit as st
 from datetime import datetime
-import json
-import os
 import subprocess
+from schedule_store import (
+    ScheduleStore,
+    STATUS_PENDING,
+    DEFAULT_BOT_NAME,
+    DEFAULT_BOT_DISPLAY_NAME,
+    DEFAULT_PREWARM_SECONDS,
+    notify_dispatcher,
+)
 
 st.set_page_config(page_title="Zoom Meeting Scheduler", layout="centered")
 st.title("🕒 Schedule a Zoom Meeting with Proxy-Meet Bot")
 
+store = ScheduleStore()
+
 # 1. Inputs
 date = st.date_input("Select meeting date")
 time_input = st.time_input("Select meeting time")
 zoom_link = st.text_input("Enter your Zoom link", placeholder="https://zoom.us/j/123...")
+bot_display_name = st.text_input("Bot display name", value=DEFAULT_BOT_DISPLAY_NAME)
+bot_name = st.text_input("Name the bot responds to", value=DEFAULT_BOT_NAME)
+prewarm_seconds = st.number_input(
+    "Pre-warm lead time (seconds)", min_value=0, max_value=900, value=DEFAULT_PREWARM_SECONDS,
+    help="The bot starts this early, gets through the join screens and joins right at the meeting time.",
+)
 
 # 2. On button click
 if st.button("✅ Schedule Meeting"):
-    meeting_datetime = datetime.combine(date, time_input)
+    if not zoom_link.strip():
+        st.error("❌ Please enter a Zoom link")
+    else:
+        meeting_datetime = datetime.combine(date, time_input)
 
-    # --- Update .env ---
-    env_file = ".env"
-    env_updated = False
-    new_lines = []
+        # --- Queue the meeting (each entry keeps its own link and bot identity) ---
+        meeting_id = store.add_meeting(
+            zoom_link.strip(),
+            meeting_datetime,
+            bot_name=bot_name.strip().lower() or DEFAULT_BOT_NAME,
+            bot_display_name=bot_display_name.strip() or DEFAULT_BOT_DISPLAY_NAME,
+            prewarm_seconds=int(prewarm_seconds),
+        )
 
-    if os.path.exists(env_file):
-        with open(env_file, "r") as f:
-            lines = f.readlines()
-    else:
-        lines = []
-
-    for line in lines:
-        if line.startswith("ZOOM_LINK="):
-            new_lines.append(f'ZOOM_LINK="{zoom_link}"\n')
-            env_updated = True
-        else:
-            new_lines.append(line)
-
-    if not env_updated:
-        new_lines.append(f'ZOOM_LINK="{zoom_link}"\n')
-
-    with open(env_file, "w") as f:
-        f.writelines(new_lines)
-
-    # --- Save datetime to file ---
-    with open("scheduled_meeting.json", "w") as f:
-        f.write(meeting_datetime.isoformat())
-
-    # --- Feedback ---
-    st.success(f"✅ Meeting scheduled for {meeting_datetime.strftime('%Y-%m-%d %H:%M')}")
-    st.info("⏳ Background scheduler started — Zoom bot will launch at that time.")
-
-    # --- Auto-run scheduler_runner.py ---
-    try:
-        subprocess.Popen(["python", "scheduler_runner.py"])
-    except Exception as e:
-        st.error(f"❌ Failed to start scheduler: {e}")
+        # --- Feedback ---
+        st.success(f"✅ Meeting #{meeting_id} scheduled for {meeting_datetime.strftime('%Y-%m-%d %H:%M')}")
+
+        # --- Make sure the dispatcher is running, then wake it ---
+        # scheduler_runner.py exits straight away if another instance already owns the schedule.
+        try:
+            subprocess.Popen(["python", "scheduler_runner.py"])
+        except Exception as e:
+            st.error(f"❌ Failed to start scheduler: {e}")
+        notify_dispatcher()
+        st.info("⏳ Background scheduler notified — Zoom bot will launch at that time.")
+
+# 3. Upcoming meetings
+st.subheader("📋 Upcoming Meetings")
+pending = store.list_meetings(STATUS_PENDING)
+if not pending:
+    st.caption("No meetings queued.")
+for meeting in pending:
+    cols = st.columns([3, 2, 1])
+    cols[0].write(meeting["zoom_link"])
+    cols[1].write(f"{meeting['scheduled_at'].strftime('%Y-%m-%d %H:%M')} · {meeting['bot_display_name']}")
+    if cols[2].button("Cancel", key=f"cancel_{meeting['id']}"):
+        store.cancel_meeting(meeting["id"])
+        notify_dispatcher()
+        st.rerun()
@@ -1,10 +1,13 @@
 import os
+import time
 import socket
 import requests
+from urllib.parse import urlparse
+from pipeline_metrics import record_http
 from dotenv import load_dotenv
 import re
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 # --- FORCE IPv4 CONFIGURATION ---
 def force_ipv4_globally():
@@ -81,12 +84,16 @@ def ipv4_safe_request(method, url, **kwargs):
     """Wrapper to ensure Notion API calls use IPv4 and handle errors gracefully"""
     try:
         print(f"🌐 Making {method.upper()} request to Notion via IPv4...")
+        started = time.perf_counter()
         if method.lower() == 'post':
             response = requests.post(url, **kwargs)
         elif method.lower() == 'get':
             response = requests.get(url, **kwargs)
         else:
             response = requests.request(method, url, **kwargs)
+        record_http("notion", method.upper(), urlparse(url).path, (time.perf_counter() - started) * 1000,
+                    status=response.status_code, ok=response.ok,
+                    bytes_sent=len(response.request.body or b"") if response.request else None)
         
         print(f"✅ Notion API call completed via IPv4 (Status: {response.status_code})")
         return response
@@ -685,8 +692,12 @@ def create_notion_entry(metadata: Dict) -> str:
         print(f"❌ Error: {str(e)}")
         return f"Error: {str(e)}"
 
-def log_meeting_notes():
-    """Log Meeting_Notes2.md to Notion - COMPREHENSIVE PARSING"""
+def log_meeting_notes(notes_dir: str = ".") -> Optional[str]:
+    """Log Meeting_Notes2.md (from notes_dir) to Notion - COMPREHENSIVE PARSING
+
+    Returns the result of creating the entry ("Success", "Duplicate prevented"
+    or "Error: ..."), or None if there was nothing to log.
+    """
     print("📝 Creating Notion entry from Meeting_Notes2.md...")
     print("🚀 COMPREHENSIVE ACTION ITEM EXTRACTION - All formats supported!")
     print("🛡️  DUPLICATE PREVENTION - Won't create duplicates!")
@@ -695,7 +706,7 @@ def log_meeting_notes():
         print("❌ Missing NOTION_API_KEY or NOTION_DATABASE_ID")
         return
     
-    filename = "Meeting_Notes2.md"
+    filename = os.path.join(notes_dir, "Meeting_Notes2.md")
     
     if not os.path.exists(filename):
         print(f"❌ {filename} not found")
@@ -731,9 +742,11 @@ def log_meeting_notes():
         # Create Notion entry
         result = create_notion_entry(metadata)
         print(f"🏁 Result: {result}")
+        return result
         
     except Exception as e:
         print(f"❌ Error processing file: {str(e)}")
+        return f"Error: {str(e)}"
 
 if __name__ == "__main__":
     log_meeting_notes()
\ No newline at end of file
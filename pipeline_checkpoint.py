@@ -0,0 +1,110 @@
+import os
+import json
+import hashlib
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Optional
+
+PIPELINE_STATE_NAME = "pipeline_state.json"
+
+STAGE_TRANSCRIBE = "transcribe"
+STAGE_ANALYZE = "analyze"
+STAGE_NOTION = "notion"
+PIPELINE_STAGES = (STAGE_TRANSCRIBE, STAGE_ANALYZE, STAGE_NOTION)
+
+
+# Recently hashed files, so a recording hashed by several stages is read only once. Bounded
+# because worker and batch processes live for many meetings.
+DIGEST_MEMO_SIZE = 64
+_digests: "OrderedDict[tuple, str]" = OrderedDict()
+
+
+def file_sha256(path: str) -> str:
+    """SHA-256 of a file, read in 1 MiB blocks so long recordings never sit in memory"""
+    stat = os.stat(path)
+    # ctime changes on any rewrite, including one that restores the mtime
+    memo_key = (os.path.abspath(path), stat.st_ino, stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns)
+    if memo_key in _digests:
+        _digests.move_to_end(memo_key)
+        return _digests[memo_key]
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    _digests[memo_key] = digest.hexdigest()
+    if len(_digests) > DIGEST_MEMO_SIZE:
+        _digests.popitem(last=False)
+    return _digests[memo_key]
+
+
+def hash_inputs(*parts) -> str:
+    """Stable hash of a stage's inputs and the config that affects its output"""
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class PipelineCheckpoint:
+    """Per-meeting record of which pipeline stages finished, and on what inputs.
+
+    Each stage is stored in ``pipeline_state.json`` in the meeting folder
+    with the hash of its inputs and config, and the SHA-256 of every file it
+    produced. On a resumed run a stage is skipped only if its input hash
+    still matches and its files are intact. A stage's inputs include the
+    previous stage's output, so redoing one stage invalidates the ones after
+    it by itself.
+
+    ``from_stage`` reruns that stage and everything after it, and reuses
+    valid checkpoints for the stages before it.
+    """
+
+    def __init__(self, meeting_dir: str, resume: bool = False, from_stage: Optional[str] = None):
+        if from_stage is not None and from_stage not in PIPELINE_STAGES:
+            raise ValueError(f"Unknown stage '{from_stage}'. Choose one of: {', '.join(PIPELINE_STAGES)}")
+        self.meeting_dir = meeting_dir
+        self.resume = resume or from_stage is not None
+        self.from_stage = from_stage
+        self.state_path = os.path.join(meeting_dir, PIPELINE_STATE_NAME)
+        self.stages: Dict[str, Dict] = self._load()
+
+    def _load(self) -> Dict[str, Dict]:
+        if not os.path.exists(self.state_path):
+            return {}
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return json.load(f).get("stages", {})
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"⚠️ Ignoring unreadable {PIPELINE_STATE_NAME}: {e}")
+            return {}
+
+    def _write(self):
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"stages": self.stages}, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.state_path)
+
+    def reusable(self, stage: str, input_hash: str) -> Optional[Dict]:
+        """The outputs recorded for ``stage`` if this run may skip it, else None."""
+        if not self.resume:
+            return None
+        if self.from_stage and PIPELINE_STAGES.index(stage) >= PIPELINE_STAGES.index(self.from_stage):
+            return None
+        entry = self.stages.get(stage)
+        if not entry or entry["input_hash"] != input_hash:
+            return None
+        for name, digest in entry["files"].items():
+            path = os.path.join(self.meeting_dir, name)
+            if not os.path.exists(path) or file_sha256(path) != digest:
+                print(f"⚠️ Checkpoint for '{stage}' is stale: {os.path.basename(path)} changed or is missing")
+                return None
+        print(f"⏭️ Skipping '{stage}', checkpoint from {entry['completed_at']} is still valid")
+        return entry["outputs"]
+
+    def record(self, stage: str, input_hash: str, outputs: Optional[Dict] = None, files=()):
+        self.stages[stage] = {
+            "input_hash": input_hash,
+            "completed_at": datetime.now().isoformat(),
+            # Relative to the meeting folder, so a resume from another working directory still finds them
+            "files": {os.path.relpath(os.path.abspath(path), os.path.abspath(self.meeting_dir)): file_sha256(path)
+                      for path in files},
+            "outputs": outputs or {},
+        }
+        self._write()
@@ -0,0 +1,203 @@
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, List, Optional
+
+METRICS_NAME = "metrics.json"
+# Append one summary line per pipeline run to this JSONL file (unset to disable)
+PIPELINE_METRICS_SERIES = os.getenv("PIPELINE_METRICS_SERIES")
+
+_current: ContextVar[Optional["PipelineMetrics"]] = ContextVar("pipeline_metrics", default=None)
+_active: List["PipelineMetrics"] = []
+_active_lock = threading.Lock()
+
+
+class PipelineMetrics:
+    """Structured timing of one pipeline run, written to ``metrics.json`` in the meeting folder.
+
+    Stages and their sub-steps are nested ``span``s with a duration, a status
+    and free-form attributes (audio duration, bytes uploaded, engine, ...).
+    HTTP calls and LLM calls are recorded flat, each tagged with the span
+    that was open when it was made. Code deep in the pipeline reaches the
+    run through ``current_metrics()``, so nothing has to be threaded through
+    every call; when no run is active the helpers do nothing.
+    """
+
+    def __init__(self, meeting_dir: str, audio_file: str):
+        self.meeting_dir = meeting_dir
+        self.audio_file = audio_file
+        self.started_at = datetime.now()
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+        self._stack: List[Dict] = []
+        self.spans: List[Dict] = []
+        self.http_calls: List[Dict] = []
+        self.llm_calls: List[Dict] = []
+        self.status = "running"
+        self.error: Optional[str] = None
+        self._token = None
+
+    def _offset(self) -> float:
+        return round(time.perf_counter() - self._t0, 3)
+
+    def activate(self):
+        self._token = _current.set(self)
+        with _active_lock:
+            _active.append(self)
+
+    def deactivate(self):
+        if self._token is not None:
+            _current.reset(self._token)
+            self._token = None
+        with _active_lock:
+            if self in _active:
+                _active.remove(self)
+
+    @contextmanager
+    def span(self, name: str, **attrs):
+        """Time a block; yields its attribute dict so the block can add to it."""
+        with self._lock:
+            entry = {
+                "name": name,
+                "parent": self._stack[-1]["name"] if self._stack else None,
+                "start_s": self._offset(),
+                "duration_s": None,
+                "status": "ok",
+                "attrs": dict(attrs),
+            }
+            self.spans.append(entry)
+            self._stack.append(entry)
+        try:
+            yield entry["attrs"]
+        except Exception as e:
+            entry["status"] = "error"
+            entry["error"] = str(e)
+            raise
+        finally:
+            entry["duration_s"] = round(self._offset() - entry["start_s"], 3)
+            with self._lock:
+                if entry in self._stack:
+                    self._stack.remove(entry)
+
+    def skipped(self, name: str, reason: str):
+        with self._lock:
+            self.spans.append({
+                "name": name,
+                "parent": self._stack[-1]["name"] if self._stack else None,
+                "start_s": self._offset(),
+                "duration_s": 0.0,
+                "status": "skipped",
+                "attrs": {"reason": reason},
+            })
+
+    def annotate(self, **attrs):
+        """Add attributes to the innermost open span"""
+        with self._lock:
+            if self._stack:
+                self._stack[-1]["attrs"].update(attrs)
+
+    def _open_span(self) -> Optional[str]:
+        return self._stack[-1]["name"] if self._stack else None
+
+    def record_http(self, service: str, method: str, target: str, latency_ms: float,
+                    status: Optional[int] = None, ok: bool = True, bytes_sent: Optional[int] = None):
+        with self._lock:
+            self.http_calls.append({
+                "span": self._open_span(), "at_s": self._offset(), "service": service, "method": method,
+                "target": target, "status": status, "ok": ok, "latency_ms": round(latency_ms, 1),
+                "bytes_sent": bytes_sent,
+            })
+
+    def record_llm_call(self, model: str, latency_ms: float, prompt_tokens: Optional[int] = None,
+                        completion_tokens: Optional[int] = None, cost: Optional[float] = None,
+                        ok: bool = True, ended_at: Optional[float] = None):
+        with self._lock:
+            self.llm_calls.append({
+                "span": self._open_span(), "at_s": self._offset(), "ended_at": ended_at or time.time(),
+                "model": model, "ok": ok, "latency_ms": round(latency_ms, 1), "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": (prompt_tokens or 0) + (completion_tokens or 0) if prompt_tokens is not None else None,
+                "cost": cost,
+            })
+
+    def summary(self) -> Dict:
+        """Per-stage seconds, token, call and cost totals; the line appended to the time-series."""
+        stages = {span["name"]: span["duration_s"] for span in self.spans if span["parent"] == "pipeline"}
+        llm_costs = [call["cost"] for call in self.llm_calls if call["cost"] is not None]
+        est_costs = [span["attrs"]["est_cost"] for span in self.spans if span["attrs"].get("est_cost") is not None]
+        return {
+            "at": self.started_at.isoformat(),
+            "meeting": os.path.basename(os.path.abspath(self.meeting_dir)),
+            "status": self.status,
+            "total_s": self._offset(),
+            "stage_s": stages,
+            "llm_calls": len(self.llm_calls),
+            "llm_tokens": sum(call["total_tokens"] or 0 for call in self.llm_calls),
+            "http_calls": len(self.http_calls),
+            "http_s": round(sum(call["latency_ms"] for call in self.http_calls) / 1000, 3),
+            "est_cost": round(sum(llm_costs) + sum(est_costs), 4) if llm_costs or est_costs else None,
+        }
+
+    def write(self, status: str = "ok", error: Optional[str] = None):
+        self.status = status
+        self.error = error
+        summary = self.summary()
+        with self._lock:
+            report = {
+                "audio_file": self.audio_file,
+                "started_at": self.started_at.isoformat(),
+                "finished_at": datetime.now().isoformat(),
+                "status": status,
+                "error": error,
+                "summary": summary,
+                "spans": self.spans,
+                "http_calls": self.http_calls,
+                "llm_calls": self.llm_calls,
+            }
+        path = os.path.join(self.meeting_dir, METRICS_NAME)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, default=str)
+        os.replace(path + ".tmp", path)
+
+        if PIPELINE_METRICS_SERIES:
+            series_dir = os.path.dirname(PIPELINE_METRICS_SERIES)
+            if series_dir:
+                os.makedirs(series_dir, exist_ok=True)
+            with open(PIPELINE_METRICS_SERIES, "a", encoding="utf-8") as f:
+                f.write(json.dumps(summary, default=str) + "\n")
+
+
+def current_metrics(any_thread: bool = False) -> Optional[PipelineMetrics]:
+    """The run this code is part of, or None.
+
+    Library callbacks on their own threads (LLM usage, CrewAI tools) don't
+    inherit the context; with ``any_thread`` they get the only active run
+    in this process, if there is exactly one.
+    """
+    metrics = _current.get()
+    if metrics is None and any_thread:
+        with _active_lock:
+            if len(_active) == 1:
+                metrics = _active[0]
+    return metrics
+
+
+@contextmanager
+def metrics_span(name: str, any_thread: bool = False, **attrs):
+    """``PipelineMetrics.span`` on the current run, or a no-op outside one"""
+    metrics = current_metrics(any_thread)
+    if metrics is None:
+        yield dict(attrs)
+        return
+    with metrics.span(name, **attrs) as span_attrs:
+        yield span_attrs
+
+
+def record_http(service: str, method: str, target: str, latency_ms: float, any_thread: bool = False, **details):
+    metrics = current_metrics(any_thread)
+    if metrics:
+        metrics.record_http(service, method, target, latency_ms, **details)
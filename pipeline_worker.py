@@ -0,0 +1,153 @@
+import os
+import time
+import socket
+import argparse
+import threading
+import traceback
+import multiprocessing
+from dotenv import load_dotenv
+from job_store import JobStore, JOBS_DB, JOB_LEASE_SECONDS, STATUS_FAILED
+
+load_dotenv()
+
+# Pipeline jobs processed at the same time, each in its own worker process
+PIPELINE_WORKERS = int(os.getenv("PIPELINE_WORKERS", 2))
+# How often an idle worker looks for new jobs
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", 5))
+
+
+def run_job(store: JobStore, job: dict, worker_id: str) -> bool:
+    """Run one job through the meeting pipeline, renewing its lease until it finishes.
+
+    If the lease is lost another worker may claim the job, so the run is
+    cancelled before its next stage and False is returned.
+    """
+    # Imported here so --status and --retry work without the pipeline's dependencies
+    from meeting_pipeline import process_file, PipelineCancelled
+    from utils import load_transcript_from_file
+
+    done = threading.Event()
+    lease_lost = threading.Event()
+
+    def heartbeat():
+        while not done.wait(JOB_LEASE_SECONDS / 3):
+            if not store.renew_lease(job["id"], worker_id):
+                print(f"⚠️ [{worker_id}] Lost the lease on job #{job['id']}, stopping before the next stage")
+                lease_lost.set()
+                return
+
+    threading.Thread(target=heartbeat, daemon=True, name=f"lease-{job['id']}").start()
+    try:
+        transcript = None
+        transcript_path = job["extra"].get("transcript_path")
+        if transcript_path:
+            transcript = load_transcript_from_file(transcript_path)
+        # A retried job picks up after the last stage that completed
+        process_file(job["audio_path"], transcript=transcript, notes_dir=job["meeting_dir"], resume=True,
+                     cancel=lease_lost)
+        return True
+    except PipelineCancelled as e:
+        print(f"🛑 [{worker_id}] Job #{job['id']} abandoned: {e}")
+        return False
+    finally:
+        done.set()
+
+
+def worker_loop(db_path: str = JOBS_DB, drain: bool = False):
+    """Claim and run jobs until stopped, or until the queue is empty when ``drain`` is set."""
+    store = JobStore(db_path)
+    worker_id = f"{socket.gethostname()}-{os.getpid()}"
+    print(f"👷 Pipeline worker {worker_id} started")
+    try:
+        while True:
+            job = store.claim(worker_id)
+            if job is None:
+                if drain:
+                    return
+                time.sleep(JOB_POLL_INTERVAL)
+                continue
+
+            print(f"🎬 [{worker_id}] Job #{job['id']} attempt {job['attempts']}/{job['max_attempts']}: "
+                  f"{job['audio_path']}")
+            started = time.perf_counter()
+            try:
+                if not run_job(store, job, worker_id):
+                    # The job belongs to whoever holds the lease now; leave its status to them
+                    continue
+            except Exception as e:
+                traceback.print_exc()
+                status = store.fail(job["id"], worker_id, str(e))
+                if status == STATUS_FAILED:
+                    print(f"❌ [{worker_id}] Job #{job['id']} failed for good: {e}")
+                elif status:
+                    print(f"⚠️ [{worker_id}] Job #{job['id']} failed, queued for retry: {e}")
+                continue
+            if store.complete(job["id"], worker_id):
+                print(f"✅ [{worker_id}] Job #{job['id']} done in {time.perf_counter() - started:.1f}s")
+            else:
+                print(f"⚠️ [{worker_id}] Job #{job['id']} finished after its lease was lost")
+    finally:
+        store.close()
+
+
+def run_pool(workers: int, db_path: str = JOBS_DB, drain: bool = False):
+    """Run ``workers`` worker processes; a crash in one pipeline run can't take down the others."""
+    if workers <= 1:
+        worker_loop(db_path, drain)
+        return
+
+    processes = [
+        multiprocessing.Process(target=worker_loop, args=(db_path, drain), name=f"pipeline-worker-{i}")
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        # Jobs still running keep their lease until it expires, then get picked up again
+        print("🛑 Stopping pipeline workers...")
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.join()
+
+
+def print_status(store: JobStore):
+    counts = store.counts()
+    print("📊 " + (", ".join(f"{status}: {count}" for status, count in sorted(counts.items())) or "No jobs"))
+    for job in store.list_jobs():
+        line = f"#{job['id']} [{job['status']}] attempts {job['attempts']}/{job['max_attempts']} {job['audio_path']}"
+        if job["lease_owner"]:
+            line += f" (worker {job['lease_owner']}, lease until {job['lease_expires_at']})"
+        if job["last_error"]:
+            line += f" - {job['last_error']}"
+        print(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Process queued meeting recordings with a pool of pipeline workers")
+    parser.add_argument("--workers", type=int, default=PIPELINE_WORKERS, help="Number of worker processes")
+    parser.add_argument("--drain", action="store_true", help="Exit once the queue is empty")
+    parser.add_argument("--status", action="store_true", help="Show the queue and exit")
+    parser.add_argument("--retry", type=int, metavar="JOB_ID", help="Queue a failed job again and exit")
+    parser.add_argument("--enqueue", metavar="AUDIO_PATH", help="Queue a recording and exit")
+    parser.add_argument("--db", default=JOBS_DB)
+    args = parser.parse_args()
+
+    if args.status or args.retry or args.enqueue:
+        store = JobStore(args.db)
+        if args.enqueue:
+            if os.path.exists(args.enqueue):
+                print(f"📥 Queued job #{store.enqueue(args.enqueue)}")
+            else:
+                print(f"❌ Recording not found: {args.enqueue}")
+        if args.retry:
+            print(f"🔁 Job #{args.retry} queued again" if store.retry(args.retry)
+                  else f"⚠️ Job #{args.retry} not found or still queued/running")
+        if args.status:
+            print_status(store)
+        store.close()
+    else:
+        run_pool(args.workers, args.db, args.drain)
@@ -0,0 +1,629 @@
+import os
+import json
+import time
+import wave
+import random
+import asyncio
+import argparse
+import threading
+import concurrent.futures
+from collections import deque
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Tuple
+import requests
+import websockets
+from audio_capture import SAMPLE_RATE, SAMPLE_WIDTH, CHANNELS
+
+REALTIME_URL = os.getenv("ASSEMBLYAI_REALTIME_URL", "wss://api.assemblyai.com/v2/realtime/ws")
+# Empty disables the token request, e.g. against the local stand-in server
+REALTIME_TOKEN_URL = os.getenv("ASSEMBLYAI_REALTIME_TOKEN_URL", "https://api.assemblyai.com/v2/realtime/token")
+CONNECT_TIMEOUT = float(os.getenv("REALTIME_CONNECT_TIMEOUT", 10))
+# Temporary tokens are requested for this long and refreshed this close to expiry
+REALTIME_TOKEN_TTL = int(os.getenv("REALTIME_TOKEN_TTL", 3600))
+TOKEN_REFRESH_MARGIN = 60
+
+# Reconnect backoff after a dropped socket: doubles from the base delay up to the cap
+RECONNECT_BASE_DELAY = float(os.getenv("REALTIME_RECONNECT_BASE_DELAY", 0.5))
+RECONNECT_MAX_DELAY = float(os.getenv("REALTIME_RECONNECT_MAX_DELAY", 10))
+# Unfinalized audio re-sent to a new session after reconnecting
+REPLAY_SECONDS = float(os.getenv("REALTIME_REPLAY_SECONDS", 5))
+
+# AssemblyAI close codes: insufficient funds / free tier can't be fixed by reconnecting;
+# not authorized / session expired need a fresh token
+FATAL_CLOSE_CODES = {4002, 4003}
+TOKEN_CLOSE_CODES = {4001, 4008}
+
+# Chunks waiting for the websocket; at 0.1-0.5 s per chunk this is 5-25 s of audio
+REALTIME_QUEUE_CHUNKS = int(os.getenv("REALTIME_QUEUE_CHUNKS", 50))
+# "drop_oldest" discards stale audio when full; "coalesce" first merges chunks into bigger frames
+REALTIME_QUEUE_POLICY = os.getenv("REALTIME_QUEUE_POLICY", "drop_oldest")
+# AssemblyAI realtime accepts at most 2000 ms per message
+MAX_CHUNK_BYTES = 2 * SAMPLE_RATE * SAMPLE_WIDTH * CHANNELS
+
+OVERFLOW_POLICIES = ("drop_oldest", "coalesce")
+
+
+def summarize_ms(values: Iterable[float]) -> Dict:
+    ordered = sorted(values)
+    if not ordered:
+        return {"avg": None, "p95": None, "max": None}
+    return {
+        "avg": round(sum(ordered) / len(ordered), 2),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2),
+        "max": round(ordered[-1], 2),
+    }
+
+
+class BoundedAudioQueue:
+    """Bounded hand-off between the capture side and the websocket sender.
+
+    ``put`` never blocks the producer. When the queue is full, the overflow
+    policy decides what to give up. ``drop_oldest`` discards the stalest
+    chunk, because it matters least for a live trigger. ``coalesce`` first
+    appends the new audio to the newest chunk, up to the API's 2 s frame
+    limit, so a slow socket gets fewer and larger messages. Audio is dropped
+    only once that frame is full too. Each chunk carries the time its first
+    bytes were queued, so the sender can report enqueue-to-send latency, and
+    optionally the capture segments it was cut from (see ``VoiceActivityGate``).
+    """
+
+    def __init__(self, max_chunks: int = REALTIME_QUEUE_CHUNKS, policy: str = REALTIME_QUEUE_POLICY):
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown queue policy '{policy}'. Choose one of: {', '.join(OVERFLOW_POLICIES)}")
+        self.max_chunks = max_chunks
+        self.policy = policy
+        self.chunks: Deque[Tuple[bytearray, float, Optional[List[List]]]] = deque()
+        self._not_empty = threading.Condition()
+        self.enqueued = 0
+        self.sent = 0
+        self.drops = 0
+        self.dropped_bytes = 0
+        self.coalesced = 0
+        self.max_depth = 0
+        self.latencies_ms: Deque[float] = deque(maxlen=1000)
+
+    @property
+    def depth(self) -> int:
+        return len(self.chunks)
+
+    def put(self, data: bytes, segments: Optional[List[List]] = None):
+        with self._not_empty:
+            self.enqueued += 1
+            if len(self.chunks) >= self.max_chunks:
+                tail = self.chunks[-1] if self.chunks else None
+                if self.policy == "coalesce" and tail is not None and len(tail[0]) + len(data) <= MAX_CHUNK_BYTES:
+                    tail[0].extend(data)
+                    if tail[2] is not None and segments is not None:
+                        tail[2].extend(segments)
+                    elif tail[2] is not None:
+                        # Placement of the merged chunk is no longer known
+                        self.chunks[-1] = (tail[0], tail[1], None)
+                    self.coalesced += 1
+                    return
+                dropped, _, _ = self.chunks.popleft()
+                self.drops += 1
+                self.dropped_bytes += len(dropped)
+
+            self.chunks.append((bytearray(data), time.perf_counter(), list(segments) if segments is not None else None))
+            self.max_depth = max(self.max_depth, len(self.chunks))
+            self._not_empty.notify()
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Tuple[bytes, float, Optional[List[List]]]]:
+        """Return ``(audio, enqueued_at, segments)`` or None on timeout."""
+        with self._not_empty:
+            if not self._not_empty.wait_for(lambda: self.chunks, timeout):
+                return None
+            data, enqueued_at, segments = self.chunks.popleft()
+            return bytes(data), enqueued_at, segments
+
+    def record_sent(self, enqueued_at: float):
+        self.sent += 1
+        self.latencies_ms.append((time.perf_counter() - enqueued_at) * 1000)
+
+    def stats(self) -> Dict:
+        return {
+            "policy": self.policy,
+            "max_chunks": self.max_chunks,
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "enqueued": self.enqueued,
+            "sent": self.sent,
+            "drops": self.drops,
+            "dropped_seconds": round(self.dropped_bytes / (SAMPLE_RATE * SAMPLE_WIDTH * CHANNELS), 2),
+            "coalesced": self.coalesced,
+            "enqueue_to_send_ms": summarize_ms(self.latencies_ms),
+        }
+
+
+class RealtimeLoop:
+    """The one asyncio event loop per process that carries every realtime stream.
+
+    It runs on a single daemon thread. Sessions on other threads hand
+    coroutines to it with ``submit``, so a host running many bots pays one
+    thread for all their websockets instead of two or three per meeting.
+    """
+
+    _shared: Optional["RealtimeLoop"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True, name="realtime-loop")
+        self.thread.start()
+        self.streams: List["RealtimeTranscriber"] = []
+
+    @classmethod
+    def shared(cls) -> "RealtimeLoop":
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def submit(self, coro) -> concurrent.futures.Future:
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def call_soon(self, callback: Callable, *args):
+        self.loop.call_soon_threadsafe(callback, *args)
+
+
+class TokenCache:
+    """Temporary realtime tokens, shared by every stream in the process.
+
+    A token is fetched once and reused by new sessions and reconnects until
+    it gets close to expiry. The blocking POST runs in the loop's executor,
+    and concurrent callers wait on the same fetch. ``invalidate`` drops a
+    token the server refused.
+    """
+
+    def __init__(self, token_url: str, ttl_seconds: int = REALTIME_TOKEN_TTL,
+                 refresh_margin: int = TOKEN_REFRESH_MARGIN):
+        self.token_url = token_url
+        self.ttl_seconds = ttl_seconds
+        self.refresh_margin = refresh_margin
+        self.tokens: Dict[str, Tuple[str, float]] = {}
+        self.fetches = 0
+        self.hits = 0
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def get(self, api_key: str) -> str:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            cached = self.tokens.get(api_key)
+            if cached and cached[1] - time.monotonic() > self.refresh_margin:
+                self.hits += 1
+                return cached[0]
+
+            def fetch_token():
+                response = requests.post(
+                    self.token_url,
+                    headers={'authorization': api_key},
+                    json={'expires_in': self.ttl_seconds},
+                    timeout=10,
+                )
+                response.raise_for_status()
+                return response.json()['token']
+
+            requested_at = time.monotonic()
+            token = await asyncio.get_running_loop().run_in_executor(None, fetch_token)
+            self.fetches += 1
+            self.tokens[api_key] = (token, requested_at + self.ttl_seconds)
+            return token
+
+    def invalidate(self, api_key: str):
+        self.tokens.pop(api_key, None)
+
+
+_token_caches: Dict[str, TokenCache] = {}
+
+
+def token_cache_for(token_url: str) -> TokenCache:
+    if token_url not in _token_caches:
+        _token_caches[token_url] = TokenCache(token_url)
+    return _token_caches[token_url]
+
+
+class RealtimeTranscriber:
+    """One meeting's AssemblyAI realtime stream, driven by the shared RealtimeLoop.
+
+    The public methods are thread-safe and keep the old client's shape:
+    ``start_transcription`` blocks until the first SessionBegins (or a
+    timeout), ``add_audio_data`` queues audio, ``stop`` terminates the
+    session. The sender coroutine sleeps on an asyncio.Event instead of
+    polling the queue. Each FinalTranscript's ``audio_end`` is mapped back
+    to the time that audio was queued, which gives capture-to-transcript
+    latency per utterance.
+
+    If the socket drops mid-meeting, the stream reconnects with exponential
+    backoff while audio keeps queuing. Once the new session begins, the
+    audio sent after the last FinalTranscript (at most ``REPLAY_SECONDS``)
+    is sent again, so the utterance in flight is not lost. Every gap is
+    recorded with its duration.
+
+    When audio is queued with its capture segments, every finalized
+    utterance is also mapped back onto the capture byte range it came from
+    and handed to ``on_utterance_callback``, so the live transcript can be
+    placed on the recording despite VAD gaps and reconnects.
+    """
+
+    def __init__(self, api_key: Optional[str], on_transcript_callback: Callable[[str], None],
+                 url: str = REALTIME_URL, token_url: Optional[str] = REALTIME_TOKEN_URL,
+                 realtime_loop: Optional[RealtimeLoop] = None, name: str = "realtime",
+                 on_utterance_callback: Optional[Callable[[Dict], None]] = None):
+        self.api_key = api_key
+        self.on_transcript_callback = on_transcript_callback
+        self.on_utterance_callback = on_utterance_callback
+        self.url = url
+        self.tokens = token_cache_for(token_url) if token_url else None
+        self.rt = realtime_loop or RealtimeLoop.shared()
+        self.name = name
+        # Bounded so a stalled websocket can't grow memory; see REALTIME_QUEUE_POLICY
+        self.audio_queue = BoundedAudioQueue()
+        self.is_running = False
+        self.connected = False
+        self.stopping = False
+        self.session_id: Optional[str] = None
+        self.ws = None
+        self.task: Optional[concurrent.futures.Future] = None
+        self.session_started = threading.Event()
+        self._wake: Optional[asyncio.Event] = None
+        self._stop_event: Optional[asyncio.Event] = None
+        # Per connection: (stream position in ms at the end of a sent chunk, when that chunk was queued)
+        self.sent_marks: Deque[Tuple[float, float]] = deque()
+        self.stream_ms = 0.0
+        # Per connection: (stream start ms, capture byte offset or None for padding, length in bytes)
+        self.stream_map: Deque[Tuple[float, Optional[int], int]] = deque()
+        self.last_capture_end: Optional[int] = None
+        # Sent audio not yet covered by a FinalTranscript: (stream end ms, audio, queued at, capture segments)
+        self.replay: Deque[Tuple[float, bytes, float, Optional[List[List]]]] = deque()
+        self.replay_bytes = 0
+        self.max_replay_bytes = int(REPLAY_SECONDS * SAMPLE_RATE * SAMPLE_WIDTH * CHANNELS)
+        self.utterances: Deque[Dict] = deque(maxlen=500)
+        self.connect_seconds: Optional[float] = None
+        self.sessions = 0
+        self.reconnects = 0
+        self.gaps: List[Dict] = []
+        self.replayed_bytes = 0
+        self.streamed_bytes = 0
+        self.close_codes: List[Optional[int]] = []
+
+    def start_transcription(self, timeout: float = CONNECT_TIMEOUT) -> bool:
+        self.is_running = True
+        self.rt.streams.append(self)
+        self.task = self.rt.submit(self._run())
+        if not self.session_started.wait(timeout) or not self.connected:
+            self.stop()
+            return False
+        return True
+
+    def add_audio_data(self, audio_data: bytes, segments: Optional[List[List]] = None):
+        """Queue audio; ``segments`` lists the ``[capture_offset, length]`` pieces it was cut from."""
+        # Keeps queuing while reconnecting; the bounded queue caps what a long outage can hold
+        if self.is_running and self._wake is not None:
+            self.audio_queue.put(audio_data, segments)
+            self.rt.call_soon(self._wake.set)
+
+    def stop(self, timeout: float = 5):
+        self.is_running = False
+        if not self.task:
+            return
+        try:
+            self.rt.submit(self._terminate()).result(timeout=timeout)
+            self.task.result(timeout=timeout)
+        except Exception:
+            self.task.cancel()
+        if self in self.rt.streams:
+            self.rt.streams.remove(self)
+
+    async def _session_url(self) -> str:
+        separator = "&" if "?" in self.url else "?"
+        url = f"{self.url}{separator}sample_rate={SAMPLE_RATE}"
+        if not self.tokens:
+            return url
+        return f"{url}&token={await self.tokens.get(self.api_key)}"
+
+    async def _run(self):
+        self._wake = asyncio.Event()
+        self._stop_event = asyncio.Event()
+        backoff = RECONNECT_BASE_DELAY
+        gap_started: Optional[float] = None
+        gap_reason: Optional[str] = None
+
+        while not self.stopping:
+            started = time.perf_counter()
+            close_code = None
+            reason = None
+            try:
+                async with websockets.connect(await self._session_url(), max_size=None) as ws:
+                    self.ws = ws
+                    sender = None
+                    try:
+                        async for message in ws:
+                            data = json.loads(message)
+                            self._on_message(data, started)
+                            if data.get('message_type') == 'SessionBegins':
+                                if gap_started is not None:
+                                    self._record_gap(gap_started, gap_reason)
+                                    gap_started = None
+                                backoff = RECONNECT_BASE_DELAY
+                                sender = asyncio.ensure_future(self._send_audio(ws))
+                    finally:
+                        if sender:
+                            sender.cancel()
+                    close_code = ws.close_code
+            except Exception as e:
+                close_code = getattr(getattr(e, "rcvd", None), "code", None)
+                reason = str(e).splitlines()[0] if str(e) else type(e).__name__
+                if getattr(getattr(e, "response", None), "status_code", None) in (401, 403) and self.tokens:
+                    self.tokens.invalidate(self.api_key)
+            finally:
+                self.ws = None
+                self.connected = False
+
+            self.close_codes.append(close_code)
+            if self.stopping or not self.is_running:
+                break
+            if close_code in FATAL_CLOSE_CODES:
+                print(f"❌ AssemblyAI closed the session for good ({self.name}, code {close_code})")
+                break
+            if close_code in TOKEN_CLOSE_CODES and self.tokens:
+                self.tokens.invalidate(self.api_key)
+
+            reason = reason or f"closed with code {close_code}"
+            if gap_started is None:
+                gap_started = time.perf_counter()
+                gap_reason = reason
+            delay = backoff * random.uniform(0.8, 1.2)
+            print(f"🔁 Realtime stream {self.name} dropped ({reason}); reconnecting in {delay:.1f}s")
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            backoff = min(backoff * 2, RECONNECT_MAX_DELAY)
+            self.reconnects += 1
+
+        self.is_running = False
+        self.session_started.set()
+        print(f"WebSocket closed ({self.name})")
+
+    def _record_gap(self, gap_started: float, reason: Optional[str]):
+        duration = time.perf_counter() - gap_started
+        self.gaps.append({"reason": reason, "duration_s": round(duration, 3)})
+        print(f"✅ Realtime stream {self.name} back after {duration:.1f}s")
+
+    def _on_message(self, data: Dict, started: float):
+        message_type = data.get('message_type')
+        if message_type == 'SessionBegins':
+            self.session_id = data.get('session_id')
+            self.sessions += 1
+            if self.connect_seconds is None:
+                self.connect_seconds = time.perf_counter() - started
+                print(f"🔊 AssemblyAI WebSocket connected ({self.name}, {self.connect_seconds:.2f}s)")
+            self.connected = True
+            self.session_started.set()
+        elif message_type == 'FinalTranscript':
+            transcript = data['text'].lower().strip()
+            self._release_replay(data.get('audio_end'))
+            if transcript:
+                latency_ms = self._utterance_latency_ms(data.get('audio_end'))
+                self.utterances.append({"audio_end_ms": data.get('audio_end'), "latency_ms": latency_ms})
+                print(f"🎯 Transcribed: {transcript}")
+                # Callbacks may block (TTS, desktop automation); keep them off the shared loop
+                loop = asyncio.get_running_loop()
+                loop.run_in_executor(None, self.on_transcript_callback, transcript)
+                if self.on_utterance_callback:
+                    utterance = {
+                        "text": data['text'].strip(),
+                        "confidence": data.get('confidence'),
+                        "audio_start_ms": data.get('audio_start'),
+                        "audio_end_ms": data.get('audio_end'),
+                        "capture_start": self._capture_offset(data.get('audio_start')),
+                        "capture_end": self._capture_offset(data.get('audio_end')),
+                        "latency_ms": latency_ms,
+                    }
+                    loop.run_in_executor(None, self.on_utterance_callback, utterance)
+            self._prune_stream_map(data.get('audio_end'))
+        elif 'error' in data:
+            print(f"WebSocket error ({self.name}): {data['error']}")
+
+    def _release_replay(self, audio_end: Optional[float]):
+        """Audio up to a FinalTranscript has been transcribed and never needs replaying"""
+        if audio_end is None:
+            return
+        while self.replay and self.replay[0][0] <= audio_end:
+            _, audio_data, _, _ = self.replay.popleft()
+            self.replay_bytes -= len(audio_data)
+
+    def _utterance_latency_ms(self, audio_end: Optional[float]) -> Optional[float]:
+        """Time from queuing the chunk that holds ``audio_end`` to now"""
+        if audio_end is None:
+            return None
+        enqueued_at = None
+        while self.sent_marks:
+            end_ms, queued = self.sent_marks[0]
+            enqueued_at = queued
+            if end_ms >= audio_end:
+                break
+            self.sent_marks.popleft()
+        if enqueued_at is None:
+            return None
+        return round((time.perf_counter() - enqueued_at) * 1000, 1)
+
+    def _capture_offset(self, stream_ms: Optional[float]) -> Optional[int]:
+        """Capture byte position of a point in this connection's stream.
+
+        A point inside padding or unplaced audio maps to the end of the last
+        placed audio before it.
+        """
+        if stream_ms is None:
+            return None
+        bytes_per_ms = SAMPLE_RATE * SAMPLE_WIDTH * CHANNELS / 1000
+        position = self.last_capture_end
+        for start_ms, offset, length in self.stream_map:
+            if start_ms > stream_ms:
+                break
+            if offset is None:
+                continue
+            into = min(int((stream_ms - start_ms) * bytes_per_ms), length)
+            position = offset + into - into % SAMPLE_WIDTH
+        return position
+
+    def _prune_stream_map(self, audio_end: Optional[float]):
+        """Forget placements of audio that has been finalized"""
+        if audio_end is None:
+            return
+        bytes_per_ms = SAMPLE_RATE * SAMPLE_WIDTH * CHANNELS / 1000
+        while self.stream_map:
+            start_ms, offset, length = self.stream_map[0]
+            if start_ms + length / bytes_per_ms > audio_end:
+                break
+            self.stream_map.popleft()
+            if offset is not None:
+                self.last_capture_end = offset + length
+
+    async def _send_chunk(self, ws, audio_data: bytes, enqueued_at: float,
+                          segments: Optional[List[List]] = None):
+        await ws.send(audio_data)
+        bytes_per_ms = SAMPLE_RATE * SAMPLE_WIDTH * CHANNELS / 1000
+        start_ms = self.stream_ms
+        for offset, length in segments or [[None, len(audio_data)]]:
+            self.stream_map.append((start_ms, offset, length))
+            start_ms += length / bytes_per_ms
+        self.streamed_bytes += len(audio_data)
+        self.stream_ms += len(audio_data) / bytes_per_ms
+        self.sent_marks.append((self.stream_ms, enqueued_at))
+        self.replay.append((self.stream_ms, audio_data, enqueued_at, segments))
+        self.replay_bytes += len(audio_data)
+        while self.replay_bytes > self.max_replay_bytes:
+            _, dropped, _, _ = self.replay.popleft()
+            self.replay_bytes -= len(dropped)
+
+    async def _send_audio(self, ws):
+        # A new session starts its audio clock at zero; replay what the last one never finalized
+        pending_replay = list(self.replay)
+        self.replay.clear()
+        self.replay_bytes = 0
+        self.sent_marks.clear()
+        self.stream_map.clear()
+        self.stream_ms = 0.0
+        for _, audio_data, enqueued_at, segments in pending_replay:
+            await self._send_chunk(ws, audio_data, enqueued_at, segments)
+            self.replayed_bytes += len(audio_data)
+
+        while True:
+            item = self.audio_queue.get(timeout=0)
+            if item is None:
+                self._wake.clear()
+                # A put between the get and the clear would otherwise go unnoticed
+                if not self.audio_queue.depth:
+                    await self._wake.wait()
+                continue
+            audio_data, enqueued_at, segments = item
+            await self._send_chunk(ws, audio_data, enqueued_at, segments)
+            self.audio_queue.record_sent(enqueued_at)
+
+    async def _terminate(self):
+        self.stopping = True
+        if self._stop_event:
+            self._stop_event.set()
+        if self.ws is None:
+            return
+        try:
+            await self.ws.send(json.dumps({"terminate_session": True}))
+            await asyncio.wait_for(self.ws.wait_closed(), timeout=3)
+        except Exception:
+            await self.ws.close()
+
+    def stats(self) -> Dict:
+        latencies = [u["latency_ms"] for u in self.utterances if u["latency_ms"] is not None]
+        return {
+            "session_id": self.session_id,
+            "connect_seconds": round(self.connect_seconds, 3) if self.connect_seconds is not None else None,
+            "streamed_seconds": round(self.streamed_bytes / (SAMPLE_RATE * SAMPLE_WIDTH * CHANNELS), 2),
+            "utterances": len(self.utterances),
+            "capture_to_final_ms": summarize_ms(latencies),
+            "sessions": self.sessions,
+            "reconnects": self.reconnects,
+            "gaps": self.gaps,
+            "total_gap_seconds": round(sum(gap["duration_s"] for gap in self.gaps), 3),
+            "replayed_seconds": round(self.replayed_bytes / (SAMPLE_RATE * SAMPLE_WIDTH * CHANNELS), 2),
+            "close_codes": self.close_codes,
+            "token_cache": {"fetches": self.tokens.fetches, "hits": self.tokens.hits} if self.tokens else None,
+        }
+
+
+async def stand_in_server(connection, utterance_ms: int = 1500):
+    """Local AssemblyAI stand-in: one FinalTranscript for every ``utterance_ms`` of audio received."""
+    await connection.send(json.dumps({"message_type": "SessionBegins", "session_id": f"stand-in-{id(connection)}"}))
+    bytes_per_ms = SAMPLE_RATE * SAMPLE_WIDTH * CHANNELS / 1000
+    received_ms = 0.0
+    emitted_ms = 0.0
+    async for message in connection:
+        if isinstance(message, str):
+            if json.loads(message).get("terminate_session"):
+                await connection.send(json.dumps({"message_type": "SessionTerminated"}))
+                return
+            continue
+        received_ms += len(message) / bytes_per_ms
+        while received_ms - emitted_ms >= utterance_ms:
+            await connection.send(json.dumps({
+                "message_type": "FinalTranscript",
+                "audio_start": int(emitted_ms),
+                "audio_end": int(emitted_ms + utterance_ms),
+                "confidence": 0.9,
+                "text": f"Stand-in utterance ending at {int(emitted_ms + utterance_ms)} ms.",
+            }))
+            emitted_ms += utterance_ms
+
+
+def run_stand_in_benchmark(wav_path: str, streams: int, port: int) -> List[Dict]:
+    """Replay a WAV file into ``streams`` concurrent transcribers against the local stand-in"""
+    rt = RealtimeLoop.shared()
+
+    async def serve():
+        return await websockets.serve(stand_in_server, "127.0.0.1", port)
+
+    server = rt.submit(serve()).result()
+    transcribers = [
+        RealtimeTranscriber(None, lambda text: None, url=f"ws://127.0.0.1:{port}", token_url=None,
+                            realtime_loop=rt, name=f"stream-{i}")
+        for i in range(streams)
+    ]
+    for transcriber in transcribers:
+        if not transcriber.start_transcription():
+            raise RuntimeError(f"{transcriber.name} failed to connect to the stand-in")
+
+    with wave.open(wav_path, "rb") as wav:
+        started = time.perf_counter()
+        sent_frames = 0
+        while True:
+            data = wav.readframes(1600)
+            if not data:
+                break
+            for transcriber in transcribers:
+                transcriber.add_audio_data(data)
+            # Pace like live capture
+            sent_frames += len(data) // SAMPLE_WIDTH
+            delay = started + sent_frames / SAMPLE_RATE - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+    time.sleep(0.5)
+    results = []
+    for transcriber in transcribers:
+        transcriber.stop()
+        results.append({"stream": transcriber.name, **transcriber.stats(),
+                        "send_queue": transcriber.audio_queue.stats()})
+    rt.call_soon(server.close)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run concurrent realtime streams against a local stand-in server")
+    parser.add_argument("wav", help="16 kHz mono WAV file replayed into every stream")
+    parser.add_argument("--streams", type=int, default=10)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    for result in run_stand_in_benchmark(args.wav, args.streams, args.port):
+        print(f"📊 {result}")
+    print(f"🧵 Threads alive: {threading.active_count()}")
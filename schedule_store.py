@@ -0,0 +1,208 @@
+import os
+import json
+import sqlite3
+import socket
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+SCHEDULE_DB = os.getenv("SCHEDULE_DB", "schedule.db")
+LEGACY_SCHEDULE_FILE = "scheduled_meeting.json"
+
+# The dispatcher listens on this local UDP port; writers send a datagram after
+# every change so it re-reads the schedule immediately instead of polling.
+WAKE_HOST = "127.0.0.1"
+WAKE_PORT = int(os.getenv("SCHEDULER_WAKE_PORT", 47831))
+
+DEFAULT_BOT_NAME = os.getenv("BOT_NAME", "prasun")
+DEFAULT_BOT_DISPLAY_NAME = os.getenv("BOT_DISPLAY_NAME", "Prasun-Bot")
+
+# Seconds before the start time at which the bot is launched to warm up the
+# browser and capture pipeline and park on the join screen.
+DEFAULT_PREWARM_SECONDS = int(os.getenv("PREWARM_SECONDS", 90))
+
+STATUS_PENDING = "pending"
+STATUS_DISPATCHED = "dispatched"
+STATUS_FAILED = "failed"
+STATUS_MISSED = "missed"
+STATUS_CANCELLED = "cancelled"
+
+
+class ScheduleStore:
+    """Durable multi-meeting schedule backed by SQLite.
+
+    Every meeting carries its own Zoom link, start time and bot identity, so any
+    number of meetings can be queued and served by one dispatcher process.
+    ``launch_at`` is the start time minus the meeting's pre-warm lead; the
+    dispatcher works off ``launch_at`` and the bot waits for ``scheduled_at``.
+    """
+
+    def __init__(self, db_path: str = SCHEDULE_DB):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=10)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS meetings (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                zoom_link TEXT NOT NULL,
+                scheduled_at TEXT NOT NULL,
+                bot_name TEXT NOT NULL,
+                bot_display_name TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                created_at TEXT NOT NULL,
+                dispatched_at TEXT,
+                jitter_ms REAL,
+                extra TEXT,
+                prewarm_seconds INTEGER NOT NULL DEFAULT 0,
+                launch_at TEXT
+            )
+            """
+        )
+        self._migrate()
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_meetings_launch ON meetings (status, launch_at)"
+        )
+        self._conn.commit()
+
+    def _migrate(self):
+        """Bring schedules created before pre-warm support up to date."""
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(meetings)")}
+        if "prewarm_seconds" not in columns:
+            self._conn.execute("ALTER TABLE meetings ADD COLUMN prewarm_seconds INTEGER NOT NULL DEFAULT 0")
+        if "launch_at" not in columns:
+            self._conn.execute("ALTER TABLE meetings ADD COLUMN launch_at TEXT")
+        self._conn.execute("UPDATE meetings SET launch_at = scheduled_at WHERE launch_at IS NULL")
+        self._conn.execute("DROP INDEX IF EXISTS idx_meetings_due")
+
+    def add_meeting(self, zoom_link: str, scheduled_at: datetime,
+                    bot_name: str = DEFAULT_BOT_NAME,
+                    bot_display_name: str = DEFAULT_BOT_DISPLAY_NAME,
+                    prewarm_seconds: int = DEFAULT_PREWARM_SECONDS,
+                    extra: Optional[Dict] = None) -> int:
+        """Queue a meeting and return its id."""
+        launch_at = scheduled_at - timedelta(seconds=max(0, prewarm_seconds))
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO meetings (zoom_link, scheduled_at, bot_name, bot_display_name, created_at, extra, "
+                "prewarm_seconds, launch_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    zoom_link,
+                    scheduled_at.isoformat(),
+                    bot_name,
+                    bot_display_name,
+                    datetime.now().isoformat(),
+                    json.dumps(extra or {}),
+                    max(0, prewarm_seconds),
+                    launch_at.isoformat(),
+                ),
+            )
+            self._conn.commit()
+            return cursor.lastrowid
+
+    def cancel_meeting(self, meeting_id: int) -> bool:
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE meetings SET status = ? WHERE id = ? AND status = ?",
+                (STATUS_CANCELLED, meeting_id, STATUS_PENDING),
+            )
+            self._conn.commit()
+            return cursor.rowcount > 0
+
+    def next_pending(self) -> Optional[Dict]:
+        """Return the pending meeting that must launch first, or None if the queue is empty."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM meetings WHERE status = ? ORDER BY launch_at, id LIMIT 1",
+                (STATUS_PENDING,),
+            ).fetchone()
+        return self._row_to_dict(row) if row else None
+
+    def due_meetings(self, now: datetime) -> List[Dict]:
+        """Return all pending meetings whose launch time is at or before ``now``."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM meetings WHERE status = ? AND launch_at <= ? ORDER BY launch_at, id",
+                (STATUS_PENDING, now.isoformat()),
+            ).fetchall()
+        return [self._row_to_dict(row) for row in rows]
+
+    def mark_dispatched(self, meeting_id: int, dispatched_at: datetime, jitter_ms: float):
+        self._set_status(meeting_id, STATUS_DISPATCHED, dispatched_at, jitter_ms)
+
+    def mark_failed(self, meeting_id: int, dispatched_at: datetime, jitter_ms: float):
+        self._set_status(meeting_id, STATUS_FAILED, dispatched_at, jitter_ms)
+
+    def mark_missed(self, meeting_id: int, checked_at: datetime):
+        # Missed meetings keep a NULL jitter so they don't skew dispatch stats
+        self._set_status(meeting_id, STATUS_MISSED, checked_at, None)
+
+    def list_meetings(self, status: Optional[str] = None) -> List[Dict]:
+        with self._lock:
+            if status:
+                rows = self._conn.execute(
+                    "SELECT * FROM meetings WHERE status = ? ORDER BY scheduled_at, id", (status,)
+                ).fetchall()
+            else:
+                rows = self._conn.execute("SELECT * FROM meetings ORDER BY scheduled_at, id").fetchall()
+        return [self._row_to_dict(row) for row in rows]
+
+    def jitter_stats(self) -> Dict[str, float]:
+        """Summarise measured dispatch jitter (dispatch time minus launch time)."""
+        with self._lock:
+            values = sorted(
+                row[0] for row in self._conn.execute(
+                    "SELECT jitter_ms FROM meetings WHERE jitter_ms IS NOT NULL"
+                )
+            )
+        if not values:
+            return {"count": 0}
+        return {
+            "count": len(values),
+            "mean_ms": sum(values) / len(values),
+            "p50_ms": values[len(values) // 2],
+            "p99_ms": values[min(len(values) - 1, int(len(values) * 0.99))],
+            "max_ms": values[-1],
+        }
+
+    def import_legacy_schedule(self, zoom_link: Optional[str]) -> Optional[int]:
+        """Move an old single-meeting ``scheduled_meeting.json`` into the store."""
+        if not os.path.exists(LEGACY_SCHEDULE_FILE) or not zoom_link:
+            return None
+        with open(LEGACY_SCHEDULE_FILE, "r") as f:
+            scheduled_time = datetime.fromisoformat(f.read().strip())
+        meeting_id = self.add_meeting(zoom_link, scheduled_time)
+        os.remove(LEGACY_SCHEDULE_FILE)
+        print(f"📦 Imported {LEGACY_SCHEDULE_FILE} as meeting #{meeting_id}")
+        return meeting_id
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _set_status(self, meeting_id: int, status: str, dispatched_at: datetime, jitter_ms: Optional[float]):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE meetings SET status = ?, dispatched_at = ?, jitter_ms = ? WHERE id = ?",
+                (status, dispatched_at.isoformat(), jitter_ms, meeting_id),
+            )
+            self._conn.commit()
+
+    @staticmethod
+    def _row_to_dict(row: sqlite3.Row) -> Dict:
+        meeting = dict(row)
+        meeting["scheduled_at"] = datetime.fromisoformat(meeting["scheduled_at"])
+        meeting["launch_at"] = datetime.fromisoformat(meeting["launch_at"])
+        meeting["extra"] = json.loads(meeting["extra"] or "{}")
+        return meeting
+
+
+def notify_dispatcher():
+    """Wake the running dispatcher so it picks up schedule changes immediately."""
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.sendto(b"wake", (WAKE_HOST, WAKE_PORT))
+    except OSError as e:
+        print(f"⚠️ Could not notify scheduler: {e}")
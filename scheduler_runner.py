@@ -1,42 +1,186 @@
 import os
-import time
+import select
+import socket
+import argparse
 import subprocess
 from datetime import datetime
+from dotenv import load_dotenv
+from schedule_store import (
+    ScheduleStore,
+    WAKE_HOST,
+    WAKE_PORT,
+    notify_dispatcher,
+)
+
+load_dotenv()
 
-SCHEDULE_FILE = "scheduled_meeting.json"
 VENV_ACTIVATE = "venv\\Scripts\\activate"  # Windows path
 ZOOM_BOT_COMMAND = "python zoom_bot.py"    # Adjust if needed
 
-def run_zoom_bot():
-    print("🚀 Running Zoom bot...")
+# Meetings whose start time passed more than this many seconds ago (e.g. the
+# dispatcher was not running) are marked missed instead of being launched late.
+MAX_LATE_SECONDS = int(os.getenv("SCHEDULER_MAX_LATE_SECONDS", 900))
+
+# "process" starts one zoom_bot.py process per meeting; "supervisor" runs every
+# meeting as a MeetingSession inside this process so overlapping meetings share it.
+DISPATCH_MODE = os.getenv("SCHEDULER_DISPATCH_MODE", "process")
+
+def run_zoom_bot(meeting: dict) -> bool:
+    print(f"🚀 Running Zoom bot for meeting #{meeting['id']}...")
+
+    # Each bot gets its own link and identity through the environment;
+    # load_dotenv() in zoom_bot does not override variables that are already set.
+    env = os.environ.copy()
+    env["ZOOM_LINK"] = meeting["zoom_link"]
+    env["BOT_NAME"] = meeting["bot_name"]
+    env["BOT_DISPLAY_NAME"] = meeting["bot_display_name"]
+    env["MEETING_ID"] = str(meeting["id"])
+    env["MEETING_START"] = meeting["scheduled_at"].isoformat()
 
     try:
         # On Windows: use cmd to activate venv and run script
         subprocess.Popen([
             "cmd.exe", "/k", f"{VENV_ACTIVATE} && {ZOOM_BOT_COMMAND}"
-        ])
+        ], env=env)
+        return True
     except Exception as e:
         print(f"❌ Failed to start Zoom bot: {e}")
+        return False
+
+def make_supervisor_launcher():
+    """Build a launcher that runs meetings as in-process MeetingSessions."""
+    from zoom_bot import MeetingSupervisor
+
+    supervisor = MeetingSupervisor()
+
+    def launch(meeting: dict) -> bool:
+        try:
+            supervisor.start_session(
+                meeting["zoom_link"],
+                meeting_id=str(meeting["id"]),
+                bot_name=meeting["bot_name"],
+                bot_display_name=meeting["bot_display_name"],
+                start_at=meeting["scheduled_at"],
+            )
+            return True
+        except Exception as e:
+            print(f"❌ Failed to start meeting session: {e}")
+            return False
+
+    launch.supervisor = supervisor
+    return launch
+
+def bind_wake_socket() -> socket.socket:
+    """Bind the dispatcher's wake-up socket. Fails if another dispatcher owns it."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind((WAKE_HOST, WAKE_PORT))
+    sock.setblocking(False)
+    return sock
+
+def drain_wake_socket(sock: socket.socket):
+    while True:
+        try:
+            sock.recv(64)
+        except (BlockingIOError, OSError):
+            return
+
+def dispatch_due(store: ScheduleStore, launcher=run_zoom_bot):
+    """Launch every pending meeting whose launch (start minus pre-warm) time has been reached."""
+    now = datetime.now()
+    for meeting in store.due_meetings(now):
+        lateness = (now - meeting["scheduled_at"]).total_seconds()
+        if lateness > MAX_LATE_SECONDS:
+            print(f"⚠️ Meeting #{meeting['id']} was due {lateness:.0f}s ago - marking as missed")
+            store.mark_missed(meeting["id"], now)
+            continue
+
+        dispatched_at = datetime.now()
+        jitter_ms = (dispatched_at - meeting["launch_at"]).total_seconds() * 1000
+        print(f"⏰ Meeting #{meeting['id']} launching at {meeting['launch_at']} for a "
+              f"{meeting['scheduled_at']} start (jitter {jitter_ms:.1f} ms)")
+
+        if launcher(meeting):
+            store.mark_dispatched(meeting["id"], dispatched_at, jitter_ms)
+        else:
+            store.mark_failed(meeting["id"], dispatched_at, jitter_ms)
+
+def run_dispatcher(store: ScheduleStore, wake_sock: socket.socket, launcher=run_zoom_bot):
+    """Sleep until the next due meeting, waking early whenever the schedule changes."""
+    while True:
+        next_meeting = store.next_pending()
+
+        if next_meeting is None:
+            print("💤 No pending meetings - waiting for the schedule to change...")
+            timeout = None
+        else:
+            timeout = (next_meeting["launch_at"] - datetime.now()).total_seconds()
+            if timeout > 0:
+                print(f"⏳ Next meeting #{next_meeting['id']} launches at {next_meeting['launch_at']} ({timeout:.0f}s)")
+
+        if timeout is None or timeout > 0:
+            readable, _, _ = select.select([wake_sock], [], [], timeout)
+            if readable:
+                drain_wake_socket(wake_sock)
+                continue
+            # Timed out - fall through and dispatch
+
+        dispatch_due(store, launcher)
+
+def print_schedule(store: ScheduleStore):
+    meetings = store.list_meetings()
+    if not meetings:
+        print("📭 Schedule is empty")
+    for meeting in meetings:
+        jitter = f"{meeting['jitter_ms']:.1f} ms" if meeting["jitter_ms"] is not None else "-"
+        print(f"#{meeting['id']:<5} {meeting['scheduled_at']}  {meeting['status']:<10} "
+              f"{meeting['bot_display_name']:<15} jitter={jitter}  {meeting['zoom_link']}")
+
+    stats = store.jitter_stats()
+    if stats["count"]:
+        print(f"📊 Dispatch jitter over {stats['count']} meetings: mean={stats['mean_ms']:.1f} ms, "
+              f"p50={stats['p50_ms']:.1f} ms, p99={stats['p99_ms']:.1f} ms, max={stats['max_ms']:.1f} ms")
 
 def main():
-    if not os.path.exists(SCHEDULE_FILE):
-        print("❌ No scheduled meeting found. Exiting.")
+    parser = argparse.ArgumentParser(description="Proxy-Meet meeting dispatcher")
+    parser.add_argument("--list", action="store_true", help="Print the schedule and jitter stats, then exit")
+    parser.add_argument("--cancel", type=int, metavar="MEETING_ID", help="Cancel a pending meeting")
+    args = parser.parse_args()
+
+    store = ScheduleStore()
+
+    if args.list:
+        print_schedule(store)
         return
 
-    with open(SCHEDULE_FILE, "r") as f:
-        scheduled_time = datetime.fromisoformat(f.read().strip())
+    if args.cancel is not None:
+        if store.cancel_meeting(args.cancel):
+            notify_dispatcher()
+            print(f"🗑️ Cancelled meeting #{args.cancel}")
+        else:
+            print(f"❌ No pending meeting #{args.cancel}")
+        return
 
-    print(f"⏳ Waiting until {scheduled_time}...")
+    try:
+        wake_sock = bind_wake_socket()
+    except OSError:
+        print("ℹ️ A scheduler is already running - it will pick up new meetings automatically.")
+        return
 
-    while datetime.now() < scheduled_time:
-        time.sleep(5)
+    store.import_legacy_schedule(os.getenv("ZOOM_LINK"))
 
-    print("⏰ Time reached!")
-    run_zoom_bot()
+    launcher = make_supervisor_launcher() if DISPATCH_MODE == "supervisor" else run_zoom_bot
 
-    # Clean up
-    os.remove(SCHEDULE_FILE)
-    print("🧹 Removed scheduled_meeting.json")
+    print(f"🗓️ Scheduler started ({DISPATCH_MODE} mode)")
+    try:
+        run_dispatcher(store, wake_sock, launcher)
+    except KeyboardInterrupt:
+        print("⌨️ Scheduler stopped by user")
+        if DISPATCH_MODE == "supervisor":
+            launcher.supervisor.stop_all()
+            launcher.supervisor.wait()
+    finally:
+        wake_sock.close()
+        store.close()
 
 if __name__ == "__main__":
     main()
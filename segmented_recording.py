@@ -0,0 +1,191 @@
+import os
+import json
+import wave
+import queue
+import threading
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from audio_capture import SAMPLE_RATE, SAMPLE_WIDTH, CHANNELS
+from audio_fanout import RingReader
+from utils import TranscriptionResult, SpeakerText, get_transcription_fallback
+
+SEGMENT_SECONDS = int(os.getenv("SEGMENT_SECONDS", 300))
+MANIFEST_NAME = "manifest.json"
+
+SEGMENT_RECORDING = "recording"
+SEGMENT_DONE = "done"
+SEGMENT_TRANSCRIBED = "transcribed"
+SEGMENT_FAILED = "failed"
+
+
+class SegmentWriter:
+    """Ring consumer that cuts the meeting into fixed-length WAV segments.
+
+    Every segment is a complete, independently decodable file, and the
+    manifest is rewritten after each one closes. If the bot crashes, only the
+    segment being written is lost. ``on_segment`` is called with each
+    finished segment entry so it can be processed while the meeting goes on.
+    """
+
+    def __init__(self, reader: RingReader, segments_dir: str,
+                 segment_seconds: int = SEGMENT_SECONDS,
+                 on_segment: Optional[Callable[[Dict], None]] = None,
+                 log: Callable[[str], None] = print):
+        self.reader = reader
+        self.segments_dir = segments_dir
+        self.segment_bytes = segment_seconds * SAMPLE_RATE * SAMPLE_WIDTH * CHANNELS
+        self.on_segment = on_segment
+        self.log = log
+        self.manifest_path = os.path.join(segments_dir, MANIFEST_NAME)
+        self.segments: List[Dict] = []
+        self.stopping = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        os.makedirs(segments_dir, exist_ok=True)
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, daemon=True, name="audio-segments")
+        self.thread.start()
+
+    def stop(self, timeout: float = 10):
+        """Close the final (partial) segment once the ring has been drained"""
+        self.stopping.set()
+        if self.thread:
+            self.thread.join(timeout=timeout)
+            self.thread = None
+
+    def _run(self):
+        current: Optional[wave.Wave_write] = None
+        entry: Optional[Dict] = None
+        written = 0
+        offset_bytes = 0
+
+        while True:
+            data = self.reader.read(32000, timeout=0.5)
+            if not data:
+                # Capture is stopped before the writer, so an empty read while stopping means drained
+                if self.reader.finished or self.stopping.is_set():
+                    break
+                continue
+
+            view = memoryview(data)
+            while len(view):
+                if current is None:
+                    entry, current = self._open_segment(len(self.segments), offset_bytes)
+                    written = 0
+                take = min(len(view), self.segment_bytes - written)
+                current.writeframes(view[:take])
+                written += take
+                offset_bytes += take
+                view = view[take:]
+                if written >= self.segment_bytes:
+                    self._close_segment(entry, current, written)
+                    current = None
+
+        if current is not None:
+            self._close_segment(entry, current, written)
+
+    def _open_segment(self, index: int, offset_bytes: int):
+        filename = f"segment_{index:04d}.wav"
+        wav = wave.open(os.path.join(self.segments_dir, filename), "wb")
+        wav.setnchannels(CHANNELS)
+        wav.setsampwidth(SAMPLE_WIDTH)
+        wav.setframerate(SAMPLE_RATE)
+        entry = {
+            "index": index,
+            "file": filename,
+            "start_s": round(offset_bytes / (SAMPLE_RATE * SAMPLE_WIDTH * CHANNELS), 3),
+            "duration_s": None,
+            "status": SEGMENT_RECORDING,
+            "opened_at": datetime.now().isoformat(),
+        }
+        with self._lock:
+            self.segments.append(entry)
+            self._write_manifest()
+        return entry, wav
+
+    def _close_segment(self, entry: Dict, wav: wave.Wave_write, written: int):
+        wav.close()
+        with self._lock:
+            entry["duration_s"] = round(written / (SAMPLE_RATE * SAMPLE_WIDTH * CHANNELS), 3)
+            entry["status"] = SEGMENT_DONE
+            entry["closed_at"] = datetime.now().isoformat()
+            self._write_manifest()
+        self.log(f"🧩 Segment {entry['index']} closed ({entry['duration_s']}s)")
+        if self.on_segment:
+            self.on_segment(entry)
+
+    def update_segment(self, index: int, **fields):
+        with self._lock:
+            self.segments[index].update(fields)
+            self._write_manifest()
+
+    def _write_manifest(self):
+        manifest = {
+            "sample_rate": SAMPLE_RATE,
+            "channels": CHANNELS,
+            "segments": self.segments,
+        }
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+
+class IncrementalTranscriber:
+    """Transcribes finished segments in the background while the meeting continues."""
+
+    def __init__(self, writer: SegmentWriter, log: Callable[[str], None] = print):
+        self.writer = writer
+        self.log = log
+        self.pending: "queue.Queue[Optional[Dict]]" = queue.Queue()
+        self.results: Dict[int, TranscriptionResult] = {}
+        self.thread = threading.Thread(target=self._run, daemon=True, name="segment-transcriber")
+        self.thread.start()
+
+    def submit(self, entry: Dict):
+        self.pending.put(entry)
+
+    def _run(self):
+        while True:
+            entry = self.pending.get()
+            if entry is None:
+                return
+            self._transcribe(entry)
+
+    def _transcribe(self, entry: Dict):
+        path = os.path.join(self.writer.segments_dir, entry["file"])
+        self.log(f"🔍 Transcribing segment {entry['index']} while the meeting continues...")
+        result = get_transcription_fallback(path, save_locally=False)
+
+        if result is None:
+            self.log(f"⚠️ Segment {entry['index']} transcription failed")
+            self.writer.update_segment(entry["index"], status=SEGMENT_FAILED)
+            return
+
+        transcript_file = entry["file"].replace(".wav", "_transcript.json")
+        with open(os.path.join(self.writer.segments_dir, transcript_file), "w", encoding="utf-8") as f:
+            json.dump([item.model_dump() for item in result.speakers_text], f, indent=2, ensure_ascii=False)
+        self.results[entry["index"]] = result
+        self.writer.update_segment(entry["index"], status=SEGMENT_TRANSCRIBED, transcript=transcript_file)
+
+    def finish(self) -> Optional[TranscriptionResult]:
+        """Wait for the remaining segments and return the merged transcript in meeting order.
+
+        Speaker labels come from each segment's own diarization, so the same
+        person can get different letters in different segments.
+        """
+        self.pending.put(None)
+        self.thread.join()
+
+        if not self.results:
+            return None
+        failed = [s["index"] for s in self.writer.segments if s["status"] == SEGMENT_FAILED]
+        if failed:
+            self.log(f"⚠️ Segments {failed} could not be transcribed")
+            return None
+
+        speakers_text: List[SpeakerText] = []
+        for index in sorted(self.results):
+            speakers_text.extend(self.results[index].speakers_text)
+        return TranscriptionResult(speakers_text=speakers_text)
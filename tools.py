@@ -1,4 +1,5 @@
 import os
+import time
 import socket
 import requests
 from crewai.tools import tool
@@ -8,6 +9,7 @@ from langchain_community.tools.gmail.utils import (
     get_gmail_credentials,
 )
 from typing import Union, List, Optional
+from pipeline_metrics import record_http
 
 # --- FORCE IPv4 CONFIGURATION ---
 def force_ipv4_globally():
@@ -126,12 +128,17 @@ else:
 
 def ipv4_safe_tool_call(tool_func, *args, **kwargs):
     """Wrapper to ensure tool calls use IPv4 and handle errors gracefully"""
+    name = getattr(tool_func, '__name__', None) or getattr(getattr(tool_func, '__self__', None), 'name', 'tool')
+    started = time.perf_counter()
     try:
-        print(f"🌐 Executing {tool_func.__name__ if hasattr(tool_func, '__name__') else 'tool'} via IPv4...")
+        print(f"🌐 Executing {name} via IPv4...")
         result = tool_func(*args, **kwargs)
         print(f"✅ Tool call completed via IPv4")
+        # CrewAI may run tools off the pipeline's thread
+        record_http("gmail", "TOOL", name, (time.perf_counter() - started) * 1000, any_thread=True)
         return result
     except Exception as e:
+        record_http("gmail", "TOOL", name, (time.perf_counter() - started) * 1000, any_thread=True, ok=False)
         error_msg = f"❌ Tool call failed: {str(e)}"
         print(error_msg)
         # Check if it's a network-related error
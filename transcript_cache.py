@@ -0,0 +1,189 @@
+import os
+import json
+import time
+import argparse
+import threading
+import subprocess
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from pipeline_checkpoint import file_sha256, hash_inputs
+
+TRANSCRIPT_CACHE_DIR = os.getenv("TRANSCRIPT_CACHE_DIR", os.path.join("cache", "transcripts"))
+# Least recently used transcripts are evicted beyond this size (0 disables the cache)
+TRANSCRIPT_CACHE_MAX_MB = float(os.getenv("TRANSCRIPT_CACHE_MAX_MB", 200))
+# Only used to put a price on hits and misses in the report
+TRANSCRIPTION_COST_PER_HOUR = float(os.getenv("TRANSCRIPTION_COST_PER_HOUR", 0.37))
+
+EVENTS_NAME = "events.jsonl"
+
+
+def audio_duration_seconds(audio_file_path: str) -> Optional[float]:
+    try:
+        output = subprocess.run(
+            ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", audio_file_path],
+            capture_output=True, text=True, timeout=10,
+        ).stdout.strip()
+        return round(float(output), 2)
+    except (OSError, ValueError, subprocess.TimeoutExpired):
+        return None
+
+
+class TranscriptCache:
+    """Transcripts stored under a hash of the audio bytes and the transcription config.
+
+    The key is the streaming SHA-256 of the file plus the engine chain and its
+    settings, so the same recording reprocessed under a different name or
+    folder is still a hit, and changing an engine or model is a miss. Every
+    lookup is appended to ``events.jsonl`` for the hit/miss report. Entries
+    are evicted least recently used first once the cache grows past
+    ``max_bytes``.
+    """
+
+    def __init__(self, config: Dict, cache_dir: str = TRANSCRIPT_CACHE_DIR,
+                 max_bytes: int = int(TRANSCRIPT_CACHE_MAX_MB * 2 ** 20), log: Callable[[str], None] = print):
+        self.config = config
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.log = log
+        self.events_path = os.path.join(cache_dir, EVENTS_NAME)
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def key(self, audio_file_path: str) -> str:
+        return hash_inputs(file_sha256(audio_file_path), self.config)
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, audio_file_path: str, key: str) -> Optional[List[Dict]]:
+        """The cached utterances for ``key``, or None; records the lookup either way."""
+        started = time.perf_counter()
+        path = self._entry_path(key)
+        entry = None
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    entry = json.load(f)
+                # The entry's mtime is its last use, which is what eviction goes by
+                os.utime(path)
+            except (OSError, json.JSONDecodeError) as e:
+                self.log(f"⚠️ Ignoring unreadable cached transcript {key[:12]}: {e}")
+                entry = None
+        if entry is None:
+            self._record_event(key, audio_file_path, hit=False, audio_seconds=audio_duration_seconds(audio_file_path),
+                               lookup_ms=(time.perf_counter() - started) * 1000)
+            return None
+        self._record_event(key, audio_file_path, hit=True, audio_seconds=entry.get("audio_seconds"),
+                           lookup_ms=(time.perf_counter() - started) * 1000, engine=entry.get("engine"))
+        return entry["transcript"]
+
+    def put(self, audio_file_path: str, key: str, transcript: List[Dict], engine: str):
+        path = self._entry_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        entry = {
+            "key": key,
+            "engine": engine,
+            "config": self.config,
+            "audio_file": os.path.basename(audio_file_path),
+            "audio_bytes": os.path.getsize(audio_file_path),
+            "audio_seconds": audio_duration_seconds(audio_file_path),
+            "created_at": datetime.now().isoformat(),
+            "transcript": transcript,
+        }
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self):
+        """Drop least recently used entries until the cache fits in ``max_bytes``."""
+        with self._lock:
+            entries = []
+            for root, _, files in os.walk(self.cache_dir):
+                for name in files:
+                    if name.endswith(".json"):
+                        path = os.path.join(root, name)
+                        try:
+                            stat = os.stat(path)
+                        except FileNotFoundError:
+                            continue
+                        entries.append((stat.st_mtime, stat.st_size, path))
+            total = sum(size for _, size, _ in entries)
+            evicted = 0
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                evicted += 1
+            if evicted:
+                self.log(f"🧹 Evicted {evicted} cached transcript(s), cache now {total / 2 ** 20:.1f} MB")
+
+    def _record_event(self, key: str, audio_file_path: str, hit: bool, audio_seconds: Optional[float],
+                      lookup_ms: float, engine: Optional[str] = None):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        event = {
+            "at": datetime.now().isoformat(),
+            "key": key,
+            "hit": hit,
+            "audio_file": os.path.abspath(audio_file_path),
+            "audio_seconds": audio_seconds,
+            "lookup_ms": round(lookup_ms, 1),
+            "engine": engine,
+        }
+        with self._lock, open(self.events_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(event) + "\n")
+
+
+def cache_report(cache_dir: str = TRANSCRIPT_CACHE_DIR, since: Optional[datetime] = None) -> Dict:
+    """Hits, misses and what they cost, from the cache's lookup log."""
+    events = []
+    events_path = os.path.join(cache_dir, EVENTS_NAME)
+    if os.path.exists(events_path):
+        with open(events_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    event = json.loads(line)
+                    if since is None or datetime.fromisoformat(event["at"]) >= since:
+                        events.append(event)
+
+    hits = [e for e in events if e["hit"]]
+    misses = [e for e in events if not e["hit"]]
+    hit_hours = sum(e["audio_seconds"] or 0 for e in hits) / 3600
+    miss_hours = sum(e["audio_seconds"] or 0 for e in misses) / 3600
+    sizes = [os.path.getsize(os.path.join(root, name))
+             for root, _, files in os.walk(cache_dir) for name in files if name.endswith(".json")]
+    return {
+        "lookups": len(events),
+        "hits": len(hits),
+        "misses": len(misses),
+        "hit_rate": round(len(hits) / len(events), 3) if events else None,
+        "audio_hours_from_cache": round(hit_hours, 2),
+        "audio_hours_transcribed": round(miss_hours, 2),
+        "est_cost_saved": round(hit_hours * TRANSCRIPTION_COST_PER_HOUR, 2),
+        "est_cost_spent": round(miss_hours * TRANSCRIPTION_COST_PER_HOUR, 2),
+        "avg_hit_lookup_ms": round(sum(e["lookup_ms"] for e in hits) / len(hits), 1) if hits else None,
+        "entries": len(sizes),
+        "size_mb": round(sum(sizes) / 2 ** 20, 2),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Transcript cache hit/miss report")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="Only count lookups from this time on")
+    parser.add_argument("--cache-dir", default=TRANSCRIPT_CACHE_DIR)
+    args = parser.parse_args()
+
+    report = cache_report(args.cache_dir, args.since)
+    print(f"📊 {report['lookups']} lookup(s): {report['hits']} hit(s), {report['misses']} miss(es)"
+          + (f", hit rate {report['hit_rate']:.0%}" if report["hit_rate"] is not None else ""))
+    print(f"♻️ {report['audio_hours_from_cache']} h served from cache (~${report['est_cost_saved']} saved), "
+          f"{report['audio_hours_transcribed']} h transcribed (~${report['est_cost_spent']})")
+    print(f"💾 {report['entries']} cached transcript(s), {report['size_mb']} MB")
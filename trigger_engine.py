@@ -0,0 +1,207 @@
+import os
+import re
+import json
+import time
+from collections import deque
+from concurrent.futures import Executor
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+TRIGGERS_FILE = os.getenv("TRIGGERS_FILE", "triggers.json")
+# A trigger that fired is ignored for this long, so one request repeated or re-transcribed acts once
+TRIGGER_DEBOUNCE_SECONDS = float(os.getenv("TRIGGER_DEBOUNCE_SECONDS", 10))
+
+# Used when there is no triggers file. {bot_name} is filled in per session.
+DEFAULT_TRIGGERS = [
+    {"name": "mention", "phrases": ["{bot_name}"], "action": "respond", "fallback": True},
+    {"name": "action_item", "phrases": ["take an action item", "note an action item", "add an action item"],
+     "action": "action_item"},
+    {"name": "summary", "phrases": ["summarize so far", "summarise so far", "give us a summary"],
+     "action": "summarize", "debounce": 60},
+]
+
+WORD_PATTERN = re.compile(r"[a-z0-9']+")
+
+
+def tokenize(text: str) -> List[str]:
+    return WORD_PATTERN.findall(text.lower())
+
+
+class Trigger:
+    """A named set of phrases routed to one handler.
+
+    A ``fallback`` trigger (the plain name mention) fires only when no other
+    trigger matched the same transcript, so "prasun, take an action item"
+    runs the action item handler and not the away message too.
+    """
+
+    def __init__(self, name: str, phrases: List[str], handler: Callable[[Dict], None],
+                 debounce: float = TRIGGER_DEBOUNCE_SECONDS, fallback: bool = False):
+        self.name = name
+        self.phrases = [" ".join(tokenize(p)) for p in phrases if tokenize(p)]
+        self.handler = handler
+        self.debounce = debounce
+        self.fallback = fallback
+        self.last_fired: Optional[float] = None
+        self.fired = 0
+        self.debounced = 0
+
+
+class TriggerEngine:
+    """Scans each transcript once for every trigger phrase at the same time.
+
+    All phrases are compiled into one word-level Aho-Corasick automaton, so
+    a scan costs one step per word plus one per match, however many
+    triggers and aliases are configured. Matches are debounced per trigger
+    and handed to the trigger's handler. With an ``executor`` handlers run
+    there, so a slow one (a Gemini call, a chat send) never holds up the
+    audio thread that called ``dispatch``.
+    """
+
+    def __init__(self, log: Callable[[str], None] = print, executor: Optional[Executor] = None):
+        self.log = log
+        self.executor = executor
+        self.triggers: List[Trigger] = []
+        # Automaton: word transitions, failure links and (trigger, phrase length) outputs per state
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.outputs: List[List[Tuple[int, int]]] = [[]]
+        self.scans = 0
+        self.scan_seconds = 0.0
+        self.history: Deque[Dict] = deque(maxlen=200)
+
+    def add(self, trigger: Trigger) -> Trigger:
+        index = len(self.triggers)
+        self.triggers.append(trigger)
+        for phrase in trigger.phrases:
+            state = 0
+            words = phrase.split()
+            for word in words:
+                if word not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.outputs.append([])
+                    self.goto[state][word] = len(self.goto) - 1
+                state = self.goto[state][word]
+            self.outputs[state].append((index, len(words)))
+        self._build_failure_links()
+        return trigger
+
+    def _build_failure_links(self):
+        queue = deque()
+        for state in self.goto[0].values():
+            self.fail[state] = 0
+            queue.append(state)
+        while queue:
+            state = queue.popleft()
+            for word, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and word not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(word, 0)
+                self.outputs[child] = self.outputs[child] + [
+                    out for out in self.outputs[self.fail[child]] if out not in self.outputs[child]
+                ]
+
+    @property
+    def phrases(self) -> List[str]:
+        return [phrase for trigger in self.triggers for phrase in trigger.phrases]
+
+    def scan(self, text: str) -> List[Dict]:
+        """Every phrase occurrence in ``text``, first match per trigger, in transcript order."""
+        started = time.perf_counter()
+        words = tokenize(text)
+        matches: Dict[int, Dict] = {}
+        state = 0
+        for position, word in enumerate(words):
+            while state and word not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(word, 0)
+            for index, length in self.outputs[state]:
+                if index in matches:
+                    continue
+                matches[index] = {
+                    "trigger": self.triggers[index].name,
+                    "phrase": " ".join(words[position - length + 1:position + 1]),
+                    "text": text,
+                    # What was said after the phrase, e.g. the action item itself
+                    "remainder": " ".join(words[position + 1:]),
+                    "index": index,
+                    "start": position - length + 1,
+                }
+        self.scans += 1
+        self.scan_seconds += time.perf_counter() - started
+        return sorted(matches.values(), key=lambda m: m["start"])
+
+    def dispatch(self, text: str) -> List[str]:
+        """Scan ``text`` and run the handler of every trigger that matched and isn't debounced."""
+        matches = self.scan(text)
+        if any(not self.triggers[m["index"]].fallback for m in matches):
+            matches = [m for m in matches if not self.triggers[m["index"]].fallback]
+
+        fired = []
+        now = time.monotonic()
+        matched_at = time.perf_counter()
+        for match in matches:
+            match["matched_at"] = matched_at
+            trigger = self.triggers[match["index"]]
+            if trigger.last_fired is not None and now - trigger.last_fired < trigger.debounce:
+                trigger.debounced += 1
+                continue
+            trigger.last_fired = now
+            trigger.fired += 1
+            fired.append(trigger.name)
+            self.history.append({"trigger": trigger.name, "phrase": match["phrase"], "at": time.time()})
+            self.log(f"🗣 Trigger '{trigger.name}' matched '{match['phrase']}'")
+            if self.executor:
+                self.executor.submit(self._run_handler, trigger, match)
+            else:
+                self._run_handler(trigger, match)
+        return fired
+
+    def _run_handler(self, trigger: Trigger, match: Dict):
+        try:
+            trigger.handler(match)
+        except Exception as e:
+            self.log(f"❌ Trigger '{trigger.name}' handler failed: {e}")
+
+    def stats(self) -> Dict:
+        return {
+            "triggers": {t.name: {"phrases": len(t.phrases), "fired": t.fired, "debounced": t.debounced}
+                         for t in self.triggers},
+            "automaton_states": len(self.goto),
+            "scans": self.scans,
+            "avg_scan_us": round(self.scan_seconds / self.scans * 1e6, 1) if self.scans else None,
+            "history": list(self.history),
+        }
+
+
+def load_trigger_specs(path: str = TRIGGERS_FILE) -> List[Dict]:
+    """Trigger definitions from ``path`` (a JSON list), or the defaults if it doesn't exist."""
+    if not os.path.exists(path):
+        return DEFAULT_TRIGGERS
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def build_engine(handlers: Dict[str, Callable[[Dict], None]], bot_name: str,
+                 aliases: Optional[List[str]] = None, specs: Optional[List[Dict]] = None,
+                 log: Callable[[str], None] = print, executor: Optional[Executor] = None) -> TriggerEngine:
+    """Compile trigger specs into an engine, routing each spec's ``action`` to a handler."""
+    engine = TriggerEngine(log, executor)
+    for spec in specs if specs is not None else load_trigger_specs():
+        action = spec["action"]
+        if action not in handlers:
+            raise ValueError(f"Trigger '{spec['name']}' uses unknown action '{action}'. "
+                             f"Choose one of: {', '.join(handlers)}")
+        phrases = [p.format(bot_name=bot_name) for p in spec["phrases"]]
+        if spec.get("fallback") and aliases:
+            phrases += aliases
+        engine.add(Trigger(
+            spec["name"],
+            phrases,
+            handlers[action],
+            debounce=float(spec.get("debounce", TRIGGER_DEBOUNCE_SECONDS)),
+            fallback=bool(spec.get("fallback", False)),
+        ))
+    return engine
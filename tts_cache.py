@@ -0,0 +1,198 @@
+import os
+import sys
+import time
+import hashlib
+import threading
+import subprocess
+from typing import Callable, Dict, List, Optional
+
+TTS_ENGINE = os.getenv("TTS_ENGINE", "sapi" if sys.platform == "win32" else "espeak")
+# Output device the bot speaks through (its microphone in the meeting); default output if unset
+TTS_OUTPUT_DEVICE = os.getenv("TTS_OUTPUT_DEVICE")
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", os.path.join("cache", "tts"))
+
+# Rendered phrases are stored as 48 kHz mono signed 16-bit PCM, which every output device accepts
+PLAYBACK_RATE = 48000
+PLAYBACK_CHANNELS = 1
+PLAYBACK_WIDTH = 2
+PLAYBACK_BLOCK_FRAMES = 960  # 20 ms
+
+
+class TtsEngine:
+    """A local text-to-speech engine that renders a phrase to a WAV file."""
+
+    name = "base"
+
+    def __init__(self, voice: Optional[str] = None):
+        self.voice = voice
+
+    def synthesize(self, text: str, wav_path: str):
+        raise NotImplementedError
+
+    def describe(self) -> str:
+        return f"{self.name}:{self.voice}" if self.voice else self.name
+
+
+class SapiEngine(TtsEngine):
+    """Windows System.Speech, the voice the bot has always used, rendered to a file instead of spoken."""
+
+    name = "sapi"
+
+    def synthesize(self, text: str, wav_path: str):
+        escaped_text = text.replace("'", "''")
+        escaped_path = os.path.abspath(wav_path).replace("'", "''")
+        select_voice = f"$s.SelectVoice('{self.voice}'); " if self.voice else ""
+        script = (
+            "Add-Type -AssemblyName System.Speech; "
+            "$s = New-Object System.Speech.Synthesis.SpeechSynthesizer; "
+            f"{select_voice}$s.SetOutputToWaveFile('{escaped_path}'); "
+            f"$s.Speak('{escaped_text}'); $s.Dispose()"
+        )
+        subprocess.run(["powershell", "-NoProfile", "-Command", script], check=True, capture_output=True)
+
+
+class EspeakEngine(TtsEngine):
+    """espeak-ng, available on most Linux distributions."""
+
+    name = "espeak"
+
+    def synthesize(self, text: str, wav_path: str):
+        cmd = ["espeak-ng", "-w", wav_path]
+        if self.voice:
+            cmd += ["-v", self.voice]
+        subprocess.run(cmd + [text], check=True, capture_output=True)
+
+
+class Pyttsx3Engine(TtsEngine):
+    """pyttsx3, which wraps SAPI5, NSSpeechSynthesizer or espeak depending on the platform."""
+
+    name = "pyttsx3"
+
+    def synthesize(self, text: str, wav_path: str):
+        import pyttsx3
+
+        engine = pyttsx3.init()
+        if self.voice:
+            engine.setProperty("voice", self.voice)
+        engine.save_to_file(text, wav_path)
+        engine.runAndWait()
+
+
+TTS_ENGINES = {engine.name: engine for engine in (SapiEngine, EspeakEngine, Pyttsx3Engine)}
+
+
+def create_tts_engine(name: Optional[str] = None, voice: Optional[str] = None) -> TtsEngine:
+    name = (name or TTS_ENGINE).lower()
+    if name not in TTS_ENGINES:
+        raise ValueError(f"Unknown TTS engine '{name}'. Choose one of: {', '.join(TTS_ENGINES)}")
+    return TTS_ENGINES[name](voice or os.getenv("TTS_VOICE"))
+
+
+class ResponseAudioCache:
+    """Spoken responses rendered once and kept as playback-ready PCM.
+
+    ``prepare`` renders each phrase with the TTS engine and converts it with
+    ffmpeg. The PCM is kept on disk under a hash of engine, voice and text,
+    so later sessions with the same phrases skip synthesis altogether.
+    ``play`` writes the samples to an output stream that was opened ahead of
+    time, so a response starts as soon as the device takes the first block.
+    """
+
+    def __init__(self, engine: TtsEngine, cache_dir: str = TTS_CACHE_DIR,
+                 output_device: Optional[str] = TTS_OUTPUT_DEVICE, log: Callable[[str], None] = print):
+        self.engine = engine
+        self.cache_dir = cache_dir
+        self.output_device = output_device
+        self.log = log
+        self.phrases: Dict[str, bytes] = {}
+        self.stream = None
+        self.play_lock = threading.Lock()
+        self.prepare_seconds: Optional[float] = None
+        self.playbacks: List[Dict] = []
+
+    def _cache_path(self, text: str) -> str:
+        key = hashlib.sha256(f"{self.engine.describe()}\n{text}".encode("utf-8")).hexdigest()[:24]
+        return os.path.join(self.cache_dir, f"{key}.pcm")
+
+    def _render(self, text: str, pcm_path: str):
+        wav_path = pcm_path[:-4] + ".wav"
+        self.engine.synthesize(text, wav_path)
+        subprocess.run([
+            "ffmpeg", "-y", "-hide_banner", "-loglevel", "error", "-i", wav_path,
+            "-f", "s16le", "-ac", str(PLAYBACK_CHANNELS), "-ar", str(PLAYBACK_RATE), pcm_path + ".tmp",
+        ], check=True)
+        os.replace(pcm_path + ".tmp", pcm_path)
+        os.remove(wav_path)
+
+    def prepare(self, phrases: Dict[str, str]):
+        """Render (or load from disk) every phrase and open the output stream."""
+        started = time.perf_counter()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        rendered = 0
+        for key, text in phrases.items():
+            pcm_path = self._cache_path(text)
+            if not os.path.exists(pcm_path):
+                self._render(text, pcm_path)
+                rendered += 1
+            with open(pcm_path, "rb") as f:
+                self.phrases[key] = f.read()
+        self._open_stream()
+        self.prepare_seconds = time.perf_counter() - started
+        self.log(f"🔈 {len(phrases)} response(s) ready with {self.engine.describe()} "
+                 f"({rendered} rendered, {len(phrases) - rendered} from cache) in {self.prepare_seconds:.2f}s")
+
+    def _open_stream(self):
+        import sounddevice as sd
+
+        self.stream = sd.RawOutputStream(
+            samplerate=PLAYBACK_RATE,
+            channels=PLAYBACK_CHANNELS,
+            dtype='int16',
+            device=self.output_device,
+            blocksize=PLAYBACK_BLOCK_FRAMES,
+        )
+        self.stream.start()
+
+    def has(self, key: str) -> bool:
+        return key in self.phrases and self.stream is not None
+
+    def play(self, key: str, triggered_at: Optional[float] = None) -> threading.Thread:
+        """Play a cached phrase in the background; latency is measured from ``triggered_at``."""
+        triggered_at = triggered_at or time.perf_counter()
+        thread = threading.Thread(target=self._play, args=(key, triggered_at), daemon=True, name=f"tts-{key}")
+        thread.start()
+        return thread
+
+    def _play(self, key: str, triggered_at: float):
+        pcm = memoryview(self.phrases[key])
+        block_bytes = PLAYBACK_BLOCK_FRAMES * PLAYBACK_WIDTH * PLAYBACK_CHANNELS
+        # One response at a time; overlapping speech would be unintelligible anyway
+        with self.play_lock:
+            first_block_at = None
+            for offset in range(0, len(pcm), block_bytes):
+                self.stream.write(pcm[offset:offset + block_bytes])
+                if first_block_at is None:
+                    first_block_at = time.perf_counter()
+            latency_ms = round((first_block_at - triggered_at) * 1000, 1) if first_block_at else None
+            self.playbacks.append({
+                "phrase": key,
+                "trigger_to_speech_ms": latency_ms,
+                "duration_s": round(len(pcm) / (PLAYBACK_RATE * PLAYBACK_WIDTH * PLAYBACK_CHANNELS), 2),
+            })
+            self.log(f"🔊 Spoke '{key}' {latency_ms} ms after the trigger")
+
+    def close(self):
+        # Let a response that is still playing finish
+        with self.play_lock:
+            if self.stream:
+                self.stream.stop()
+                self.stream.close()
+                self.stream = None
+
+    def stats(self) -> Dict:
+        return {
+            "engine": self.engine.describe(),
+            "prepare_seconds": round(self.prepare_seconds, 3) if self.prepare_seconds is not None else None,
+            "phrases": list(self.phrases),
+            "playbacks": self.playbacks,
+        }
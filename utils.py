@@ -2,6 +2,8 @@
 import os
 import json
 import logging
+import tempfile
+import subprocess
 from datetime import datetime
 import assemblyai as aai
 from pydantic import BaseModel
@@ -9,6 +11,10 @@ from typing import List, Optional
 from dotenv import load_dotenv
 from pydantic_ai import Agent, BinaryContent
 import mimetypes
+import glob
+import time
+from transcript_cache import TranscriptCache, audio_duration_seconds, TRANSCRIPTION_COST_PER_HOUR
+from pipeline_metrics import metrics_span, record_http
 
 # Load environment variables from .env file
 load_dotenv()
@@ -20,6 +26,21 @@ AAI_API_KEY = os.getenv("AAI_API_KEY")
 if AAI_API_KEY:
     aai.settings.api_key = AAI_API_KEY
 
+# Utterances the realtime stream finalized during the meeting, one JSON object per line
+LIVE_TRANSCRIPT_NAME = "live_transcript.jsonl"
+# Low-confidence live utterances closer together than this are re-transcribed as one span
+LIVE_SPAN_GAP_SECONDS = 1.0
+
+# Transcription settings; together they form part of the transcript cache key
+ASSEMBLYAI_SPEAKER_LABELS = True
+GEMINI_TRANSCRIPTION_MODEL = 'google-gla:gemini-2.5-pro'
+
+transcript_cache = TranscriptCache(
+    {"chain": ["assemblyai", "gemini"], "assemblyai_speaker_labels": ASSEMBLYAI_SPEAKER_LABELS,
+     "gemini_model": GEMINI_TRANSCRIPTION_MODEL},
+    log=logging.info,
+)
+
 # --- Pydantic Models for Transcript Processing ---
 class SpeakerText(BaseModel):
     speaker: str
@@ -133,9 +154,14 @@ def process_audio_assemblyai(audio_file_path: str,
         return None
     
     try:
-        config = aai.TranscriptionConfig(speaker_labels=True)
+        config = aai.TranscriptionConfig(speaker_labels=ASSEMBLYAI_SPEAKER_LABELS)
         transcriber = aai.Transcriber()
+        started = time.perf_counter()
         transcript = transcriber.transcribe(audio_file_path, config)
+        # Upload, queueing and polling together; the SDK doesn't expose them separately
+        record_http("assemblyai", "POST", "transcribe", (time.perf_counter() - started) * 1000,
+                    ok=transcript.status != aai.TranscriptStatus.error,
+                    bytes_sent=os.path.getsize(audio_file_path))
 
         if transcript.status == aai.TranscriptStatus.error:
             logging.error(f"AssemblyAI transcription failed: {transcript.error}")
@@ -180,7 +206,7 @@ async def process_audio_Gemini(audio_file_path: str,
         return None
     
     Transcritor_agent = Agent(
-        'google-gla:gemini-2.5-pro',
+        GEMINI_TRANSCRIPTION_MODEL,
         output_type=TranscriptionResult,
         system_prompt=""" 
             You are an advanced AI conversation analyzer specializing in call center interactions.
@@ -216,9 +242,12 @@ async def process_audio_Gemini(audio_file_path: str,
         logging.info(f"Sending audio to Gemini with media type: {media_type}")
         
         # Fix: Proper type annotation and result handling
+        started = time.perf_counter()
         result = await Transcritor_agent.run([
             BinaryContent(data=audio_bytes, media_type=media_type)
         ])
+        record_http("gemini", "POST", GEMINI_TRANSCRIPTION_MODEL, (time.perf_counter() - started) * 1000,
+                    bytes_sent=len(audio_bytes))
 
         # Fix: Access .data instead of .output
         if result and result.data:
@@ -241,21 +270,60 @@ async def process_audio_Gemini(audio_file_path: str,
         return None
 
 
+def _saved_transcript_exists(audio_file_path: str, output_dir: Optional[str] = None) -> bool:
+    base_name = os.path.splitext(os.path.basename(audio_file_path))[0]
+    directory = output_dir or os.path.dirname(audio_file_path)
+    return bool(glob.glob(os.path.join(glob.escape(directory), f"{glob.escape(base_name)}_transcript_*.json")))
+
+
+def _cache_transcript(audio_file_path: str, cache_key: Optional[str], result: TranscriptionResult, engine: str):
+    if cache_key is None:
+        return
+    try:
+        transcript_cache.put(audio_file_path, cache_key, [item.model_dump() for item in result.speakers_text], engine)
+    except OSError as e:
+        logging.warning(f"Could not cache transcript: {e}")
+
+
 def get_transcription_fallback(audio_file_path: str, 
                              save_locally: bool = True, 
                              output_dir: Optional[str] = None,
-                             save_as_text: bool = False) -> Optional[TranscriptionResult]:
+                             save_as_text: bool = False,
+                             use_cache: bool = True) -> Optional[TranscriptionResult]:
     """
     Try both transcription methods with fallback.
-    First tries AssemblyAI, then Gemini if that fails.
+    First checks the transcript cache, then tries AssemblyAI, then Gemini if that fails.
+    ``use_cache=False`` skips the cache for throwaway clips that will never be looked up again.
     """
+    cache_key = None
+    if use_cache and transcript_cache.enabled:
+        with metrics_span("transcribe.cache") as span:
+            cache_key = transcript_cache.key(audio_file_path)
+            cached = transcript_cache.get(audio_file_path, cache_key)
+            span["hit"] = cached is not None
+        if cached is not None:
+            result = TranscriptionResult(speakers_text=[SpeakerText(**item) for item in cached])
+            logging.info(f"Transcript cache hit for {audio_file_path} ({len(result.speakers_text)} utterances)")
+            # The first run already saved this recording's transcript next to it
+            if save_locally and not _saved_transcript_exists(audio_file_path, output_dir):
+                save_transcript_locally(result, audio_file_path, output_dir, "Cache")
+                if save_as_text:
+                    save_transcript_as_text(result, audio_file_path, output_dir, "Cache")
+            return result
+
     logging.info("Starting transcription with fallback strategy")
     
     # Try AssemblyAI first (faster and more reliable for basic transcription)
     try:
-        result = process_audio_assemblyai(audio_file_path, save_locally, output_dir, save_as_text)
+        with metrics_span("transcribe.assemblyai") as span:
+            result = process_audio_assemblyai(audio_file_path, save_locally, output_dir, save_as_text)
+            span["ok"] = bool(result and result.speakers_text)
+            audio_seconds = audio_duration_seconds(audio_file_path)
+            if span["ok"] and audio_seconds:
+                span["est_cost"] = round(audio_seconds / 3600 * TRANSCRIPTION_COST_PER_HOUR, 4)
         if result and result.speakers_text:
             logging.info("Successfully transcribed using AssemblyAI")
+            _cache_transcript(audio_file_path, cache_key, result, "assemblyai")
             return result
         else:
             logging.warning("AssemblyAI transcription returned empty or failed")
@@ -266,9 +334,12 @@ def get_transcription_fallback(audio_file_path: str,
     try:
         import asyncio
         logging.info("Falling back to Gemini transcription")
-        result = asyncio.run(process_audio_Gemini(audio_file_path, save_locally, output_dir, save_as_text))
+        with metrics_span("transcribe.gemini") as span:
+            result = asyncio.run(process_audio_Gemini(audio_file_path, save_locally, output_dir, save_as_text))
+            span["ok"] = bool(result and result.speakers_text)
         if result and result.speakers_text:
             logging.info("Successfully transcribed using Gemini")
+            _cache_transcript(audio_file_path, cache_key, result, "gemini")
             return result
         else:
             logging.error("Gemini transcription also failed or returned empty")
@@ -343,4 +414,110 @@ def load_transcript_from_file(transcript_file_path: str) -> Optional[Transcripti
         
     except Exception as e:
         logging.error(f"Failed to load transcript from file: {e}")
-        return None
\ No newline at end of file
+        return None
+
+def load_live_transcript(live_transcript_path: str) -> List[dict]:
+    """Load the utterances the bot persisted during the meeting, in recording order."""
+    utterances = []
+    with open(live_transcript_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                utterances.append(json.loads(line))
+            except json.JSONDecodeError:
+                # The bot may have been killed mid-write; only the last line can be torn
+                logging.warning(f"Skipping unreadable line in {live_transcript_path}")
+    return sorted(utterances, key=lambda u: u["start_s"])
+
+
+def _low_confidence_spans(utterances: List[dict], min_confidence: float) -> List[List[int]]:
+    """Group indexes of neighbouring low-confidence utterances into spans worth one request each."""
+    spans: List[List[int]] = []
+    for i, utterance in enumerate(utterances):
+        if (utterance.get("confidence") or 0) >= min_confidence:
+            continue
+        if spans and spans[-1][-1] == i - 1 and \
+                utterance["start_s"] - utterances[i - 1]["end_s"] < LIVE_SPAN_GAP_SECONDS:
+            spans[-1].append(i)
+        else:
+            spans.append([i])
+    return spans
+
+
+def _transcribe_span(audio_file_path: str, start_s: float, end_s: float) -> Optional[str]:
+    """Cut ``start_s``-``end_s`` out of the recording and transcribe just that."""
+    with tempfile.TemporaryDirectory() as tmp_dir, \
+            metrics_span("transcribe.retranscribe_clip", start_s=start_s, end_s=end_s):
+        clip_path = os.path.join(tmp_dir, "span.wav")
+        subprocess.run([
+            "ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+            "-ss", f"{max(start_s - 0.25, 0):.2f}", "-to", f"{end_s + 0.25:.2f}",
+            "-i", audio_file_path, "-ac", "1", "-ar", "16000", clip_path,
+        ], check=True)
+        # The clip is a temp file; caching it would only add entries and events no lookup will ever hit
+        result = get_transcription_fallback(clip_path, save_locally=False, use_cache=False)
+    if not result or not result.speakers_text:
+        return None
+    return " ".join(item.text for item in result.speakers_text)
+
+
+def build_transcript_from_live(audio_file_path: str,
+                               utterances: List[dict],
+                               min_confidence: float = 0.6,
+                               retranscribe_low_confidence: bool = False) -> Optional[TranscriptionResult]:
+    """
+    Build the meeting transcript from live utterances instead of re-uploading the recording.
+
+    With ``retranscribe_low_confidence``, runs of utterances below ``min_confidence``
+    are cut from the recording and sent through the batch fallback on their own;
+    the live text is kept for any span that fails. The realtime stream has no
+    diarization, so every utterance is attributed to "Speaker".
+    """
+    if not utterances:
+        return None
+
+    texts = [u["text"] for u in utterances]
+    if retranscribe_low_confidence:
+        spans = _low_confidence_spans(utterances, min_confidence)
+        logging.info(f"Re-transcribing {len(spans)} low-confidence span(s) of {len(utterances)} live utterances")
+        for span in spans:
+            start_s, end_s = utterances[span[0]]["start_s"], utterances[span[-1]]["end_s"]
+            try:
+                text = _transcribe_span(audio_file_path, start_s, end_s)
+            except Exception as e:
+                logging.error(f"Re-transcribing {start_s:.1f}-{end_s:.1f}s failed: {e}")
+                text = None
+            if text:
+                texts[span[0]] = text
+                for i in span[1:]:
+                    texts[i] = ""
+
+    speakers_text = [SpeakerText(speaker="Speaker", text=text) for text in texts if text.strip()]
+    return TranscriptionResult(speakers_text=speakers_text) if speakers_text else None
+
+
+def summarize_live_transcript(lines: List[str], max_words: int = 80) -> Optional[str]:
+    """Short, chat-sized summary of what has been said so far in a live meeting."""
+    if not lines:
+        return None
+
+    try:
+        summary_agent = Agent(
+            'google-gla:gemini-2.5-flash',
+            system_prompt=f"""
+                You summarize a meeting that is still in progress from its live transcript.
+                Reply with a plain-text summary of at most {max_words} words: the main topics,
+                any decisions and any action items so far. No headings or markdown.""",
+            name='Live_Summarizer',
+        )
+        result = summary_agent.run_sync("\n".join(lines))
+        if result and result.data:
+            return str(result.data).strip()
+        logging.error("Gemini returned an empty live summary")
+        return None
+
+    except Exception as e:
+        logging.error(f"Live summary failed: {e}")
+        return None
@@ -0,0 +1,113 @@
+import os
+from collections import deque
+from typing import Dict, List, Optional
+import numpy as np
+from audio_capture import SAMPLE_RATE, SAMPLE_WIDTH, CHANNELS
+
+VAD_ENABLED = os.getenv("VAD_ENABLED", "true").lower() in ("1", "true", "yes")
+# Frames louder than this (dB relative to full scale) count as voice
+VAD_THRESHOLD_DB = float(os.getenv("VAD_THRESHOLD_DB", -45))
+# Audio kept from before the onset so the first syllable isn't clipped
+VAD_PREROLL_MS = int(os.getenv("VAD_PREROLL_MS", 300))
+# How long to keep sending after the level drops, so word endings and short pauses get through
+VAD_HANGOVER_MS = int(os.getenv("VAD_HANGOVER_MS", 500))
+
+VAD_FRAME_MS = 20
+# AssemblyAI realtime rejects chunks shorter than 100 ms
+MIN_SEND_MS = 100
+
+
+class VoiceActivityGate:
+    """Streaming energy VAD that drops silence before it reaches the websocket.
+
+    Audio is judged in 20 ms frames. While nobody speaks, the last
+    ``preroll_ms`` of frames are kept in a small deque and released together
+    with the onset. After the level falls, ``hangover_ms`` more frames are
+    sent. Output is batched to at least 100 ms, and the tail of a speech run
+    is padded with zeros up to that size.
+    """
+
+    def __init__(self, threshold_db: float = VAD_THRESHOLD_DB, preroll_ms: int = VAD_PREROLL_MS,
+                 hangover_ms: int = VAD_HANGOVER_MS):
+        self.frame_bytes = SAMPLE_RATE * VAD_FRAME_MS // 1000 * SAMPLE_WIDTH * CHANNELS
+        self.min_send_bytes = SAMPLE_RATE * MIN_SEND_MS // 1000 * SAMPLE_WIDTH * CHANNELS
+        # RMS of int16 samples that corresponds to the dBFS threshold
+        self.threshold_rms = 32768 * 10 ** (threshold_db / 20)
+        self.hangover_frames = hangover_ms // VAD_FRAME_MS
+        self.preroll = deque(maxlen=preroll_ms // VAD_FRAME_MS)
+        self.remainder = b""
+        self.pending = bytearray()
+        self.pending_segments: List[List] = []
+        self.last_segments: List[List] = []
+        self.frames_left = 0
+        self.captured_bytes = 0
+        self.sent_bytes = 0
+        self.speech_runs = 0
+
+    @property
+    def in_speech(self) -> bool:
+        return self.frames_left > 0
+
+    def process(self, pcm: bytes, capture_offset: Optional[int] = None) -> bytes:
+        """Feed captured audio; returns the audio that should be sent now (possibly b"").
+
+        ``capture_offset`` is the capture byte position of ``pcm``. After a
+        non-empty return, ``last_segments`` lists ``[capture_offset, length]``
+        for each contiguous piece of the output (offset None for padding),
+        so transcripts of the gated stream can be placed on the recording.
+        """
+        self.captured_bytes += len(pcm)
+        base = capture_offset - len(self.remainder) if capture_offset is not None else None
+        data = self.remainder + pcm
+        usable = len(data) - len(data) % self.frame_bytes
+        self.remainder = data[usable:]
+        if not usable:
+            return b""
+
+        frames = np.frombuffer(data[:usable], dtype=np.int16).reshape(-1, self.frame_bytes // SAMPLE_WIDTH)
+        rms = np.sqrt(np.mean(frames.astype(np.float32) ** 2, axis=1))
+
+        for i, level in enumerate(rms):
+            frame = data[i * self.frame_bytes:(i + 1) * self.frame_bytes]
+            offset = base + i * self.frame_bytes if base is not None else None
+            if level >= self.threshold_rms:
+                if not self.in_speech:
+                    self.speech_runs += 1
+                    for held, held_offset in self.preroll:
+                        self._append(held, held_offset)
+                    self.preroll.clear()
+                self.frames_left = self.hangover_frames + 1
+            if self.in_speech:
+                self._append(frame, offset)
+                self.frames_left -= 1
+                if not self.in_speech and len(self.pending) < self.min_send_bytes:
+                    # End of a speech run: pad instead of holding the tail back
+                    self._append(bytes(self.min_send_bytes - len(self.pending)), None)
+            else:
+                self.preroll.append((frame, offset))
+
+        if len(self.pending) >= self.min_send_bytes:
+            out = bytes(self.pending)
+            self.pending.clear()
+            self.last_segments = self.pending_segments
+            self.pending_segments = []
+            self.sent_bytes += len(out)
+            return out
+        return b""
+
+    def _append(self, frame: bytes, offset: Optional[int]):
+        self.pending += frame
+        last = self.pending_segments[-1] if self.pending_segments else None
+        if last and offset is not None and last[0] is not None and last[0] + last[1] == offset:
+            last[1] += len(frame)
+        else:
+            self.pending_segments.append([offset, len(frame)])
+
+    def stats(self) -> Dict:
+        bytes_per_second = SAMPLE_RATE * SAMPLE_WIDTH * CHANNELS
+        return {
+            "captured_seconds": round(self.captured_bytes / bytes_per_second, 2),
+            "sent_seconds": round(self.sent_bytes / bytes_per_second, 2),
+            "sent_ratio": round(self.sent_bytes / self.captured_bytes, 3) if self.captured_bytes else None,
+            "speech_runs": self.speech_runs,
+        }
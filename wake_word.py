@@ -0,0 +1,155 @@
+import os
+import json
+import time
+import wave
+import argparse
+from typing import Callable, Dict, List, Optional
+from audio_capture import SAMPLE_RATE, SAMPLE_WIDTH, CHANNELS
+
+# Comma-separated words or phrases the bot reacts to; defaults to BOT_NAME
+WAKE_KEYWORDS = os.getenv("WAKE_KEYWORDS", "")
+# Minimum per-word recognizer confidence (0-1) for a keyword to count
+WAKE_THRESHOLD = float(os.getenv("WAKE_THRESHOLD", 0.6))
+VOSK_MODEL_PATH = os.getenv("VOSK_MODEL_PATH", os.path.join("models", "vosk-model-small-en-us-0.15"))
+
+# Grammar token Vosk uses for any speech that isn't one of the keywords
+UNKNOWN_TOKEN = "[unk]"
+
+
+def parse_keywords(raw: str, default: str) -> List[str]:
+    keywords = [k.strip().lower() for k in (raw or "").split(",") if k.strip()]
+    return keywords or [default.lower()]
+
+
+class KeywordSpotter:
+    """Local, CPU-only keyword spotting on the captured PCM.
+
+    A Vosk recognizer is restricted to a grammar of just the keywords plus
+    ``[unk]``, so everything else collapses into the unknown token and the
+    search stays small enough to run well under realtime on one core.
+    Keywords are reported from final results, once every word of the phrase
+    reaches ``threshold`` confidence, at most once per utterance. Nothing
+    leaves the machine.
+    """
+
+    def __init__(self, keywords: List[str], threshold: float = WAKE_THRESHOLD,
+                 model_path: str = VOSK_MODEL_PATH, log: Callable[[str], None] = print):
+        self.keywords = keywords
+        self.threshold = threshold
+        self.model_path = model_path
+        self.log = log
+        self.recognizer = None
+        self.bytes_fed = 0
+        self.inference_seconds = 0.0
+        self.detections: List[Dict] = []
+        self.rejected = 0
+
+    def load(self):
+        """Load the model; raises if vosk or the model directory is missing."""
+        from vosk import Model, KaldiRecognizer, SetLogLevel
+
+        if not os.path.isdir(self.model_path):
+            raise FileNotFoundError(f"Vosk model not found at '{self.model_path}' (set VOSK_MODEL_PATH)")
+        SetLogLevel(-1)
+        started = time.perf_counter()
+        model = Model(self.model_path)
+        # Vosk silently drops grammar words the model can't say, which would leave a keyword undetectable
+        missing = self.missing_words(model)
+        if missing:
+            raise ValueError(f"Keyword word(s) {missing} are not in the vocabulary of "
+                             f"'{os.path.basename(os.path.normpath(self.model_path))}'; use WAKE_KEYWORDS/TRIGGERS_FILE "
+                             f"phrases the model knows or a larger model")
+        grammar = json.dumps(self.keywords + [UNKNOWN_TOKEN])
+        self.recognizer = KaldiRecognizer(model, SAMPLE_RATE, grammar)
+        self.recognizer.SetWords(True)
+        self.log(f"👂 Keyword spotter loaded in {time.perf_counter() - started:.2f}s, "
+                 f"listening for {self.keywords} (threshold {self.threshold})")
+
+    def missing_words(self, model) -> List[str]:
+        """Words of the keywords that aren't in the model's vocabulary"""
+        words = sorted({word for keyword in self.keywords for word in keyword.split()})
+        return [word for word in words if model.find_word(word) < 0]
+
+    def accept(self, pcm: bytes) -> List[Dict]:
+        """Feed a block of audio; returns the keywords detected in it, if any."""
+        started = time.perf_counter()
+        self.bytes_fed += len(pcm)
+        detections = []
+        if self.recognizer.AcceptWaveform(pcm):
+            detections = self._match(json.loads(self.recognizer.Result()))
+        self.inference_seconds += time.perf_counter() - started
+        return detections
+
+    def flush(self) -> List[Dict]:
+        if not self.recognizer:
+            return []
+        return self._match(json.loads(self.recognizer.FinalResult()))
+
+    def _match(self, result: Dict) -> List[Dict]:
+        words = result.get("result", [])
+        tokens = [w["word"] for w in words]
+        audio_position = self.bytes_fed / (SAMPLE_RATE * SAMPLE_WIDTH * CHANNELS)
+        detections = []
+
+        for keyword in self.keywords:
+            phrase = keyword.split()
+            for i in range(len(tokens) - len(phrase) + 1):
+                if tokens[i:i + len(phrase)] != phrase:
+                    continue
+                matched = words[i:i + len(phrase)]
+                confidence = min(w.get("conf", 1.0) for w in matched)
+                if confidence < self.threshold:
+                    self.rejected += 1
+                    continue
+                detection = {
+                    "keyword": keyword,
+                    # Everything recognized in the utterance, so a command and a name can be told apart
+                    "text": " ".join(t for t in tokens if t != UNKNOWN_TOKEN),
+                    "confidence": round(confidence, 3),
+                    "audio_end_s": round(matched[-1]["end"], 3),
+                    # How far behind the spoken keyword the detection fired, in audio time
+                    "lag_s": round(audio_position - matched[-1]["end"], 3),
+                    "detected_at": time.time(),
+                }
+                detections.append(detection)
+
+        # Overlapping keywords ("hey prasun", "prasun") in one utterance count as one mention
+        detections = detections[:1]
+        self.detections.extend(detections)
+        return detections
+
+    def stats(self) -> Dict:
+        audio_seconds = self.bytes_fed / (SAMPLE_RATE * SAMPLE_WIDTH * CHANNELS)
+        return {
+            "engine": "vosk",
+            "model": os.path.basename(os.path.normpath(self.model_path)),
+            "keywords": self.keywords,
+            "threshold": self.threshold,
+            "audio_seconds": round(audio_seconds, 2),
+            "inference_seconds": round(self.inference_seconds, 3),
+            "realtime_factor": round(audio_seconds / self.inference_seconds, 1) if self.inference_seconds else None,
+            "detections": self.detections,
+            "rejected_below_threshold": self.rejected,
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the keyword spotter over a 16 kHz mono WAV file")
+    parser.add_argument("wav", help="WAV file to scan")
+    parser.add_argument("--keywords", default=WAKE_KEYWORDS or os.getenv("BOT_NAME", "prasun"))
+    parser.add_argument("--threshold", type=float, default=WAKE_THRESHOLD)
+    parser.add_argument("--model", default=VOSK_MODEL_PATH)
+    args = parser.parse_args()
+
+    spotter = KeywordSpotter(parse_keywords(args.keywords, "prasun"), args.threshold, args.model)
+    spotter.load()
+    with wave.open(args.wav, "rb") as wav:
+        while True:
+            data = wav.readframes(1600)
+            if not data:
+                break
+            for hit in spotter.accept(data):
+                print(f"🗣 '{hit['keyword']}' at {hit['audio_end_s']}s (conf {hit['confidence']})")
+    for hit in spotter.flush():
+        print(f"🗣 '{hit['keyword']}' at {hit['audio_end_s']}s (conf {hit['confidence']})")
+    print(f"📊 {spotter.stats()}")
@@ -2,340 +2,82 @@ import os
 import time
 import subprocess
 import webbrowser
-import sounddevice as sd
-import queue
+import numpy as np
 import threading
 import json
-import requests
-import websocket
-from typing import Optional
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
 from dotenv import load_dotenv
 from meeting_pipeline import process_file
+from job_store import JobStore
+from utils import summarize_live_transcript, save_transcript_locally, LIVE_TRANSCRIPT_NAME
 import pyautogui
-import pygetwindow as gw
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import NoSuchWindowException, WebDriverException
-from webdriver_manager.chrome import ChromeDriverManager
+from selenium.common.exceptions import NoSuchWindowException, WebDriverException, SessionNotCreatedException
+from audio_capture import CaptureBackend, create_backend, SAMPLE_RATE, SAMPLE_WIDTH, CHANNELS
+from audio_fanout import CaptureFanout, PcmFileEncoder
+from segmented_recording import SegmentWriter, IncrementalTranscriber
+from wake_word import KeywordSpotter, WAKE_KEYWORDS, parse_keywords
+from voice_activity import VoiceActivityGate, VAD_ENABLED
+from trigger_engine import TriggerEngine, build_engine
+from tts_cache import ResponseAudioCache, create_tts_engine
+from realtime_transcription import RealtimeTranscriber
+from meeting_observer import MeetingEventObserver
+from meeting_chat import MeetingChat
+from driver_cache import shared_driver_cache
+from leave_policy import (
+    LeavePolicy, SilenceTracker, LEAVE_ON_SILENCE_SECONDS, LEAVE_WHEN_ALONE_SECONDS, PARTICIPANT_CHECK_INTERVAL,
+    PARTICIPANT_COUNT_SCRIPT,
+)
+from browser_profile import (
+    build_chrome_options, VirtualAudioSink, ResourceSampler, BROWSER_PROFILE, BROWSER_AUDIO_SINK,
+)
+from join_engine import JoinEngine, JoinStep, STEP_DONE, POLL_INTERVAL as JOIN_POLL_INTERVAL
 from datetime import datetime
-import shutil
 
 load_dotenv()
 
 ZOOM_LINK = os.getenv("ZOOM_LINK")
 ASSEMBLYAI_API_KEY = os.getenv("AAI_API_KEY")
-BOT_NAME = "prasun"
+BOT_NAME = os.getenv("BOT_NAME", "prasun").lower()
+BOT_DISPLAY_NAME = os.getenv("BOT_DISPLAY_NAME", "Prasun-Bot")
 RESPONSE_TEXT = "Hi, this is Prasun's assistant. Prasun is currently away, but I'm here to help!"
 
 WAIT_INTERVAL = int(os.getenv("WAIT_INTERVAL", 3))  # Check every 3 seconds
 MAX_WAIT_TIME = int(os.getenv("MAX_WAIT_TIME", 3600))
 
-# Create unique meeting directory based on timestamp
-OUTPUT_DIR = "archives"
-meeting_timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-CURRENT_MEETING_DIR = os.path.join(OUTPUT_DIR, f"meeting_{meeting_timestamp}")
-OUTPUT_FILE = os.path.join(CURRENT_MEETING_DIR, "recording.mp3")
-
-# Create directories
-os.makedirs(CURRENT_MEETING_DIR, exist_ok=True)
-os.makedirs(OUTPUT_DIR, exist_ok=True)
-
-# Global variables for thread control
-recording_active = threading.Event()
-listening_active = threading.Event()
-driver: Optional[webdriver.Chrome] = None
-recorder_process: Optional[subprocess.Popen] = None
-
-
-def move_meeting_files_to_folder():
-    """Move generated meeting files from current directory to the meeting folder"""
-    print(f"📁 Moving meeting analysis files to {CURRENT_MEETING_DIR}...")
-    
-    # Files that the CrewAI agent generates
-    files_to_move = [
-        "Meeting_Notes.md",
-        "Meeting_Notes2.md"
-    ]
-    
-    moved_files = []
-    
-    for filename in files_to_move:
-        source_path = filename  # Current directory
-        destination_path = os.path.join(CURRENT_MEETING_DIR, filename)
-        
-        if os.path.exists(source_path):
-            try:
-                shutil.move(source_path, destination_path)
-                moved_files.append(filename)
-                print(f"✅ Moved {filename} to meeting folder")
-            except Exception as e:
-                print(f"❌ Error moving {filename}: {e}")
-        else:
-            print(f"⚠️ File not found: {filename}")
-    
-    if moved_files:
-        print(f"📁 Successfully moved {len(moved_files)} analysis files to meeting folder")
-        print(f"📂 Meeting folder contents: {os.listdir(CURRENT_MEETING_DIR)}")
-    else:
-        print("⚠️ No analysis files found to move")
-
-
-class AssemblyAIRealTimeTranscriber:
-    def __init__(self, api_key: str, on_transcript_callback):
-        self.api_key = api_key
-        self.on_transcript_callback = on_transcript_callback
-        self.ws = None
-        self.audio_queue = queue.Queue()
-        self.is_running = False
-        
-    def start_transcription(self) -> bool:
-        response = requests.post(
-            'https://api.assemblyai.com/v2/realtime/token',
-            headers={'authorization': self.api_key},
-            json={'expires_in': 3600}
-        )           
-        
-        token = response.json()['token']
-        
-        ws_url = f"wss://api.assemblyai.com/v2/realtime/ws?sample_rate=16000&token={token}"
-        
-        def on_message(ws, message):
-            data = json.loads(message)
-            if data['message_type'] == 'FinalTranscript':
-                transcript = data['text'].lower().strip()
-                if transcript:
-                    print(f"🎯 Transcribed: {transcript}")
-                    self.on_transcript_callback(transcript)
-        
-        def on_error(ws, error):
-            print(f"WebSocket error: {error}")
-        
-        def on_close(ws, close_status_code, close_msg):
-            print("WebSocket closed")
-            self.is_running = False
-        
-        def on_open(ws):
-            print("🔊 AssemblyAI WebSocket connected")
-            self.is_running = True
-            
-            def send_audio():
-                while self.is_running and listening_active.is_set():
-                    try:
-                        audio_data = self.audio_queue.get(timeout=1)
-                        if audio_data is not None:
-                            ws.send(audio_data, websocket.ABNF.OPCODE_BINARY)
-                    except queue.Empty:
-                        continue            
-                    
-                    except Exception as e:
-                        print(f"Error sending audio: {e}")
-                        break
-            
-            audio_thread = threading.Thread(target=send_audio, daemon=True)
-            audio_thread.start()
-        
-        self.ws = websocket.WebSocketApp(
-            ws_url,
-            on_message=on_message,
-            on_error=on_error,
-            on_close=on_close,
-            on_open=on_open
-        )
-        
-        ws_thread = threading.Thread(target=self.ws.run_forever, daemon=True)
-        ws_thread.start()
-        
-        timeout = 10
-        while not self.is_running and timeout > 0:
-            time.sleep(0.1)
-            timeout -= 0.1
-        
-        return self.is_running
-    
-    def add_audio_data(self, audio_data):
-        if self.is_running:
-            self.audio_queue.put(audio_data)
-    
-    def stop(self):
-        self.is_running = False
-        if self.ws:
-            self.ws.close()
-
-def on_transcript_received(transcript: str):
-    if BOT_NAME in transcript:
-        print(f"🗣 Detected name '{BOT_NAME}' in: '{transcript}'")
-        respond_to_mention()
-
-def respond_to_mention():
-    print("🤖 Responding to mention...")
-    
-    try:
-        subprocess.Popen([
-            "powershell", 
-            f"Add-Type –AssemblyName System.Speech; (New-Object System.Speech.Synthesis.SpeechSynthesizer).Speak('{RESPONSE_TEXT}')"
-        ])
-    except Exception as e:
-        print(f"❌ Voice response failed: {e}")
-    
-    try:
-        send_zoom_message(RESPONSE_TEXT)
-    except Exception as e:
-        print(f"❌ Chat response failed: {e}")
+# "observer" drains events pushed by an in-page MutationObserver; "poll" re-queries the DOM
+END_DETECTION = os.getenv("END_DETECTION", "observer")
+OBSERVER_DRAIN_INTERVAL = float(os.getenv("OBSERVER_DRAIN_INTERVAL", 1))
 
-def send_zoom_message(message: str):
-    try:
-        zoom_windows = gw.getWindowsWithTitle("Zoom")
-        if zoom_windows:
-            zoom_windows[0].activate()
-            time.sleep(0.5)
-        
-        pyautogui.hotkey('alt', 'h')
-        time.sleep(1)
-        pyautogui.write(message)
-        time.sleep(0.5)
-        pyautogui.press('enter')
-        print(f"✅ Sent message: {message}")
-        
-    except Exception as e:
-        print(f"❌ Failed to send Zoom message: {e}")
+# "local" spots the bot's name on-device; "cloud" streams all audio to AssemblyAI realtime
+TRIGGER_ENGINE = os.getenv("TRIGGER_ENGINE", "local")
 
-def check_meeting_ended() -> bool:
-    """Check ONLY for the specific 'This meeting has been ended by host' modal"""
-    global driver
-    if not driver:
-        return True
-    
-    try:
-        # Check if driver is still alive
-        driver.current_url
-        
-        # Check if browser window still exists
-        if len(driver.window_handles) == 0:
-            print("🛑 Browser window closed")
-            return True
-        
-        # Check in default content first
-        try:
-            meeting_ended_elements = driver.find_elements(
-                By.XPATH, 
-                "//div[contains(@class, 'zm-modal-body-title') and contains(text(), 'This meeting has been ended by host')]"
-            )
-            if meeting_ended_elements:
-                print("🛑 SPECIFIC meeting ended modal detected in default content")
-                return True
-        except Exception as e:
-            print(f"⚠️ Error checking default content: {e}")
-        
-        # Check inside the webclient frame
-        try:
-            driver.switch_to.default_content()
-            # Add None check before WebDriverWait
-            wait = WebDriverWait(driver, 2)
-            wait.until(EC.frame_to_be_available_and_switch_to_it((By.XPATH, '//*[@id="webclient"]')))
-            
-            # ONLY check for the specific "This meeting has been ended by host" modal
-            meeting_ended_elements = driver.find_elements(
-                By.XPATH, 
-                "//div[contains(@class, 'zm-modal-body-title') and contains(text(), 'This meeting has been ended by host')]"
-            )
-            if meeting_ended_elements:
-                print("🛑 SPECIFIC meeting ended modal detected in webclient frame")
-                driver.switch_to.default_content()
-                return True
-            
-            driver.switch_to.default_content()
-            
-        except Exception as e:
-            print(f"⚠️ Error checking webclient frame: {e}")
-            try:
-                driver.switch_to.default_content()
-            except:
-                pass
-        
-        return False  # Meeting is still active
-        
-    except (NoSuchWindowException, WebDriverException) as e:
-        print(f"🛑 Browser/WebDriver error: {e}")
-        return True
-    except Exception as e:
-        print(f"⚠️ Unexpected error checking meeting status: {e}")
-        return False
-
-def leave_zoom_meeting():
-    """Properly leave the Zoom meeting"""
-    global driver
-    print("🚪 Attempting to leave Zoom meeting...")
-    
-    if not driver:
-        print("⚠️ No driver available to leave meeting")
-        return
-    
-    try:
-        # ONLY use the driver to interact with Zoom - no pyautogui hotkeys
-        
-        # Method 1: Try clicking Leave button if it exists
-        try:
-            driver.switch_to.default_content()
-            wait = WebDriverWait(driver, 5)
-            wait.until(EC.frame_to_be_available_and_switch_to_it((By.XPATH, '//*[@id="webclient"]')))
-            
-            # Look for Leave button
-            leave_buttons = driver.find_elements(
-                By.XPATH, 
-                "//button[contains(text(), 'Leave') or contains(@aria-label, 'Leave')]"
-            )
-            if leave_buttons:
-                leave_buttons[0].click()
-                print("✅ Clicked Leave button")
-                time.sleep(2)
-                driver.switch_to.default_content()
-                return  # Successfully left, don't try other methods
-            
-            driver.switch_to.default_content()
-            
-        except Exception as e:
-            print(f"⚠️ Could not click Leave button: {e}")
-        
-        # Method 2: Try End Meeting button if we're the host
-        try:
-            driver.switch_to.default_content()
-            wait = WebDriverWait(driver, 3)
-            wait.until(EC.frame_to_be_available_and_switch_to_it((By.XPATH, '//*[@id="webclient"]')))
-            
-            end_buttons = driver.find_elements(
-                By.XPATH, 
-                "//button[contains(text(), 'End') or contains(@aria-label, 'End')]"
-            )
-            if end_buttons:
-                end_buttons[0].click()
-                print("✅ Clicked End button")
-                time.sleep(2)
-                driver.switch_to.default_content()
-                return  # Successfully ended, don't close browser
-            
-            driver.switch_to.default_content()
-            
-        except Exception as e:
-            print(f"⚠️ Could not click End button: {e}")
-        
-        # Method 3: Navigate away from the meeting URL
-        try:
-            driver.get("about:blank")
-            print("✅ Navigated away from meeting")
-        except Exception as e:
-            print(f"⚠️ Could not navigate away: {e}")
-            
-    except Exception as e:
-        print(f"❌ Error leaving meeting: {e}")
+# Peak level (float32 full scale) that counts as the first real audio after joining
+FIRST_AUDIO_LEVEL = float(os.getenv("FIRST_AUDIO_LEVEL", 0.01))
+
+# "segmented" also cuts the meeting into WAV segments that are transcribed while it is still running
+RECORDING_MODE = os.getenv("RECORDING_MODE", "single")
+
+# "inline" processes the recording in this process; "queue" hands it to the pipeline workers (pipeline_worker.py)
+POSTPROCESS_MODE = os.getenv("POSTPROCESS_MODE", "inline")
+
+OUTPUT_DIR = "archives"
+
+# pyautogui drives the one shared desktop (keyboard focus, active window), so
+# sessions running side by side must take turns when they use it.
+desktop_lock = threading.Lock()
 
 def close_obs():
     """Close OBS application gracefully via batch file"""
     print("🎥 Closing OBS gracefully via batch file...")
-    
+
     # Simplified batch file - no need for complex dialog handling
     batch_file_content = (
         '@echo off\n'
@@ -348,69 +90,27 @@ def close_obs():
         'taskkill /f /im obs32.exe >nul 2>&1\n'
         'echo OBS closed successfully\n'
     )
-    
+
     batch_path = "close_obs.bat"
     try:
         with open(batch_path, "w") as f:
             f.write(batch_file_content)
-        
+
         subprocess.run(["cmd", "/c", batch_path], check=True)
         print("✅ OBS closed gracefully")
-        
+
         try:
             os.remove(batch_path)
         except:
             pass
-            
-    except Exception as e:
-        print(f"❌ Error closing OBS: {e}")
 
-def is_zoom_meeting_active() -> bool:
-    """Check if Zoom meeting is still active"""
-    return not check_meeting_ended()
-
-def listen_for_bot_trigger():
-    if not ASSEMBLYAI_API_KEY:
-        print("❌ AssemblyAI API key not found in environment variables")
-        return
-    
-    transcriber = AssemblyAIRealTimeTranscriber(ASSEMBLYAI_API_KEY, on_transcript_received)
-    
-    if not transcriber.start_transcription():
-        print("❌ Failed to start AssemblyAI transcription")
-        return
-    
-    def audio_callback(indata, frames, time, status):
-        if status:
-            print(f"Audio status: {status}")
-        
-        if listening_active.is_set():
-            audio_int16 = (indata * 32767).astype('int16')
-            transcriber.add_audio_data(audio_int16.tobytes())
-    
-    print("🔊 Voice trigger activated with AssemblyAI. Listening...")
-    listening_active.set()
-    
-    try:
-        with sd.RawInputStream(
-            samplerate=16000, 
-            blocksize=8000, 
-            dtype='float32',
-            channels=1, 
-            callback=audio_callback
-        ):
-            while listening_active.is_set() and recording_active.is_set():
-                time.sleep(0.1)
     except Exception as e:
-        print(f"❌ Audio listening error: {e}")
-    finally:
-        transcriber.stop()
-        print("🔇 Voice trigger stopped")
+        print(f"❌ Error closing OBS: {e}")
 
 def launch_obs():
     """Launch OBS application with VirtualCam auto-start and disable shutdown check"""
     print("🎥 Launching OBS with VirtualCam and shutdown check disabled...")
-    
+
     # Create batch file content with the --disable-shutdown-check flag
     batch_file_content = (
         '@echo off\n'
@@ -432,304 +132,1139 @@ def launch_obs():
         ')\n'
         'echo OBS launch completed\n'
     )
-    
+
     batch_path = "launch_obs.bat"
     try:
         with open(batch_path, "w") as f:
             f.write(batch_file_content)
-        
+
         # Execute the batch file
         subprocess.run(["cmd", "/c", batch_path], check=True)
         print("✅ OBS launched successfully with shutdown check disabled")
-        
+
         # Clean up the batch file
         try:
             os.remove(batch_path)
         except:
             pass
-            
+
         # Wait for OBS to start - reduced wait time since no dialogs expected
         time.sleep(3)
         print("✅ OBS startup complete - no safe mode dialogs expected")
-            
+
     except Exception as e:
         print(f"❌ Error launching OBS via batch file: {e}")
 
 
-def cleanup_and_exit():
-    """Safe cleanup function that closes only what we opened"""
-    global driver, recorder_process
-    
-    print("🧹 Starting safe cleanup...")
-    
-    # Stop recording and listening
-    recording_active.clear()
-    listening_active.clear()
-    
-    # Stop audio recording
-    if recorder_process:
-        print("🔴 Terminating recording process...")
+class MeetingSession:
+    """One bot attending one meeting.
+
+    A session owns its browser, recorder process, listener thread and output
+    directory, so several sessions can run side by side in one process and each
+    can be torn down without touching the others.
+
+    If ``start_at`` is given the session is expected to be started early: it
+    pre-warms the browser and capture pipeline, parks on the join screen and
+    clicks Join at ``start_at``.
+    """
+
+    def __init__(self, zoom_link: str, bot_name: str = BOT_NAME,
+                 bot_display_name: str = BOT_DISPLAY_NAME,
+                 response_text: str = RESPONSE_TEXT,
+                 output_dir: str = OUTPUT_DIR,
+                 meeting_id: Optional[str] = None,
+                 manage_obs: bool = True,
+                 start_at: Optional[datetime] = None,
+                 capture_backend: Optional[CaptureBackend] = None,
+                 browser_profile: str = BROWSER_PROFILE):
+        self.zoom_link = zoom_link
+        self.bot_name = bot_name.lower()
+        self.bot_display_name = bot_display_name
+        self.response_text = response_text
+        self.meeting_id = meeting_id
+        self.manage_obs = manage_obs
+
+        # Create unique meeting directory based on timestamp
+        self.meeting_timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
+        dir_name = f"meeting_{self.meeting_timestamp}"
+        if meeting_id is not None:
+            dir_name += f"_{meeting_id}"
+        self.meeting_dir = os.path.join(output_dir, dir_name)
+        self.output_file = os.path.join(self.meeting_dir, "recording.mp3")
+        os.makedirs(self.meeting_dir, exist_ok=True)
+
+        # Per-session thread control
+        self.recording_active = threading.Event()
+        self.listening_active = threading.Event()
+        self.stop_requested = threading.Event()
+        # Wakes the monitor loop early: a stop request or a chat message to send
+        self.monitor_wake = threading.Event()
+        self.driver: Optional[webdriver.Chrome] = None
+        self.chat: Optional[MeetingChat] = None
+        self.driver_resolve: Optional[Dict] = None
+        self.browser_start_seconds: Optional[float] = None
+        self.capture: Optional[CaptureFanout] = None
+        self.recorder: Optional[PcmFileEncoder] = None
+        self.segment_writer: Optional[SegmentWriter] = None
+        self.segment_transcriber: Optional[IncrementalTranscriber] = None
+        self.listener_thread: Optional[threading.Thread] = None
+        self.resource_sampler: Optional[ResourceSampler] = None
+        self.leave_policy: Optional[LeavePolicy] = None
+        self.leave_reason: Optional[str] = None
+        self.participant_count_missing = False
+        self.cleaned_up = False
+        self.left_at: Optional[float] = None
+        # Set when the recording was queued for the pipeline workers instead of processed here
+        self.pipeline_job_id: Optional[int] = None
+
+        # The lean profile is headless; its audio goes to a PulseAudio sink, captured from the sink's monitor
+        self.browser_profile = browser_profile
+        self.audio_sink: Optional[VirtualAudioSink] = None
+        if browser_profile == "lean" and BROWSER_AUDIO_SINK:
+            sink_name = BROWSER_AUDIO_SINK
+            if sink_name == "auto":
+                sink_name = "proxymeet_" + re.sub(r"\W", "_", dir_name)
+            self.audio_sink = VirtualAudioSink(sink_name, self.log)
+            if capture_backend is None:
+                capture_backend = create_backend("pulse", self.audio_sink.monitor)
+        self.capture_backend = capture_backend or create_backend()
+
+        # Pre-warm: everything up to the Join click happens ahead of start_at
+        self.start_at = start_at
+        self.joined = threading.Event()
+        self.prewarm_started_at: Optional[float] = None
+        self.parked_at: Optional[float] = None
+        self.recorder_started_at: Optional[float] = None
+        self.join_clicked_at: Optional[float] = None
+        self.joined_wallclock: Optional[datetime] = None
+        self.first_audio_at: Optional[float] = None
+        self.join_engine: Optional[JoinEngine] = None
+
+        # Names, aliases and commands, compiled once; see trigger_engine.py / TRIGGERS_FILE
+        self.live_transcript: deque = deque(maxlen=2000)
+        # Capture byte position where recording.mp3 starts; live utterances are timed against it
+        self.recording_origin: Optional[int] = None
+        self.live_transcript_lock = threading.Lock()
+        self.response_audio: Optional[ResponseAudioCache] = None
+        self.responses_thread: Optional[threading.Thread] = None
+        # Guards response_audio between the render thread publishing it and cleanup closing it
+        self.responses_lock = threading.Lock()
+        # Trigger handlers run one at a time off the audio thread, in the order they fired
+        self.trigger_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="triggers")
+        # "local" or "cloud" once the voice trigger is listening
+        self.trigger_source: Optional[str] = None
+        self.triggers: TriggerEngine = build_engine(
+            {
+                "respond": self.respond_to_mention,
+                "action_item": self.record_action_item,
+                "summarize": self.post_live_summary,
+            },
+            self.bot_name,
+            aliases=parse_keywords(WAKE_KEYWORDS, self.bot_name),
+            log=self.log,
+            executor=self.trigger_executor,
+        )
+
+    @property
+    def label(self) -> str:
+        return f"[{self.meeting_id or self.meeting_timestamp}]"
+
+    def log(self, message: str):
+        print(f"{self.label} {message}")
+
+    def on_transcript_received(self, transcript: str):
+        self.live_transcript.append(transcript)
+        self.triggers.dispatch(transcript)
+
+    def on_final_utterance(self, utterance: Dict):
+        """Append a finalized realtime utterance, timed against the recording, to live_transcript.jsonl"""
+        if utterance["capture_start"] is None or self.recording_origin is None:
+            return
+        if utterance["capture_end"] <= self.recording_origin:
+            # Spoken on the join screen, before the recording starts
+            return
+        bytes_per_second = SAMPLE_RATE * SAMPLE_WIDTH * CHANNELS
+        entry = {
+            "start_s": round(max(utterance["capture_start"] - self.recording_origin, 0) / bytes_per_second, 2),
+            "end_s": round(max(utterance["capture_end"] - self.recording_origin, 0) / bytes_per_second, 2),
+            "text": utterance["text"],
+            "confidence": utterance["confidence"],
+            "latency_ms": utterance["latency_ms"],
+        }
+        with self.live_transcript_lock:
+            with open(os.path.join(self.meeting_dir, LIVE_TRANSCRIPT_NAME), "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def meeting_offset(self) -> str:
+        if not self.join_clicked_at:
+            return "00:00"
+        minutes, seconds = divmod(int(time.perf_counter() - self.join_clicked_at), 60)
+        return f"{minutes:02d}:{seconds:02d}"
+
+    def record_action_item(self, match: Dict):
+        """Append the action item to action_items.jsonl and confirm it in the chat"""
+        # The on-device spotter only hears the command itself, so there may be no item text
+        item = match["remainder"].strip() or "(flagged - see recording)"
+        entry = {"at": self.meeting_offset(), "item": item, "said": match["text"]}
+        with open(os.path.join(self.meeting_dir, "action_items.jsonl"), "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self.log(f"📝 Action item at {entry['at']}: {item}")
+        self.speak("action_item", "Action item noted.", match)
+        self.send_chat(f"Action item noted at {entry['at']}: {item}")
+
+    def post_live_summary(self, match: Dict):
+        if self.trigger_source == "local":
+            # The keyword spotter only hears trigger phrases, so there is no running transcript to summarize
+            self.log("⚠️ Live summary skipped: it needs the cloud transcript stream (TRIGGER_ENGINE=\"cloud\")")
+            self.send_chat("Live summaries aren't available in this meeting.")
+            return
+        if not self.live_transcript:
+            self.send_chat("Nothing has been transcribed live yet, so there is no summary to share.")
+            return
+        self.log("🧾 Summarizing the meeting so far...")
+        summary = summarize_live_transcript(list(self.live_transcript))
+        if summary:
+            self.send_chat(f"Summary so far: {summary}")
+
+    def prepare_responses(self):
+        """Render the spoken responses once, ahead of the meeting, and open the output device"""
+        cache = ResponseAudioCache(create_tts_engine(), log=self.log)
         try:
-            recorder_process.terminate()
-            recorder_process.wait(timeout=5)
-        except subprocess.TimeoutExpired:
-            print("⚠️ Force killing recording process...")
-            recorder_process.kill()
-        print("🔴 Recording stopped.")
-        recorder_process = None
-    
-    # Close ONLY the Zoom meeting driver (not all Chrome windows)
-    if driver:
+            cache.prepare({
+                "response": self.response_text,
+                "action_item": "Action item noted.",
+            })
+        except Exception as e:
+            self.log(f"⚠️ Response audio cache unavailable, speaking on demand instead: {e}")
+            cache.close()
+            return
+        with self.responses_lock:
+            if self.cleaned_up:
+                # The session ended while rendering; don't leave the output device open
+                cache.close()
+                return
+            self.response_audio = cache
+
+    def speak(self, key: str, text: str, match: Optional[Dict] = None):
+        if self.response_audio and self.response_audio.has(key):
+            self.response_audio.play(key, match.get("matched_at") if match else None)
+            return
         try:
-            print("🔧 Closing Zoom meeting browser window...")
-            driver.quit()  # This only closes the driver's browser window
-            driver = None
-            print("✅ Zoom browser window closed")
+            subprocess.Popen([
+                "powershell",
+                f"Add-Type –AssemblyName System.Speech; (New-Object System.Speech.Synthesis.SpeechSynthesizer).Speak('{text}')"
+            ])
         except Exception as e:
-            print(f"⚠️ Error closing Zoom browser: {e}")
-    
-    # Close OBS via batch file at the end
-    close_obs()
-    
-    print("✅ Safe cleanup completed")
-
-def join_zoom_and_record() -> Optional[str]:
-    global driver, recorder_process
-    
-    print(f"🚀 Starting new meeting session: {meeting_timestamp}")
-    print(f"📁 Meeting files will be saved to: {CURRENT_MEETING_DIR}")
-    
-    
-    print("🚀 Launching Zoom meeting via Selenium...")
-    chrome_options = Options()
-    chrome_options.add_argument("--disable-notifications")
-    chrome_options.add_argument("--disable-infobars")
-    chrome_options.add_argument("--use-fake-ui-for-media-stream")
-    chrome_options.add_experimental_option("detach", True)
-    
-    try:
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
-        driver.get(ZOOM_LINK)
-    except Exception as e:
-        print(f"❌ Failed to initialize Chrome driver: {e}")
-        return None
+            self.log(f"❌ Voice response failed: {e}")
 
-    # Zoom setup with proper None checks
-    time.sleep(5)
-    pyautogui.press('esc')
-    time.sleep(5)
+    def send_chat(self, message: str):
+        """Queue a chat message; the monitor loop sends it through the browser"""
+        if not self.chat:
+            self.log(f"⚠️ No meeting chat available, dropping message: {message}")
+            return
+        self.chat.post(message)
 
-    try:
-        cancel_btn = driver.find_element(By.XPATH, "//button[contains(text(),'Cancel')]")
-        cancel_btn.click()
-        print("✅ Cancel popup closed")
-    except:
-        print("❌ Cancel popup not found")
+    def respond_to_mention(self, match: Optional[Dict] = None):
+        self.log("🤖 Responding to mention...")
+        self.speak("response", self.response_text, match)
+        self.send_chat(self.response_text)
 
-    time.sleep(5)
-    try:
-        decline_cookies = driver.find_element(By.XPATH, "//button[contains(text(),'Decline Cookies')]")
-        decline_cookies.click()
-        print("✅ Declined Cookies")
-    except:
-        print("❌ Could not find Decline Cookies button")    
+    def check_meeting_ended(self) -> bool:
+        """Check ONLY for the specific 'This meeting has been ended by host' modal"""
+        driver = self.driver
+        if not driver:
+            return True
 
-    time.sleep(2)
-    try:
-        browser_link = driver.find_element(By.LINK_TEXT, "Join from your browser")
-        browser_link.click()
-        print("✅ Clicked 'Join from your browser'")
-    except:
-        print("❌ Could not click 'Join from your browser'")
+        try:
+            # Check if driver is still alive
+            driver.current_url
 
-    time.sleep(3)
-    try:
-        wait = WebDriverWait(driver, 10)
-        wait.until(EC.frame_to_be_available_and_switch_to_it((By.XPATH, '//*[@id="webclient"]')))
-        agree_btn = wait.until(EC.element_to_be_clickable((By.XPATH, "//*[@id='wc_agree1']")))
-        agree_btn.click()
-        print("✅ Clicked I Agree")
-    except Exception as e:
-        print(f"❌ Could not click I Agree: {e}")
+            # Check if browser window still exists
+            if len(driver.window_handles) == 0:
+                self.log("🛑 Browser window closed")
+                return True
 
-    time.sleep(2)
-    try:
-        driver.switch_to.default_content()
-        print("✅ Switched to default content")
-    except:
-        print("❌ Could not switch to default content")
+            # Check in default content first
+            try:
+                meeting_ended_elements = driver.find_elements(
+                    By.XPATH,
+                    "//div[contains(@class, 'zm-modal-body-title') and contains(text(), 'This meeting has been ended by host')]"
+                )
+                if meeting_ended_elements:
+                    self.log("🛑 SPECIFIC meeting ended modal detected in default content")
+                    return True
+            except Exception as e:
+                self.log(f"⚠️ Error checking default content: {e}")
 
-    time.sleep(5)
-    try:
-        wait = WebDriverWait(driver, 10)
-        wait.until(EC.frame_to_be_available_and_switch_to_it((By.XPATH, '//*[@id="webclient"]')))
-        mic_cam_btn = driver.find_element(By.XPATH, "//*[@id='ask-permission-button']")
-        mic_cam_btn.click()
-        print("✅ Clicked 'Use microphone and camera'")
-    except Exception as e:
-        print(f"❌ Could not click 'Use microphone and camera': {e}")
+            # Check inside the webclient frame
+            try:
+                driver.switch_to.default_content()
+                wait = WebDriverWait(driver, 2)
+                wait.until(EC.frame_to_be_available_and_switch_to_it((By.XPATH, '//*[@id="webclient"]')))
 
-    time.sleep(2)
-    driver.switch_to.default_content()
+                # ONLY check for the specific "This meeting has been ended by host" modal
+                meeting_ended_elements = driver.find_elements(
+                    By.XPATH,
+                    "//div[contains(@class, 'zm-modal-body-title') and contains(text(), 'This meeting has been ended by host')]"
+                )
+                if meeting_ended_elements:
+                    self.log("🛑 SPECIFIC meeting ended modal detected in webclient frame")
+                    driver.switch_to.default_content()
+                    return True
 
-    time.sleep(2)
-    try:
-        pyautogui.press('tab', presses=3)
-        pyautogui.press('enter')
-        print("✅ Clicked 'Allow this time'")
-    except:
-        print("❌ Could not click 'Allow this time'")
+                driver.switch_to.default_content()
 
-    time.sleep(6)
-    try:
-        wait = WebDriverWait(driver, 10)
-        wait.until(EC.frame_to_be_available_and_switch_to_it((By.XPATH, '//*[@id="webclient"]')))
-        dropdown_btn = driver.find_element(By.XPATH, "//*[@id='root']/div/div[1]/div/div[1]/div/div/div[2]/button[2]")
-        dropdown_btn.click()
-        obs_option = wait.until(EC.element_to_be_clickable((
-            By.CSS_SELECTOR, 
-            'li[aria-label="Select a Camera OBS Virtual Camera"]'
-        )))
-        obs_option.click()
-        print("✅ Selected OBS Virtual Camera")
-        driver.switch_to.default_content()
-    except Exception as e:
-        print(f"❌ Could not select OBS Virtual Camera: {e}")
+            except Exception as e:
+                self.log(f"⚠️ Error checking webclient frame: {e}")
+                try:
+                    driver.switch_to.default_content()
+                except:
+                    pass
 
-    time.sleep(2)
-    try:
-        wait = WebDriverWait(driver, 10)
-        wait.until(EC.frame_to_be_available_and_switch_to_it((By.XPATH, '//*[@id="webclient"]')))
-        dropdown_btn = driver.find_element(By.XPATH, "//*[@id='root']/div/div[1]/div/div[1]/div/div/div[1]/button[2]")
-        dropdown_btn.click()
-        spk_output = wait.until(EC.element_to_be_clickable((
-            By.CSS_SELECTOR, 
-            'li[aria-label="Select a Speaker CABLE Input (VB-Audio Virtual Cable)"]'
-        )))
-        spk_output.click()
-        print("✅ Selected Speaker")
-        driver.switch_to.default_content()
-    except Exception as e:
-        print(f"❌ Could not select Speaker: {e}")
+            return False  # Meeting is still active
 
-    time.sleep(2)
-    try:
-        wait = WebDriverWait(driver, 10)
-        wait.until(EC.frame_to_be_available_and_switch_to_it((By.XPATH, '//*[@id="webclient"]')))
-        dropdown_btn = driver.find_element(By.XPATH, "//*[@id='root']/div/div[1]/div/div[1]/div/div/div[1]/button[2]")
-        dropdown_btn.click()
-        mic_input = wait.until(EC.element_to_be_clickable((
-            By.CSS_SELECTOR, 
-            'li[aria-label="Select a Microphone CABLE Output (VB-Audio Virtual Cable)"]'
-        )))
-        mic_input.click()
-        print("✅ Selected Microphone")
-        driver.switch_to.default_content()
-    except Exception as e:
-        print(f"❌ Could not select Microphone: {e}")
+        except (NoSuchWindowException, WebDriverException) as e:
+            self.log(f"🛑 Browser/WebDriver error: {e}")
+            return True
+        except Exception as e:
+            self.log(f"⚠️ Unexpected error checking meeting status: {e}")
+            return False
 
-    time.sleep(3)
-    try:
-        wait = WebDriverWait(driver, 10)
-        wait.until(EC.frame_to_be_available_and_switch_to_it((By.XPATH, '//*[@id="webclient"]')))
-        name_input = wait.until(EC.element_to_be_clickable((By.ID, "input-for-name")))
-        name_input.clear()
-        name_input.send_keys("Prasun-Bot")
-        print("✅ Name filled")
-        driver.switch_to.default_content()
-    except Exception as e:
-        print(f"❌ Could not fill name: {e}")
+    def is_meeting_active(self) -> bool:
+        """Check if Zoom meeting is still active"""
+        return not self.check_meeting_ended()
 
-    time.sleep(3)
-    joined = False
-    try:
-        wait = WebDriverWait(driver, 10)
-        wait.until(EC.frame_to_be_available_and_switch_to_it((By.XPATH, '//*[@id="webclient"]')))
-        join_button = driver.find_element(By.XPATH, "//*[@id='root']/div/div[1]/div/div[2]/button")
-        join_button.click()
-        print("✅ Clicked Join")
-        joined = True
-        driver.switch_to.default_content()
-    except Exception as e:
-        print(f"❌ Could not click Join: {e}")
-
-    if joined:
-        print("🔴 Starting recording and voice trigger...")
-        recording_active.set()
-        
-        record_cmd = [
-            "ffmpeg", "-y", "-f", "dshow", "-i", "audio=CABLE Output (VB-Audio Virtual Cable)",
-            OUTPUT_FILE
+    def leave_meeting(self):
+        """Properly leave the Zoom meeting"""
+        driver = self.driver
+        self.log("🚪 Attempting to leave Zoom meeting...")
+
+        if not driver:
+            self.log("⚠️ No driver available to leave meeting")
+            return
+
+        try:
+            # ONLY use the driver to interact with Zoom - no pyautogui hotkeys
+
+            # Method 1: Try clicking Leave button if it exists
+            try:
+                driver.switch_to.default_content()
+                wait = WebDriverWait(driver, 5)
+                wait.until(EC.frame_to_be_available_and_switch_to_it((By.XPATH, '//*[@id="webclient"]')))
+
+                # Look for Leave button
+                leave_buttons = driver.find_elements(
+                    By.XPATH,
+                    "//button[contains(text(), 'Leave') or contains(@aria-label, 'Leave')]"
+                )
+                if leave_buttons:
+                    leave_buttons[0].click()
+                    self.log("✅ Clicked Leave button")
+                    time.sleep(2)
+                    driver.switch_to.default_content()
+                    return  # Successfully left, don't try other methods
+
+                driver.switch_to.default_content()
+
+            except Exception as e:
+                self.log(f"⚠️ Could not click Leave button: {e}")
+
+            # Method 2: Try End Meeting button if we're the host
+            try:
+                driver.switch_to.default_content()
+                wait = WebDriverWait(driver, 3)
+                wait.until(EC.frame_to_be_available_and_switch_to_it((By.XPATH, '//*[@id="webclient"]')))
+
+                end_buttons = driver.find_elements(
+                    By.XPATH,
+                    "//button[contains(text(), 'End') or contains(@aria-label, 'End')]"
+                )
+                if end_buttons:
+                    end_buttons[0].click()
+                    self.log("✅ Clicked End button")
+                    time.sleep(2)
+                    driver.switch_to.default_content()
+                    return  # Successfully ended, don't close browser
+
+                driver.switch_to.default_content()
+
+            except Exception as e:
+                self.log(f"⚠️ Could not click End button: {e}")
+
+            # Method 3: Navigate away from the meeting URL
+            try:
+                driver.get("about:blank")
+                self.log("✅ Navigated away from meeting")
+            except Exception as e:
+                self.log(f"⚠️ Could not navigate away: {e}")
+
+        except Exception as e:
+            self.log(f"❌ Error leaving meeting: {e}")
+
+    def on_keyword_detected(self, detection: Dict):
+        self.log(f"🗣 Detected '{detection['keyword']}' on-device "
+                 f"(conf {detection['confidence']}, {detection['lag_s']:.2f}s after it was spoken)")
+        self.triggers.dispatch(detection["text"])
+
+    def start_keyword_spotter(self) -> Optional[KeywordSpotter]:
+        # Every trigger phrase goes into the spotter's grammar, commands included
+        spotter = KeywordSpotter(self.triggers.phrases, log=self.log)
+        try:
+            spotter.load()
+        except Exception as e:
+            self.log(f"❌ Local keyword spotter unavailable: {e}")
+            return None
+        return spotter
+
+    def start_cloud_transcriber(self) -> Optional[RealtimeTranscriber]:
+        if not ASSEMBLYAI_API_KEY:
+            self.log("❌ AssemblyAI API key not found in environment variables")
+            return None
+
+        # Every session's stream shares the process-wide realtime event loop
+        transcriber = RealtimeTranscriber(ASSEMBLYAI_API_KEY, self.on_transcript_received, name=self.label,
+                                          on_utterance_callback=self.on_final_utterance)
+        if not transcriber.start_transcription():
+            self.log("❌ Failed to start AssemblyAI transcription")
+            return None
+        return transcriber
+
+    def listen_for_bot_trigger(self):
+        self.listening_active.set()
+
+        reader = self.capture.reader("realtime")
+        spotter = None
+        transcriber = None
+        if TRIGGER_ENGINE == "local":
+            spotter = self.start_keyword_spotter()
+            if not spotter:
+                self.log("↩️ Falling back to AssemblyAI realtime for the voice trigger")
+        if not spotter:
+            transcriber = self.start_cloud_transcriber()
+
+        if not spotter and not transcriber:
+            self.listening_active.clear()
+            self.capture.release(reader)
+            return
+
+        # Silence never needs to reach the websocket
+        gate = VoiceActivityGate() if transcriber and VAD_ENABLED else None
+
+        self.trigger_source = "local" if spotter else "cloud"
+        engine = "on-device keyword spotting" if spotter else "AssemblyAI"
+        self.log(f"🔊 Voice trigger activated with {engine}. Listening on {self.capture_backend.describe()}...")
+        # Small blocks keep local detection latency down; the cloud path keeps its 0.5 s frames
+        block_bytes = 3200 if spotter else 16000
+
+        try:
+            # Capture starts during pre-warm; nothing is processed until we join
+            while self.listening_active.is_set() and self.recording_active.is_set():
+                chunk = reader.read(block_bytes)
+                if not chunk:
+                    if reader.finished:
+                        break
+                    continue
+                if not self.joined.is_set():
+                    continue
+
+                if self.first_audio_at is None:
+                    samples = np.frombuffer(chunk, dtype=np.int16)
+                    if np.abs(samples).max() >= FIRST_AUDIO_LEVEL * 32767:
+                        self.first_audio_at = time.perf_counter()
+                        self.log(f"🎙️ First audio {self.first_audio_at - self.join_clicked_at:.2f}s after join")
+
+                if spotter:
+                    for detection in spotter.accept(chunk):
+                        self.on_keyword_detected(detection)
+                elif gate:
+                    voiced = gate.process(chunk, reader.position - len(chunk))
+                    if voiced:
+                        transcriber.add_audio_data(voiced, gate.last_segments)
+                else:
+                    transcriber.add_audio_data(chunk, [[reader.position - len(chunk), len(chunk)]])
+        except Exception as e:
+            self.log(f"❌ Audio listening error: {e}")
+        finally:
+            if transcriber:
+                transcriber.stop()
+                self.write_realtime_stats(gate, transcriber)
+            if spotter:
+                self.write_wake_word_stats(spotter)
+            self.write_trigger_stats()
+            self.log("🔇 Voice trigger stopped")
+
+    def write_trigger_stats(self):
+        try:
+            with open(os.path.join(self.meeting_dir, "trigger_stats.json"), "w") as f:
+                json.dump({
+                **self.triggers.stats(),
+                "responses": self.response_audio.stats() if self.response_audio else None,
+            }, f, indent=2)
+        except Exception as e:
+            self.log(f"⚠️ Could not write trigger stats: {e}")
+
+    def write_realtime_stats(self, gate: Optional[VoiceActivityGate], transcriber: RealtimeTranscriber):
+        """Persist how much of the captured audio was streamed and how the send queue coped"""
+        stats = {
+            "vad": gate.stats() if gate else None,
+            "send_queue": transcriber.audio_queue.stats(),
+            "stream": transcriber.stats(),
+        }
+        try:
+            with open(os.path.join(self.meeting_dir, "realtime_stats.json"), "w") as f:
+                json.dump(stats, f, indent=2)
+        except Exception as e:
+            self.log(f"⚠️ Could not write realtime stats: {e}")
+        if gate:
+            vad = stats["vad"]
+            self.log(f"📉 VAD streamed {vad['sent_seconds']}s of {vad['captured_seconds']}s captured "
+                     f"({vad['sent_ratio']} ratio)")
+        stream = stats["stream"]
+        if stream["reconnects"]:
+            self.log(f"🔁 Realtime stream reconnected {stream['reconnects']} time(s), "
+                     f"{stream['total_gap_seconds']}s without coverage")
+        send_queue = stats["send_queue"]
+        if send_queue["drops"]:
+            self.log(f"⚠️ Realtime send queue dropped {send_queue['drops']} chunk(s) "
+                     f"({send_queue['dropped_seconds']}s of audio)")
+
+    def write_wake_word_stats(self, spotter: KeywordSpotter):
+        stats = spotter.stats()
+        try:
+            with open(os.path.join(self.meeting_dir, "wake_word_stats.json"), "w") as f:
+                json.dump(stats, f, indent=2)
+        except Exception as e:
+            self.log(f"⚠️ Could not write wake word stats: {e}")
+        self.log(f"👂 Keyword spotter: {len(stats['detections'])} detection(s), "
+                 f"{stats['realtime_factor']}x realtime over {stats['audio_seconds']}s")
+
+    def write_chat_stats(self):
+        stats = self.chat.stats()
+        try:
+            with open(os.path.join(self.meeting_dir, "chat_stats.json"), "w") as f:
+                json.dump(stats, f, indent=2)
+        except Exception as e:
+            self.log(f"⚠️ Could not write chat stats: {e}")
+        if stats["failed"] or stats["pending"]:
+            self.log(f"⚠️ {len(stats['failed'])} chat message(s) failed, {stats['pending']} never sent")
+
+    def write_resource_stats(self):
+        """Persist CPU and RSS of this session's browser process tree"""
+        stats = {"profile": self.browser_profile, **self.resource_sampler.stats()}
+        try:
+            with open(os.path.join(self.meeting_dir, "resource_stats.json"), "w") as f:
+                json.dump(stats, f, indent=2)
+        except Exception as e:
+            self.log(f"⚠️ Could not write resource stats: {e}")
+        if stats["samples"]:
+            self.log(f"🖥️ Browser used {stats['avg_cpu_percent']}% CPU on average, {stats['max_rss_mb']} MB peak RSS "
+                     f"(~{stats['est_sessions_per_host']} such sessions per host)")
+
+    def write_capture_stats(self):
+        """Persist per-consumer read counts and overruns from the shared capture"""
+        stats = self.capture.stats()
+        try:
+            with open(os.path.join(self.meeting_dir, "capture_stats.json"), "w") as f:
+                json.dump(stats, f, indent=2)
+        except Exception as e:
+            self.log(f"⚠️ Could not write capture stats: {e}")
+        for consumer in stats["consumers"]:
+            if consumer["overruns"]:
+                self.log(f"⚠️ Audio consumer '{consumer['consumer']}' overran {consumer['overruns']} times "
+                         f"({consumer['dropped_seconds']}s dropped)")
+
+    def stop(self):
+        """Ask a running session to leave its meeting; safe to call from any thread."""
+        self.stop_requested.set()
+        self.monitor_wake.set()
+
+    def cleanup(self):
+        """Safe cleanup function that closes only what this session opened; later calls do nothing"""
+        if self.cleaned_up:
+            return
+        self.cleaned_up = True
+        self.log("🧹 Starting safe cleanup...")
+
+        # Stop recording and listening
+        self.recording_active.clear()
+        self.listening_active.clear()
+
+        if self.listener_thread:
+            self.listener_thread.join(timeout=5)
+            self.listener_thread = None
+        # A handler still running (e.g. a summary) finishes on its own; nothing new is started
+        self.trigger_executor.shutdown(wait=False, cancel_futures=True)
+
+        # Stop the shared capture first so the recorder can drain the tail and finalize the file
+        if self.capture:
+            self.capture.stop()
+        if self.recorder:
+            self.log("🔴 Finalizing recording...")
+            self.recorder.stop()
+            self.log("🔴 Recording stopped.")
+            self.recorder = None
+        if self.segment_writer:
+            # Closes the last, partial segment and hands it to the transcriber
+            self.segment_writer.stop()
+        if self.capture:
+            self.write_capture_stats()
+            self.capture = None
+
+        if self.responses_thread:
+            self.responses_thread.join(timeout=5)
+            self.responses_thread = None
+        with self.responses_lock:
+            if self.response_audio:
+                self.response_audio.close()
+                self.response_audio = None
+
+        if self.chat:
+            self.write_chat_stats()
+        if self.resource_sampler:
+            self.resource_sampler.stop()
+            self.write_resource_stats()
+            self.resource_sampler = None
+
+        # Close ONLY this session's meeting driver (not all Chrome windows)
+        if self.driver:
+            try:
+                self.log("🔧 Closing Zoom meeting browser window...")
+                self.driver.quit()  # This only closes the driver's browser window
+                self.driver = None
+                self.log("✅ Zoom browser window closed")
+            except Exception as e:
+                self.log(f"⚠️ Error closing Zoom browser: {e}")
+        if self.audio_sink:
+            self.audio_sink.remove()
+
+        # OBS is shared by every session on the host; only a standalone bot closes it
+        if self.manage_obs:
+            close_obs()
+
+        self.log("✅ Safe cleanup completed")
+
+    def launch_browser(self) -> bool:
+        self.log("🚀 Launching Zoom meeting via Selenium...")
+        chrome_options = build_chrome_options(self.browser_profile)
+
+        try:
+            service_env = None
+            if self.audio_sink:
+                if BROWSER_AUDIO_SINK == "auto":
+                    self.audio_sink.create()
+                service_env = self.audio_sink.environment()
+
+            drivers = shared_driver_cache()
+            self.driver_resolve = drivers.resolve()
+            started = time.perf_counter()
+            try:
+                self.driver = webdriver.Chrome(service=Service(self.driver_resolve["path"], env=service_env),
+                                               options=chrome_options)
+            except SessionNotCreatedException as e:
+                if self.driver_resolve["mode"] == "pinned_path":
+                    # Re-resolving would hand back the same binary; the pin has to be updated by hand
+                    self.log(f"❌ ChromeDriver pinned by CHROMEDRIVER_PATH ({self.driver_resolve['path']}) "
+                             f"doesn't match the installed Chrome: {e.msg}")
+                    raise
+                # Chrome updated since the driver was cached; resolve a matching one and try once more
+                self.log(f"⚠️ Cached ChromeDriver rejected by Chrome, re-resolving: {e.msg}")
+                self.driver_resolve = drivers.resolve(force=True)
+                started = time.perf_counter()
+                self.driver = webdriver.Chrome(service=Service(self.driver_resolve["path"], env=service_env),
+                                               options=chrome_options)
+            self.browser_start_seconds = round(time.perf_counter() - started, 3)
+            self.log(f"🌐 Chrome ({self.browser_profile} profile) started in {self.browser_start_seconds:.2f}s")
+            self.driver.get(self.zoom_link)
+        except Exception as e:
+            self.log(f"❌ Failed to initialize Chrome driver: {e}")
+            return False
+        self.chat = MeetingChat(self.driver, self.monitor_wake, self.log)
+        self.resource_sampler = ResourceSampler(self.driver.service.process.pid, log=self.log)
+        self.resource_sampler.start()
+        return True
+
+    def join_steps(self) -> List[JoinStep]:
+        """The pre-join choreography. Each step waits for its own element instead of sleeping."""
+        def click(driver, element):
+            element.click()
+
+        headless = self.browser_profile == "lean"
+
+        def press_escape(driver, _):
+            # Dismisses the native "Open zoom.us?" dialog, which the DOM can't see; headless Chrome never shows it
+            if headless:
+                return
+            with desktop_lock:
+                pyautogui.press('esc')
+
+        def allow_this_time(driver, permission_state):
+            if permission_state == "granted" or headless:
+                return  # Chrome already granted the devices; no prompt to answer
+            with desktop_lock:
+                pyautogui.press('tab', presses=3)
+                pyautogui.press('enter')
+
+        def select_device(option_label):
+            def action(driver, dropdown_btn):
+                dropdown_btn.click()
+                option = WebDriverWait(driver, 10, poll_frequency=JOIN_POLL_INTERVAL).until(
+                    EC.element_to_be_clickable((By.CSS_SELECTOR, f'li[aria-label="{option_label}"]'))
+                )
+                option.click()
+            return action
+
+        def fill_name(driver, name_input):
+            name_input.clear()
+            name_input.send_keys(self.bot_display_name)
+
+        def page_loaded(driver):
+            return driver.execute_script("return document.readyState") == "complete"
+
+        def microphone_permission(driver):
+            return driver.execute_async_script(
+                "const done = arguments[arguments.length - 1];"
+                "navigator.permissions.query({name: 'microphone'})"
+                ".then(p => done(p.state)).catch(() => done('unknown'));"
+            )
+
+        camera_dropdown = "//*[@id='root']/div/div[1]/div/div[1]/div/div/div[2]/button[2]"
+        audio_dropdown = "//*[@id='root']/div/div[1]/div/div[1]/div/div/div[1]/button[2]"
+
+        return [
+            JoinStep("Dismiss app prompt", press_escape, page_loaded, timeout=20),
+            JoinStep("Close Cancel popup", click,
+                     EC.element_to_be_clickable((By.XPATH, "//button[contains(text(),'Cancel')]")),
+                     timeout=3, optional=True),
+            JoinStep("Decline Cookies", click,
+                     EC.element_to_be_clickable((By.XPATH, "//button[contains(text(),'Decline Cookies')]")),
+                     timeout=5, optional=True),
+            JoinStep("Join from your browser", click,
+                     EC.element_to_be_clickable((By.LINK_TEXT, "Join from your browser")),
+                     timeout=15),
+            JoinStep("I Agree", click,
+                     EC.element_to_be_clickable((By.XPATH, "//*[@id='wc_agree1']")),
+                     optional=True, in_webclient=True),
+            JoinStep("Use microphone and camera", click,
+                     EC.element_to_be_clickable((By.XPATH, "//*[@id='ask-permission-button']")),
+                     optional=True, in_webclient=True),
+            JoinStep("Allow this time", allow_this_time, microphone_permission, timeout=5,
+                     in_webclient=True,
+                     applies=lambda results: results.get("Use microphone and camera") == STEP_DONE),
+            # The lean profile keeps Chrome's default devices, which point at the session's audio sink
+            JoinStep("Select OBS Virtual Camera", select_device("Select a Camera OBS Virtual Camera"),
+                     EC.element_to_be_clickable((By.XPATH, camera_dropdown)), in_webclient=True,
+                     applies=lambda results: not headless),
+            JoinStep("Select Speaker", select_device("Select a Speaker CABLE Input (VB-Audio Virtual Cable)"),
+                     EC.element_to_be_clickable((By.XPATH, audio_dropdown)), in_webclient=True,
+                     applies=lambda results: not headless),
+            JoinStep("Select Microphone", select_device("Select a Microphone CABLE Output (VB-Audio Virtual Cable)"),
+                     EC.element_to_be_clickable((By.XPATH, audio_dropdown)), in_webclient=True,
+                     applies=lambda results: not headless),
+            JoinStep("Fill name", fill_name,
+                     EC.element_to_be_clickable((By.ID, "input-for-name")), in_webclient=True),
         ]
-        recorder_process = subprocess.Popen(record_cmd)
 
-        listener_thread = threading.Thread(target=listen_for_bot_trigger, daemon=True)
-        listener_thread.start()
+    def prepare_join_screen(self):
+        """Walk through the Zoom web client pre-join screens and stop right before Join"""
+        self.join_engine = JoinEngine(self.driver, os.path.join(self.meeting_dir, "join_trace.jsonl"), self.log)
+        self.join_engine.run(self.join_steps())
+
+    def start_capture(self):
+        """Start the capture and listener ahead of joining; recording starts at the Join click"""
+        self.log("🔴 Starting audio capture and voice trigger...")
+        self.recording_active.set()
+
+        # One capture of the meeting audio feeds the recorder and the voice trigger alike
+        self.capture = CaptureFanout(self.capture_backend, log=self.log)
+        self.capture.start()
+
+        silence = None
+        if LEAVE_ON_SILENCE_SECONDS:
+            silence = SilenceTracker(self.capture.reader("silence"), log=self.log)
+            silence.start()
+        self.leave_policy = LeavePolicy(silence)
+
+        self.listener_thread = threading.Thread(target=self.listen_for_bot_trigger, daemon=True)
+        self.listener_thread.start()
+
+    def start_recording(self):
+        """Start writing recording.mp3 (and segments) from this point of the running capture"""
+        if self.recorder or not self.capture:
+            return
+        # New readers start at the ring's current position, so the join-screen audio is left out
+        self.recorder = PcmFileEncoder(self.capture.reader("recorder"), self.output_file, self.log)
+        self.recording_origin = self.recorder.reader.position
+        self.recorder.start()
+        self.recorder_started_at = time.perf_counter()
+
+        if RECORDING_MODE == "segmented":
+            self.segment_writer = SegmentWriter(
+                self.capture.reader("segments"), os.path.join(self.meeting_dir, "segments"), log=self.log
+            )
+            self.segment_transcriber = IncrementalTranscriber(self.segment_writer, self.log)
+            self.segment_writer.on_segment = self.segment_transcriber.submit
+            self.segment_writer.start()
+        self.log("🔴 Recording started")
+
+    def prewarm(self) -> bool:
+        """Bring up the browser and capture pipeline and park on the join screen"""
+        self.prewarm_started_at = time.perf_counter()
+        if self.start_at:
+            lead = (self.start_at - datetime.now()).total_seconds()
+            self.log(f"🔥 Pre-warming {lead:.0f}s before the {self.start_at.strftime('%H:%M:%S')} start...")
+
+        # Rendering can take seconds on a cold cache; it must not hold up the browser
+        self.responses_thread = threading.Thread(target=self.prepare_responses, daemon=True, name="response-audio")
+        self.responses_thread.start()
+
+        if not self.launch_browser():
+            return False
+        self.prepare_join_screen()
+        self.start_capture()
+
+        self.parked_at = time.perf_counter()
+        self.log(f"🅿️ Parked on the join screen after {self.parked_at - self.prewarm_started_at:.1f}s of pre-warm")
+        return True
+
+    def wait_for_start(self):
+        """Sleep until the scheduled start time, or until a stop is requested"""
+        if not self.start_at:
+            return
+        remaining = (self.start_at - datetime.now()).total_seconds()
+        if remaining > 0:
+            self.log(f"⏳ Waiting {remaining:.1f}s for the meeting to start...")
+            self.stop_requested.wait(remaining)
+
+    def click_join(self) -> bool:
+        def join(driver, join_button):
+            join_button.click()
+            self.join_clicked_at = time.perf_counter()
+            self.start_recording()
+            self.joined.set()
+
+        def stop_incoming_video(driver, more_button):
+            more_button.click()
+            WebDriverWait(driver, 3, poll_frequency=JOIN_POLL_INTERVAL).until(
+                EC.element_to_be_clickable((By.XPATH, "//*[contains(text(), 'Stop Incoming Video')]"))
+            ).click()
+
+        step = JoinStep("Join", join,
+                        EC.element_to_be_clickable((By.XPATH, "//*[@id='root']/div/div[1]/div/div[2]/button")),
+                        retries=3, in_webclient=True)
+        if self.join_engine.run_step(step) != STEP_DONE:
+            return False
+        if self.leave_policy:
+            self.leave_policy.on_joined()
+        if self.browser_profile == "lean":
+            # The bot only needs audio; don't receive and decode everyone's video
+            self.join_engine.run_step(JoinStep(
+                "Stop incoming video", stop_incoming_video,
+                EC.element_to_be_clickable((By.XPATH, "//button[contains(@aria-label, 'More meeting control')]")),
+                timeout=10, optional=True, in_webclient=True,
+            ))
+        return True
+
+    def write_join_report(self):
+        """Record how early we were ready and how quickly audio started flowing"""
+        def since_prewarm(mark):
+            return round(mark - self.prewarm_started_at, 3) if mark and self.prewarm_started_at else None
+
+        report = {
+            "meeting_id": self.meeting_id,
+            "scheduled_start": self.start_at.isoformat() if self.start_at else None,
+            "prewarm_to_parked_s": since_prewarm(self.parked_at),
+            "prewarm_to_join_s": since_prewarm(self.join_clicked_at),
+            "join_lateness_s": round((self.joined_wallclock - self.start_at).total_seconds(), 3)
+            if self.start_at and self.joined_wallclock else None,
+            "join_to_first_audio_s": round(self.first_audio_at - self.join_clicked_at, 3)
+            if self.first_audio_at and self.join_clicked_at else None,
+            "join_to_recorder_s": round(self.recorder_started_at - self.join_clicked_at, 3)
+            if self.join_clicked_at and self.recorder_started_at else None,
+            # "cold" resolutions went to the network; "warm" ones came from the driver cache
+            "driver_resolve": self.driver_resolve,
+            "browser_start_s": self.browser_start_seconds,
+            "leave_reason": self.leave_reason,
+            "meeting_duration_s": round(self.left_at - self.join_clicked_at, 1)
+            if self.left_at and self.join_clicked_at else None,
+            "leave_policy": self.leave_policy.stats() if self.leave_policy else None,
+        }
+        try:
+            with open(os.path.join(self.meeting_dir, "join_report.json"), "w") as f:
+                json.dump(report, f, indent=2)
+        except Exception as e:
+            self.log(f"⚠️ Could not write join report: {e}")
+        self.log(f"📊 Join report: {report}")
+
+    def observed_meeting_ended(self, observer: MeetingEventObserver) -> bool:
+        """Drain the in-page observer's queue and report whether we should leave"""
+        try:
+            events = observer.drain()
+        except (NoSuchWindowException, WebDriverException) as e:
+            self.log(f"🛑 Browser/WebDriver error: {e}")
+            return True
+
+        ended = False
+        for event in events:
+            state = "entered" if event["present"] else "cleared"
+            self.log(f"👁️ {event['type']} {state} (seen {event['latency_ms']:.0f} ms after the page noticed)")
+            if observer.is_terminal(event):
+                ended = True
+        return ended
+
+    def read_participant_count(self) -> Optional[int]:
+        """Participant count from the web client footer, or None if it can't be read"""
+        driver = self.driver
+        try:
+            result = driver.execute_script(PARTICIPANT_COUNT_SCRIPT)
+            count = result["count"]
+            if count is None and result["frame_blocked"]:
+                # The webclient frame is cross-origin; look from inside it
+                driver.switch_to.default_content()
+                driver.switch_to.frame(driver.find_element(By.ID, "webclient"))
+                try:
+                    count = driver.execute_script(PARTICIPANT_COUNT_SCRIPT)["count"]
+                finally:
+                    driver.switch_to.default_content()
+        except Exception as e:
+            self.log(f"⚠️ Could not read participant count: {e}")
+            count = None
+
+        # Without a count the empty-room rule can't fire, so say so instead of failing quietly
+        if count is None and not self.participant_count_missing:
+            self.log("⚠️ Participant count not found in the page or the webclient frame; "
+                     "leaving an empty room is off until it shows up")
+        elif count is not None and self.participant_count_missing:
+            self.log(f"👥 Participant count readable again ({count})")
+        self.participant_count_missing = count is None
+        return count
+
+    def monitor_meeting(self):
+        observer = MeetingEventObserver(self.driver, self.log) if END_DETECTION == "observer" else None
+        check_interval = OBSERVER_DRAIN_INTERVAL if observer else WAIT_INTERVAL
 
         try:
             start_time = time.time()
             last_check_time = time.time()
-            
-            print(f"🔍 Monitoring ONLY for 'This meeting has been ended by host' every {WAIT_INTERVAL} seconds...")
-            
-            while recording_active.is_set():
+            last_participant_check = 0.0
+
+            if observer:
+                self.log(f"👁️ Watching for meeting end/removal via in-page observer (drain every {check_interval}s)...")
+            else:
+                self.log(f"🔍 Monitoring ONLY for 'This meeting has been ended by host' every {WAIT_INTERVAL} seconds...")
+
+            while self.recording_active.is_set():
                 current_time = time.time()
-                
-                if current_time - last_check_time >= WAIT_INTERVAL:
-                    print("🔍 Checking for specific meeting end modal...")
-                    if not is_zoom_meeting_active():
-                        print("🛑 'This meeting has been ended by host' detected! Leaving meeting and stopping recording.")
-                        
+
+                # Only this thread drives the browser; trigger handlers just queue their messages
+                if self.chat.has_pending:
+                    self.chat.flush()
+
+                if self.stop_requested.is_set():
+                    self.log("🛑 Stop requested. Leaving meeting and stopping recording.")
+                    self.leave_reason = "stop_requested"
+                    self.leave_meeting()
+                    break
+
+                if current_time - last_check_time >= check_interval:
+                    if observer:
+                        ended = self.observed_meeting_ended(observer)
+                    else:
+                        self.log("🔍 Checking for specific meeting end modal...")
+                        ended = not self.is_meeting_active()
+                        if not ended:
+                            self.log("✅ Meeting still active (no end modal detected)")
+
+                    if ended:
+                        self.log("🛑 Meeting end detected! Leaving meeting and stopping recording.")
+                        self.leave_reason = "ended_by_host"
+
                         # First leave the meeting properly
-                        leave_zoom_meeting()
+                        self.leave_meeting()
                         time.sleep(3)  # Give time for leave to complete
-                        
+
                         break
-                    else:
-                        print("✅ Meeting still active (no end modal detected)")
                     last_check_time = current_time
-                
+
+                    participants = None
+                    # The page is only read for the count when the empty-room rule is on
+                    if LEAVE_WHEN_ALONE_SECONDS and current_time - last_participant_check >= PARTICIPANT_CHECK_INTERVAL:
+                        participants = self.read_participant_count()
+                        last_participant_check = current_time
+                    reason = self.leave_policy.check(participants)
+                    if reason:
+                        self.log(f"🚪 Leave policy '{reason}' fired. Leaving meeting and stopping recording.")
+                        self.leave_reason = reason
+                        self.leave_meeting()
+                        break
+
                 if current_time - start_time >= MAX_WAIT_TIME:
-                    print("⏰ Maximum recording time reached. Leaving meeting and stopping recording.")
-                    leave_zoom_meeting()
+                    self.log("⏰ Maximum recording time reached. Leaving meeting and stopping recording.")
+                    self.leave_reason = "max_wait_time"
+                    self.leave_meeting()
                     break
-                
-                time.sleep(1)
-                
+
+                self.monitor_wake.wait(min(1, check_interval))
+                self.monitor_wake.clear()
+
         except KeyboardInterrupt:
-            print("⌨️ Recording stopped by user. Leaving meeting...")
-            leave_zoom_meeting()
+            self.log("⌨️ Recording stopped by user. Leaving meeting...")
+            self.leave_meeting()
+        finally:
+            self.left_at = time.perf_counter()
+            if observer:
+                self.log(f"👁️ Observer drained {observer.drains} times, {observer.events_seen} events")
+
+    def join_and_record(self) -> Optional[str]:
+        self.log(f"🚀 Starting new meeting session: {self.meeting_timestamp}")
+        self.log(f"📁 Meeting files will be saved to: {self.meeting_dir}")
+
+        try:
+            if not self.prewarm():
+                return None
+
+            self.wait_for_start()
+            if self.stop_requested.is_set():
+                self.log("🛑 Stop requested before the meeting started")
+                return None
+
+            self.joined_wallclock = datetime.now()
+            if self.click_join():
+                self.monitor_meeting()
         finally:
             # Clean up
-            cleanup_and_exit()
+            self.cleanup()
+            if self.prewarm_started_at:
+                self.write_join_report()
+
+        return self.output_file if os.path.exists(self.output_file) else None
+
+    def process_recording(self, recorded_audio: str):
+        """Queue the recording for the pipeline workers, or run the pipeline here in inline mode.
+
+        Either way the generated notes are written straight into this session's folder.
+        """
+        transcript = None
+        if self.segment_transcriber:
+            self.log("🧩 Waiting for the remaining segment transcriptions...")
+            transcript = self.segment_transcriber.finish()
+            if transcript is None:
+                self.log("⚠️ Segment transcripts incomplete, transcribing the full recording instead")
+
+        if POSTPROCESS_MODE == "inline":
+            self.log("🎵 Processing recorded audio...")
+            process_file(recorded_audio, transcript=transcript, notes_dir=self.meeting_dir)
+            self.log(f"✅ Meeting completed and saved to: {self.meeting_dir}")
+            return
+
+        extra = {"meeting_id": self.meeting_id}
+        if transcript is not None:
+            extra["transcript_path"] = save_transcript_locally(transcript, recorded_audio, method_used="Segmented")
+        store = JobStore()
+        try:
+            self.pipeline_job_id = store.enqueue(recorded_audio, self.meeting_dir, extra=extra)
+        finally:
+            store.close()
+        self.log(f"📥 Recording queued as pipeline job #{self.pipeline_job_id}; "
+                 f"run 'python pipeline_worker.py' to process it")
+
+    def run(self) -> Optional[str]:
+        """Attend the meeting, then post-process the recording. Returns the recording path."""
+        recorded_audio = self.join_and_record()
+
+        if recorded_audio and os.path.exists(recorded_audio):
+            self.process_recording(recorded_audio)
+
+        return recorded_audio
+
+
+class MeetingSupervisor:
+    """Runs several MeetingSessions in parallel, one thread per session.
+
+    OBS is shared by every session on the host, so the supervisor launches it
+    when the first session starts and closes it once the last one finishes.
+    """
+
+    def __init__(self):
+        self.sessions: Dict[str, MeetingSession] = {}
+        self.threads: Dict[str, threading.Thread] = {}
+        self._lock = threading.Lock()
+
+    def start_session(self, zoom_link: str, meeting_id: Optional[str] = None, **session_kwargs) -> MeetingSession:
+        session = MeetingSession(zoom_link, meeting_id=meeting_id, manage_obs=False, **session_kwargs)
+        key = str(meeting_id or session.meeting_timestamp)
+
+        with self._lock:
+            if not self.active_sessions():
+                launch_obs()
+            thread = threading.Thread(target=self._run_session, args=(key, session), daemon=True)
+            self.sessions[key] = session
+            self.threads[key] = thread
+        thread.start()
+        print(f"🧭 Supervisor started session {key} ({len(self.active_sessions())} active)")
+        return session
+
+    def _run_session(self, key: str, session: MeetingSession):
+        try:
+            session.run()
+        except Exception as e:
+            session.log(f"❌ Session failed: {e}")
+        finally:
+            with self._lock:
+                self.sessions.pop(key, None)
+                self.threads.pop(key, None)
+                last_one = not self.sessions
+            print(f"🧭 Supervisor finished session {key}")
+            if last_one:
+                close_obs()
+
+    def active_sessions(self) -> List[MeetingSession]:
+        return list(self.sessions.values())
+
+    def stop_session(self, key: str):
+        session = self.sessions.get(key)
+        if session:
+            session.stop()
+
+    def stop_all(self):
+        for session in self.active_sessions():
+            session.stop()
+
+    def wait(self):
+        """Block until every session has finished."""
+        while True:
+            with self._lock:
+                threads = list(self.threads.values())
+            if not threads:
+                return
+            for thread in threads:
+                thread.join()
 
-    return OUTPUT_FILE if os.path.exists(OUTPUT_FILE) else None
 
 if __name__ == "__main__":
+    meeting_start = os.getenv("MEETING_START")
+    session = MeetingSession(
+        ZOOM_LINK,
+        meeting_id=os.getenv("MEETING_ID"),
+        start_at=datetime.fromisoformat(meeting_start) if meeting_start else None,
+        # The headless profile joins without a camera, so it has no use for OBS
+        manage_obs=BROWSER_PROFILE == "full",
+    )
     try:
-        print(f"📅 Starting meeting session at {meeting_timestamp}")
-        print(f"📁 Meeting directory: {CURRENT_MEETING_DIR}")
-        
-        launch_obs()  # Only this line needed now!
-        recorded_audio = join_zoom_and_record()
-        
-        if recorded_audio and os.path.exists(recorded_audio):
-            print("🎵 Processing recorded audio...")
-            process_file(recorded_audio)
-            
-            # NEW: Move the meeting analysis files to the meeting folder
-            move_meeting_files_to_folder()
-            
-            print(f"✅ Meeting completed and saved to: {CURRENT_MEETING_DIR}")
+        print(f"📅 Starting meeting session at {session.meeting_timestamp}")
+        print(f"📁 Meeting directory: {session.meeting_dir}")
+
+        if session.manage_obs:
+            launch_obs()  # Only this line needed now!
+        recorded_audio = session.run()
+
+        if session.pipeline_job_id is not None:
+            print(f"📥 Notes will be ready once a worker has run job #{session.pipeline_job_id}. "
+                  f"Start one with: python pipeline_worker.py --drain")
+        elif recorded_audio and os.path.exists(recorded_audio):
             print("🌐 Refresh your Streamlit dashboard to see the latest meeting data!")
             subprocess.Popen(["streamlit", "run", "streamlit_app.py"])
-            
+
     except Exception as e:
         print(f"❌ Fatal error: {e}")
     finally:
-        recording_active.clear()
-        listening_active.clear()
-        if recorder_process:
-            recorder_process.terminate()
-        # Close OBS via batch file at the very end
-        close_obs()
\ No newline at end of file
+        session.cleanup()